@@ -0,0 +1,103 @@
+from __future__ import annotations
+from nodes import Node, IntVal, BoolVal, Identifier, UnOp, BinOp, ShiftOp, Return, FuncCall
+from analysis import Env, ScopedVisitor, has_effects, is_safe, key, subtree_indices, type_of
+
+
+class AlgebraicSimplifier(ScopedVisitor):
+    """
+    Identidades algébricas e redução de força em UnOp/BinOp:
+      x*1, 1*x, x+0, 0+x, x-0, +x, -(-x) -> x        (x number)
+      !!b, b&&true, true&&b, b||false, false||b -> b (b boolean)
+      x*0, 0*x, x-x -> 0;  b&&false -> false;  b||true -> true   (x/b puro e seguro)
+      0-x -> -x
+      x*2^k, 2^k*x, x/2^k, x%2^k -> ShiftOp (deslocamento/máscara de bits)
+
+    Trocar uma operação pelo próprio operando devolve a variável viva em vez de
+    uma cópia; isso só é visível quando o valor é segurado enquanto outra coisa
+    roda (lado esquerdo de BinOp com efeito à direita, ou valor de return).
+    Nesses pontos o x vira +x, que ainda evita o literal e a cadeia de operadores.
+    """
+    rewrites: int = 0
+
+    @staticmethod
+    def run(root: Node) -> Node:
+        AlgebraicSimplifier.rewrites = 0
+        AlgebraicSimplifier(root).visit()
+        return root
+
+    def stmt(self, stmt: Node, env: Env):
+        if isinstance(stmt, Return):
+            stmt.children[0] = self._simplify(stmt.children[0], env, True)
+            return
+        super().stmt(stmt, env)
+
+    def expr(self, node: Node, env: Env) -> Node:
+        return self._simplify(node, env, False)
+
+    def _simplify(self, node: Node, env: Env, held: bool) -> Node:
+        for i in subtree_indices(node):
+            ch_held = (isinstance(node, BinOp) and i == 0 and has_effects(node.children[1]))
+            node.children[i] = self._simplify(node.children[i], env, ch_held)
+        new = self._rule(node, env, held)
+        if new is not node:
+            AlgebraicSimplifier.rewrites += 1
+        return new
+
+    def _rule(self, node: Node, env: Env, held: bool) -> Node:
+        def same(x: Node, t: str) -> Node | None:
+            if type_of(x, env) != t:
+                return None
+            if held and isinstance(x, (Identifier, FuncCall)):
+                return UnOp('+', x) if t == 'number' and not _is_plus(node) else None
+            return x
+
+        def safe(x: Node, t: str) -> bool:
+            return type_of(x, env) == t and is_safe(x, env)
+
+        if isinstance(node, UnOp):
+            x = node.children[0]
+            if node.value == '+':
+                return same(x, 'number') or node
+            if node.value == '-' and isinstance(x, UnOp) and x.value == '-':
+                return same(x.children[0], 'number') or node
+            if node.value == '!' and isinstance(x, UnOp) and x.value == '!':
+                return same(x.children[0], 'boolean') or node
+            return node
+        if not isinstance(node, BinOp) or isinstance(node, ShiftOp):
+            return node
+        a, b = node.children
+        op = node.value
+        ia = a.value if isinstance(a, IntVal) else None
+        ib = b.value if isinstance(b, IntVal) else None
+        if op == '*':
+            if ib == 1: return same(a, 'number') or node
+            if ia == 1: return same(b, 'number') or node
+            if ib == 0 and safe(a, 'number'): return IntVal(0)
+            if ia == 0 and safe(b, 'number'): return IntVal(0)
+            if _pow2(ib): return ShiftOp('*', a, b)
+            if _pow2(ia) and type_of(b, env) == 'number': return ShiftOp('*', b, a)
+        elif op == '+':
+            if ib == 0: return same(a, 'number') or node
+            if ia == 0: return same(b, 'number') or node
+        elif op == '-':
+            if ib == 0: return same(a, 'number') or node
+            if ia == 0 and type_of(b, env) == 'number': return UnOp('-', b)
+            if key(a) == key(b) and safe(a, 'number'): return IntVal(0)
+        elif op in ('/', '%'):
+            if _pow2(ib): return ShiftOp(op, a, b)
+        elif op in ('&&', '||'):
+            neutral = op == '&&'   # true&&b == b, false||b == b
+            if isinstance(b, BoolVal):
+                if b.value == neutral: return same(a, 'boolean') or node
+                if safe(a, 'boolean'): return BoolVal(b.value)
+            if isinstance(a, BoolVal):
+                if a.value == neutral: return same(b, 'boolean') or node
+                if safe(b, 'boolean'): return BoolVal(a.value)
+        return node
+
+
+def _pow2(v) -> bool:
+    return isinstance(v, int) and not isinstance(v, bool) and v > 0 and v & (v - 1) == 0
+
+def _is_plus(node: Node) -> bool:
+    return isinstance(node, UnOp) and node.value == '+'
@@ -0,0 +1,472 @@
+from __future__ import annotations
+import contextlib
+import copy
+import sys
+from typing import Callable, Dict, FrozenSet, Iterator, List, Optional, Set, Tuple, TypeVar
+from nodes import (
+    Node, IntVal, BoolVal, StringVal, Identifier, Print, Read, Assignment, VarDec,
+    UnOp, BinOp, If, While, Block, Return, FuncDec, FuncCall, TempDec
+)
+from symbol_table import Variable
+
+# Utilitários compartilhados pelos passes de otimização sobre a AST.
+
+LITERALS = (IntVal, BoolVal, StringVal)
+
+def is_literal(node: Node) -> bool:
+    return isinstance(node, LITERALS)
+
+def literal_of(var: Variable) -> Node:
+    """Converte um Variable (number/boolean/string) no nó literal equivalente."""
+    if var.type == 'number': return IntVal(var.value)
+    if var.type == 'boolean': return BoolVal(var.value)
+    if var.type == 'string': return StringVal(var.value)
+    raise Exception(f"[Optimizer] Valor sem literal correspondente: {var.type}")
+
+def literal_type(node: Node) -> str:
+    if isinstance(node, IntVal): return 'number'
+    if isinstance(node, BoolVal): return 'boolean'
+    return 'string'
+
+def subtree_indices(node: Node) -> range:
+    """
+    Índices dos filhos que são subárvores avaliáveis.
+    Pula os Identifiers de declaração/alvo (Assignment, VarDec, TempDec, FuncDec).
+    """
+    if isinstance(node, (Assignment, VarDec, TempDec, FuncDec)):
+        return range(1, len(node.children))
+    return range(len(node.children))
+
+def walk(node: Node) -> Iterator[Node]:
+    """Percorre a árvore em pré-ordem (inclui identificadores de declaração)."""
+    stack = [node]
+    while stack:
+        n = stack.pop()
+        yield n
+        stack.extend(reversed(n.children))
+
+def count_nodes(node: Node) -> int:
+    return sum(1 for _ in walk(node))
+
+def depth(node: Node) -> int:
+    """Altura da árvore."""
+    best = 0
+    stack = [(node, 1)]
+    while stack:
+        n, d = stack.pop()
+        best = max(best, d)
+        stack.extend((c, d + 1) for c in n.children)
+    return best
+
+@contextlib.contextmanager
+def recursion_room(node: Node, frames_per_level: int):
+    """
+    Os compiladores dos motores descem alguns frames do Python por nível da
+    árvore; o evaluate desce um. Sem folga, uma cadeia longa de operadores que
+    a árvore avalia estouraria o limite só na compilação.
+    """
+    old = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(old, old + frames_per_level * depth(node)))
+    try:
+        yield
+    finally:
+        sys.setrecursionlimit(old)
+
+def transform(node: Node, fn: Callable[[Node], Node]) -> Node:
+    """
+    Reescrita pós-ordem: aplica fn aos filhos avaliáveis e depois ao próprio nó.
+    fn devolve o nó (possivelmente novo) que substitui o original.
+    """
+    for i in subtree_indices(node):
+        node.children[i] = transform(node.children[i], fn)
+    return fn(node)
+
+def clone(node: Node) -> Node:
+    return copy.deepcopy(node)
+
+T = TypeVar('T')
+
+def bottom_up(node: Node, fn: Callable[[Node, List[T]], T], memo: Dict[int, Tuple[Node, T]]) -> T:
+    """
+    fn(nó, resultados dos filhos) para node e cada subárvore que ainda não está
+    em memo, em pós-ordem e sem recursão (cadeias longas de operadores não
+    estouram a pilha). memo: id(nó) -> (nó, resultado); guardar o nó impede que
+    o id de um nó descartado seja reaproveitado. Só vale enquanto as subárvores
+    já calculadas não mudam.
+    """
+    stack = [(node, False)]
+    while stack:
+        n, ready = stack.pop()
+        hit = memo.get(id(n))
+        if hit is not None and hit[0] is n:
+            continue
+        if not ready:
+            stack.append((n, True))
+            stack.extend((c, False) for c in n.children)
+            continue
+        memo[id(n)] = (n, fn(n, [memo[id(c)][1] for c in n.children]))
+    return memo[id(node)][1]
+
+def key(node: Node, memo: Dict[int, Tuple[Node, tuple]] | None = None) -> tuple:
+    """Chave estrutural: expressões iguais têm a mesma chave."""
+    return bottom_up(node, lambda n, kids: (type(n).__name__, n.value, tuple(kids)), {} if memo is None else memo)
+
+def key_id(node: Node, memo: Dict[int, Tuple[Node, int]], table: Dict[tuple, int]) -> int:
+    """
+    key() como número: estruturas iguais recebem o mesmo inteiro em table.
+    Comparar e espalhar é O(1), sem descer tuplas aninhadas de cadeias longas.
+    """
+    return bottom_up(node, lambda n, kids: table.setdefault((type(n).__name__, n.value, tuple(kids)), len(table)), memo)
+
+def identifier_names(node: Node, memo: Dict[int, Tuple[Node, FrozenSet[str]]] | None = None) -> FrozenSet[str]:
+    """Nomes dos Identifiers da subárvore."""
+    def names(n: Node, kids: List[FrozenSet[str]]) -> FrozenSet[str]:
+        own = frozenset((n.value,)) if isinstance(n, Identifier) else frozenset()
+        return own.union(*kids)
+    return bottom_up(node, names, {} if memo is None else memo)
+
+_temp_counter = 0
+
+def new_temp() -> str:
+    global _temp_counter
+    _temp_counter += 1
+    return f"_t{_temp_counter}"
+
+def has_effects(node: Node) -> bool:
+    """Contém chamada de função ou readline (pode ter efeito colateral)?"""
+    return any(isinstance(n, (FuncCall, Read)) for n in walk(node))
+
+def unique_functions(root: Node) -> Dict[str, FuncDec]:
+    """
+    Funções declaradas uma única vez, cujo nome não é usado por nenhuma variável,
+    parâmetro ou atribuição: toda busca por esse nome só pode achar a FuncDec.
+    """
+    funcs: Dict[str, List[FuncDec]] = {}
+    other: Set[str] = set()
+    for n in walk(root):
+        if isinstance(n, FuncDec):
+            funcs.setdefault(n.children[0].value, []).append(n)
+        elif isinstance(n, (VarDec, Assignment)):
+            other.add(n.children[0].value)
+    return {name: ds[0] for name, ds in funcs.items() if len(ds) == 1 and name not in other}
+
+
+def declared_names(node: Node) -> Set[str]:
+    return {n.children[0].value for n in walk(node) if isinstance(n, (VarDec, TempDec))}
+
+def written_names(node: Node, funcs: Dict[str, FuncDec]) -> Optional[Set[str]]:
+    """
+    Nomes que executar node pode atribuir, incluindo atribuições feitas pelas
+    funções chamadas (escopo dinâmico: a função escreve na pilha de quem chama).
+    None = pode escrever qualquer nome (chamada a função desconhecida).
+    """
+    out: Set[str] = set()
+    seen: Set[str] = set()
+    work = [node]
+    while work:
+        for n in walk(work.pop()):
+            if isinstance(n, (Assignment, TempDec)):
+                out.add(n.children[0].value)
+            elif isinstance(n, FuncCall) and n.value not in seen:
+                if n.value not in funcs:
+                    return None
+                seen.add(n.value)
+                work.append(funcs[n.value].children[-1])
+    return out
+def looked_up_names(name: str, funcs: Dict[str, FuncDec], cache: Dict[str, Optional[Set[str]]] | None = None) -> Optional[Set[str]]:
+    """
+    Nomes que chamar a função name pode buscar fora dos próprios parâmetros e
+    locais já declarados, incluindo as funções que ela chama (escopo dinâmico).
+    None = qualquer nome.
+    """
+    if cache is not None and name in cache:
+        return cache[name]
+    out: Optional[Set[str]] = set()
+    seen: Set[str] = set()
+    work = [name]
+    while work:
+        fn = work.pop()
+        if fn in seen:
+            continue
+        seen.add(fn)
+        if fn not in funcs:
+            out = None
+            break
+        f = funcs[fn]
+        params = {p.children[0].value for p in f.children[1:-1]}
+        _free_names(f.children[-1], params, out)
+        work.extend(n.value for n in walk(f.children[-1]) if isinstance(n, FuncCall))
+    if cache is not None:
+        cache[name] = out
+    return out
+
+def _free_names(node: Node, bound: Set[str], out: Set[str]):
+    """
+    Acumula em out os nomes que node busca fora de bound, na ordem de execução:
+    um local declarado antes do uso nunca sai da função (VarDec cria a variável
+    antes do inicializador; TempDec define depois da expressão). O que um bloco
+    declara não vale depois dele, mesmo o corpo de if/while.
+    """
+    if isinstance(node, Block):
+        inner = set(bound)
+        for ch in node.children:
+            _free_names(ch, inner, out)
+    elif isinstance(node, FuncDec):
+        out.update(n.value for n in walk(node) if isinstance(n, Identifier))
+    elif isinstance(node, VarDec):
+        bound.add(node.children[0].value)
+        for ch in node.children[1:]:
+            _free_names(ch, bound, out)
+    elif isinstance(node, TempDec):
+        _free_names(node.children[1], bound, out)
+        bound.add(node.children[0].value)
+    else:
+        if isinstance(node, (Identifier, FuncCall)) and node.value not in bound:
+            out.add(node.value)
+        for ch in node.children:
+            _free_names(ch, bound, out)
+
+def induction_step(stmt: Node, ind: str) -> Optional[int]:
+    """Passo c de 'ind = ind + c', 'ind = c + ind' ou 'ind = ind - c' (c literal não nulo)."""
+    if not (isinstance(stmt, Assignment) and stmt.children[0].value == ind):
+        return None
+    e = stmt.children[1]
+    if not (isinstance(e, BinOp) and e.value in ('+', '-')):
+        return None
+    a, b = e.children
+    if isinstance(a, Identifier) and a.value == ind and isinstance(b, IntVal):
+        c = b.value if e.value == '+' else -b.value
+    elif e.value == '+' and isinstance(b, Identifier) and b.value == ind and isinstance(a, IntVal):
+        c = a.value
+    else:
+        return None
+    return c or None
+
+
+def counted_loop(loop: Node, env: 'Env', funcs: Dict[str, FuncDec]) -> Optional[tuple]:
+    """
+    (i, c) se loop é 'while (i < B) { ...; i = i + c; }' (ou <=, >, >= com c
+    negativo) com a sequência de valores de i conhecida na entrada:
+    - i é uma variável number e o incremento é o último statement do corpo;
+    - nada mais no laço escreve i, nem as funções chamadas nele;
+    - B é seguro e nenhum nome dele é escrito ou declarado no laço;
+    - nada no laço redeclara i.
+    """
+    cond, body = loop.children
+    if not (isinstance(cond, BinOp) and cond.value in ('<', '<=', '>', '>=')
+            and isinstance(cond.children[0], Identifier) and body.children):
+        return None
+    ind = cond.children[0].value
+    bound = cond.children[1]
+    step = induction_step(body.children[-1], ind)
+    if step is None or (step > 0) != (cond.value in ('<', '<=')):
+        return None
+    written = written_names(loop, funcs)
+    rest = written_names(Block(body.children[:-1]), funcs)
+    if written is None or rest is None or ind in rest:
+        return None
+    blocked = written | declared_names(loop)
+    if ind in declared_names(loop) or any(isinstance(n, Identifier) and n.value in blocked for n in walk(bound)):
+        return None
+    if env.lookup(ind) != 'number' or type_of(bound, env) != 'number' or not is_safe(bound, env):
+        return None
+    return ind, step
+
+# ------- ambiente estático (tipos das variáveis visíveis) -------
+class Env:
+    """
+    Espelho estático da SymbolTable: nome -> tipo.
+    Tipo None = incerto (declaração condicional, função, escopo dinâmico...).
+    'funcs' (só na raiz) guarda o tipo de retorno das funções únicas.
+    """
+    def __init__(self, parent: Optional['Env'] = None, funcs: Dict[str, str] | None = None):
+        self.parent = parent
+        self.names: Dict[str, Optional[str]] = {}
+        self.funcs = funcs if funcs is not None else (parent.funcs if parent else {})
+
+    def child(self) -> 'Env':
+        return Env(self)
+
+    def declare(self, name: str, vtype: Optional[str]):
+        self.names[name] = vtype
+
+    def forget(self, name: str):
+        self.names[name] = None
+
+    def snapshot(self) -> 'Env':
+        """Cópia achatada do ambiente neste ponto (não acompanha declarações futuras)."""
+        frames = []
+        e = self
+        while e is not None:
+            frames.append(e.names)
+            e = e.parent
+        snap = Env(funcs=self.funcs)
+        for names in reversed(frames):
+            snap.names.update(names)
+        return snap
+
+    def lookup(self, name: str) -> Optional[str]:
+        e = self
+        while e is not None:
+            if name in e.names:
+                return e.names[name]
+            e = e.parent
+        return None
+
+
+_ARITH = ('-', '*', '/', '%')
+_REL = ('<', '>', '<=', '>=')
+
+Facts = Dict[int, Tuple[Node, Tuple[Optional[str], bool]]]
+
+def type_of(node: Node, env: Env, memo: Facts | None = None) -> Optional[str]:
+    """Tipo do resultado caso a avaliação termine sem erro (None = desconhecido)."""
+    return expr_facts(node, env, memo)[0]
+
+def is_safe(node: Node, env: Env, memo: Facts | None = None) -> bool:
+    """A expressão é pura e com certeza não lança erro no ambiente env?"""
+    return expr_facts(node, env, memo)[1]
+
+def expr_facts(node: Node, env: Env, memo: Facts | None = None) -> Tuple[Optional[str], bool]:
+    """
+    (type_of, is_safe) de node, numa passada de baixo para cima. Quem consulta
+    várias subexpressões no mesmo env, com a árvore parada, passa o mesmo memo.
+    """
+    return bottom_up(node, lambda n, kids: _facts(n, kids, env), {} if memo is None else memo)
+
+def _facts(node: Node, kids: List[Tuple[Optional[str], bool]], env: Env) -> Tuple[Optional[str], bool]:
+    if isinstance(node, LITERALS):
+        return literal_type(node), True
+    if isinstance(node, Identifier):
+        t = env.lookup(node.value)
+        return t, t is not None
+    if isinstance(node, Read):
+        return 'number', False
+    if isinstance(node, FuncCall):
+        rt = env.funcs.get(node.value)
+        return (rt if rt != 'void' else None), False
+    if isinstance(node, UnOp):
+        t, safe = kids[0]
+        want = 'boolean' if node.value == '!' else 'number'
+        return want, node.value in ('+', '-', '!') and t == want and safe
+    if isinstance(node, BinOp):
+        (ta, sa), (tb, sb) = kids
+        op = node.value
+        if op == '+':
+            t = 'string' if 'string' in (ta, tb) else None if ta is None or tb is None else 'number'
+            ok = 'string' in (ta, tb) or (ta == tb == 'number')
+        elif op in _ARITH:
+            t = 'number'
+            ok = ta == tb == 'number' and (op not in ('/', '%') or nonzero(node.children[1]))
+        else:
+            t = 'boolean'
+            if op in _REL:
+                ok = ta == tb and ta in ('number', 'string')
+            elif op in ('===', '!=='):
+                ok = ta == tb
+            elif op in ('==', '!='):
+                ok = True
+            elif op in ('&&', '||'):
+                ok = ta == tb == 'boolean'
+            else:
+                ok = False
+        return t, sa and sb and ok
+    return None, False
+
+def nonzero(node: Node) -> bool:
+    """O divisor é comprovadamente diferente de zero?"""
+    return isinstance(node, IntVal) and node.value != 0
+
+
+class ScopedVisitor:
+    """
+    Percorre o programa na ordem de execução mantendo um Env estático igual ao
+    escopo que a SymbolTable terá em cada ponto. Subclasses sobrescrevem expr()
+    e podem devolver um nó novo para substituir a expressão.
+
+    Regras do interpretador espelhadas aqui:
+    - Block filho de Block abre escopo novo; corpos de if/while usam o escopo
+      corrente, então declarações neles ficam incertas depois do comando;
+    - VarDec cria a variável antes de avaliar o inicializador;
+    - corpo de função enxerga os parâmetros e, dinamicamente, o escopo de quem
+      chama (desconhecido aqui).
+    """
+    def __init__(self, root: Node):
+        self.root = root
+        self.funcs = unique_functions(root)
+        self.func: Optional[FuncDec] = None  # função cujo corpo está sendo visitado
+        self.cur_block: Optional[Node] = None  # bloco cujo statement está sendo visitado
+        self.top: int = 0                     # índice do statement de topo corrente
+
+    def visit(self) -> Node:
+        genv = Env(funcs={n: f.value for n, f in self.funcs.items()})
+        self.block(self.root, genv)
+        return self.root
+
+    def expr(self, node: Node, env: Env) -> Node:
+        return node
+
+    def _expr_slot(self, node: Node, i: int, env: Env):
+        node.children[i] = self.expr(node.children[i], env)
+
+    def block(self, blk: Node, env: Env):
+        outer, self.cur_block = self.cur_block, blk
+        for stmt in list(blk.children):
+            self.at(blk, stmt)
+            self.stmt(stmt, env)
+        self.cur_block = outer
+
+    def at(self, blk: Node, stmt: Node):
+        """Chamado antes de cada statement; mantém o índice do statement de topo."""
+        if blk is self.root:
+            self.top = blk.children.index(stmt)
+
+    def stmt(self, stmt: Node, env: Env):
+        if isinstance(stmt, Block):
+            self.block(stmt, env.child())
+        elif isinstance(stmt, VarDec):
+            name = stmt.children[0].value
+            env.declare(name, stmt.value if stmt.value != 'void' else None)
+            if len(stmt.children) == 2:
+                self._expr_slot(stmt, 1, env)
+        elif isinstance(stmt, Assignment):
+            self._expr_slot(stmt, 1, env)
+        elif isinstance(stmt, TempDec):
+            self._expr_slot(stmt, 1, env)
+            env.declare(stmt.children[0].value, type_of(stmt.children[1], env))
+        elif isinstance(stmt, (Print, Return)):
+            self._expr_slot(stmt, 0, env)
+        elif isinstance(stmt, FuncCall):
+            for i in range(len(stmt.children)):
+                self._expr_slot(stmt, i, env)
+        elif isinstance(stmt, If):
+            self._expr_slot(stmt, 0, env)
+            for branch in stmt.children[1:]:
+                self.block(branch, Env(env))
+            for name in shared_decls(stmt):
+                env.forget(name)
+        elif isinstance(stmt, While):
+            for name in shared_decls(stmt):
+                env.forget(name)
+            self._expr_slot(stmt, 0, env)
+            self.block(stmt.children[1], Env(env))
+        elif isinstance(stmt, FuncDec):
+            env.forget(stmt.children[0].value)
+            fenv = Env(Env(funcs=env.funcs))
+            for p in stmt.children[1:-1]:
+                fenv.declare(p.children[0].value, p.value if p.value != 'void' else None)
+            outer, self.func = self.func, stmt
+            self.block(stmt.children[-1], fenv)
+            self.func = outer
+
+
+def shared_decls(stmt: Node) -> Set[str]:
+    """Nomes declarados no escopo corrente pelos corpos de if/while (sem entrar em blocos aninhados)."""
+    names: Set[str] = set()
+    for body in stmt.children[1:] if isinstance(stmt, (If, While)) else []:
+        for ch in body.children:
+            if isinstance(ch, (VarDec, TempDec)):
+                names.add(ch.children[0].value)
+            elif isinstance(ch, (If, While)):
+                names |= shared_decls(ch)
+    return names
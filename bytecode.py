@@ -0,0 +1,477 @@
+from __future__ import annotations
+import hashlib
+import marshal
+import os
+import sys
+from array import array
+from typing import Dict, List, Optional, Set, Tuple
+from nodes import (
+    Node, IntVal, BoolVal, StringVal, Identifier, NoOp, Output, Fail, Print, Read, Assignment, VarDec, TempDec,
+    UnOp, BinOp, ShiftOp, UncheckedOp, If, While, CountedWhile, Block, Return, FuncDec, FuncCall, TailCall
+)
+from analysis import walk
+from resolve import Level, StaticScopes
+
+# ------- conjunto de instruções -------
+# Cada instrução é o opcode seguido de um número fixo de operandos inteiros
+# (ARITY), tudo no mesmo array('i'). Valores que não cabem em 32 bits vão para
+# o pool 'extras' e o operando é o índice.
+OPS: List[Tuple[str, int]] = [
+    ("CONST", 1),        # k: empilha a Variable do literal consts[k]
+    ("LOAD_FAST", 1),    # s: empilha a Variable do slot s do frame
+    ("STORE_FAST", 1),   # s: confere o tipo e copia o valor do topo para o slot s
+    ("DECLARE_FAST", 2), # s t: Variable nova de tipo TYPES[t], com o valor padrão, no slot s
+    ("INIT_FAST", 2),    # s t: confere o tipo do valor do topo e copia para o slot s
+    ("LOAD", 1),         # n: empilha st.get(names[n]) (a própria Variable)
+    ("STORE", 1),        # n: st.set(names[n], desempilha)
+    ("DECLARE", 2),      # n t: st.create_variable(names[n], TYPES[t])
+    ("INIT", 2),         # n t: confere o tipo do valor do topo e faz st.set
+    ("VOID_DECL", 1),    # n: erro de variável void
+    ("TEMP", 1),         # n: st.set_temp(names[n], desempilha)
+    ("POP", 0),
+    ("PRINT", 0),
+    ("READ", 0),
+    ("OUTPUT", 1),       # k: escreve o texto de consts[k]
+    ("FAIL", 1),         # k: erro com a mensagem de consts[k]
+    ("UNARY", 1),        # o: UNOPS[o]
+    ("BINARY", 1),       # o: BINOPS[o]
+    ("UNCHECKED", 1),    # o: BINOPS[o], operandos já provados number
+    ("SHIFT", 2),        # o k: x*2^k, x/2^k, x%2^k
+    ("JUMP", 1),         # destino
+    ("JUMP_IF_FALSE", 2),  # destino, c: desempilha a condição; c = 0 if, 1 while
+    ("ENTER", 0),        # abre escopo (bloco aninhado)
+    ("LEAVE", 0),        # fecha escopo
+    ("FOR_PREP", 2),     # a x: desempilha o limite e a Variable de i; range de i até limite + a, passo extras[x]
+    ("FOR_NEXT", 1),     # destino de saída; põe o próximo valor em i ou termina
+    ("FUNC", 1),         # f: registra a função codes[f]
+    ("CALL_BEGIN", 2),   # n argc: resolve names[n], confere aridade, prepara o escopo da chamada
+    ("ARG_DECL", 1),     # i: cria o parâmetro i no escopo da chamada
+    ("ARG", 1),          # i: desempilha o argumento i, confere o tipo e atribui
+    ("CALL", 0),         # executa a chamada preparada; empilha o retorno (ou None)
+    ("TAIL_CALL", 1),    # detach: troca o frame corrente pela chamada preparada
+    ("STMT_CALL", 0),    # depois de CALL em statement: retorno não-None encerra o bloco
+    ("RETURN", 0),
+    ("RETURN_NONE", 0),
+]
+OPCODES: Dict[str, int] = {name: i for i, (name, _) in enumerate(OPS)}
+ARITY: List[int] = [n for _, n in OPS]
+TYPES = ('number', 'boolean', 'string', 'void')
+UNOPS = ('+', '-', '!')
+BINOPS = ('+', '-', '*', '/', '%', '==', '!=', '===', '!==', '<', '>', '<=', '>=', '&&', '||')
+CONTEXTS = ('if(cond)', 'while(cond)')
+STOP_ADJUST = {'<': 0, '>': 0, '<=': 1, '>=': -1}
+
+MAGIC = "ts-bytecode-2"
+
+
+class CodeObject:
+    """
+    Código de uma função (ou do programa principal): instruções num array('i'),
+    pools de literais (consts: pares (tipo, valor)), nomes e operandos extras.
+
+    Layout do frame: slot_names tem um slot por declaração que fica fora da
+    SymbolTable, param_slots dá o slot de cada parâmetro (-1: na tabela) e
+    table diz se a chamada precisa de SymbolTable própria (sem ela, o escopo
+    da chamada é o de quem chama, que é o que uma tabela vazia enxergaria).
+    """
+    def __init__(self, name: str, public: str, rtype: str, params: List[Tuple[str, str]], memo: bool = False):
+        self.name = name
+        self.public = public       # nome nas mensagens de erro
+        self.rtype = rtype
+        self.params = params
+        self.memo = memo           # função pura com cache (purity.py)
+        self.code = array('i')
+        self.consts: List[tuple] = []
+        self.names: List[str] = []
+        self.extras: List[object] = []
+        self.slot_names: List[str] = []
+        self.param_slots: List[int] = []
+        self.table = True
+
+    def emit(self, op: str, *args: int) -> int:
+        """Acrescenta a instrução e devolve a posição dela."""
+        pos = len(self.code)
+        self.code.append(OPCODES[op])
+        self.code.extend(args)
+        return pos
+
+    def patch(self, pos: int, slot: int, value: int):
+        self.code[pos + 1 + slot] = value
+
+    def const(self, vtype: str, value) -> int:
+        return _intern(self.consts, (vtype, value))
+
+    def name_index(self, name: str) -> int:
+        return _intern(self.names, name)
+
+    def extra(self, value) -> int:
+        return _intern(self.extras, value)
+
+    def new_slot(self, name: str) -> int:
+        self.slot_names.append(name)
+        return len(self.slot_names) - 1
+
+    def to_tuple(self) -> tuple:
+        return (self.name, self.public, self.rtype, tuple(self.params), self.memo, self.code.tobytes(),
+                tuple(self.consts), tuple(self.names), tuple(self.extras), tuple(self.slot_names),
+                tuple(self.param_slots), self.table)
+
+    @staticmethod
+    def from_tuple(t: tuple) -> 'CodeObject':
+        name, public, rtype, params, memo, code, consts, names, extras, slot_names, param_slots, table = t
+        co = CodeObject(name, public, rtype, [tuple(p) for p in params], memo)
+        co.code.frombytes(code)
+        co.consts, co.names, co.extras = list(consts), list(names), list(extras)
+        co.slot_names, co.param_slots, co.table = list(slot_names), list(param_slots), table
+        return co
+
+
+def _intern(pool: list, value) -> int:
+    for i, v in enumerate(pool):
+        if type(v) is type(value) and v == value:
+            return i
+    pool.append(value)
+    return len(pool) - 1
+
+
+class Program:
+    """Código do programa principal (codes[0]) e das funções, serializável com marshal."""
+    def __init__(self, codes: List[CodeObject]):
+        self.codes = codes
+
+    def dumps(self) -> bytes:
+        return marshal.dumps((MAGIC, tuple(c.to_tuple() for c in self.codes)))
+
+    @staticmethod
+    def loads(data: bytes) -> 'Program':
+        magic, codes = marshal.loads(data)
+        if magic != MAGIC:
+            raise Exception(f"[Bytecode] Formato desconhecido: {magic}")
+        return Program([CodeObject.from_tuple(t) for t in codes])
+
+
+def cache_path(cache_dir: str, magic: str, source: str, options: List[str]) -> str:
+    """Arquivo do programa compilado (--bc-cache): hash do formato, das opções e do fonte."""
+    h = hashlib.sha256()
+    h.update(f"{magic}:{sys.version_info[:2]}:{' '.join(options)}\0".encode())
+    h.update(source.encode())
+    return os.path.join(cache_dir, h.hexdigest() + ".tsb")
+
+
+class BytecodeCompiler(StaticScopes):
+    """
+    Compila a AST (já otimizada) para o bytecode da VM de pilha (vm.py).
+    Cada FuncDec vira um CodeObject; o corpo do programa é codes[0].
+
+    Reduction é compilada como o While original que ela guarda (mesmo
+    resultado, sem a forma fechada); CountedWhile usa FOR_PREP/FOR_NEXT.
+
+    Variáveis vão para slots do frame (LOAD_FAST/STORE_FAST) quando nenhuma
+    busca por nome pode encontrá-las: toda leitura e escrita na função resolve
+    pelos blocos para uma declaração que com certeza já rodou, o nome nunca é
+    redeclarado no mesmo escopo e nenhuma função o lê de quem a chamou
+    (escopo dinâmico). As demais continuam na SymbolTable. A compilação roda
+    duas vezes: a primeira só descobre quais nomes ficam na tabela. Os
+    escopos são os de resolve.StaticScopes; um nome que não resolve só vai
+    para a tabela em vez de levantar Unsupported.
+    """
+
+    @staticmethod
+    def compile(root: Node) -> Program:
+        probe = BytecodeCompiler(root, None)
+        probe.program()
+        named = {key: bad | probe.free for key, bad in probe.bad.items()}
+        return BytecodeCompiler(root, named).program()
+
+    def __init__(self, root: Node, named: Optional[Dict[int, Set[str]]]):
+        self.root = root
+        self.named = named  # por função (id da FuncDec): nomes que ficam na SymbolTable; None = 1ª passada
+        # funções e alvos de chamada são sempre buscados por nome (CALL_BEGIN)
+        self.funcnames = {n.children[0].value if isinstance(n, FuncDec) else n.value
+                          for n in walk(root) if isinstance(n, (FuncDec, FuncCall))}
+        self.codes: List[CodeObject] = []
+        self.bad: Dict[int, Set[str]] = {}  # nomes com declaração ou uso que não resolve estaticamente
+        self.free: Set[str] = set()         # nomes lidos ou escritos fora da própria declaração
+        self.key = 0
+        self.co: Optional[CodeObject] = None
+        self.scope: Optional[Level] = None
+
+    def program(self) -> Program:
+        main = CodeObject("<main>", "<main>", "void", [])
+        self.codes.append(main)
+        self.enter(id(self.root), main)
+        self.block(main, self.root.children)
+        main.emit("RETURN_NONE")
+        return Program(self.codes)
+
+    def enter(self, key: int, co: CodeObject):
+        """Começa uma função (ou o programa principal): escopo estático novo."""
+        self.key, self.co = key, co
+        self.bad.setdefault(key, set())
+        self.scope = self.level(None)
+
+    # ------- layout do frame -------
+    def slotted(self, name: str) -> bool:
+        if name in self.funcnames:
+            return False
+        return self.named is None or name not in self.named[self.key]
+
+    def new_local(self, name: str, vtype: str, level: Level) -> int:
+        """Slot da declaração ou -1 (fica na tabela)."""
+        return self.co.new_slot(name) if vtype != 'void' and self.slotted(name) else -1
+
+    def uncertain(self, name: str) -> Tuple[int, None]:
+        self.bad[self.key].add(name)
+        return -1, None
+
+    def dynamic(self, name: str) -> Tuple[int, None]:
+        self.free.add(name)
+        return -1, None
+
+    def redeclared(self, name: str):
+        self.bad[self.key].add(name)
+
+    def slot(self, name: str) -> int:
+        return self.lookup(name, self.scope)[0]
+
+    def needs_table(self, stmts: List[Node]) -> bool:
+        """O escopo destes statements declara algo por nome (VarDec fora de slot, TempDec, FuncDec)?"""
+        if self.named is None:
+            return True
+        for d in _level_decls(stmts):
+            if not isinstance(d, VarDec) or (d.value != 'void' and not self.slotted(d.children[0].value)):
+                return True
+        return False
+
+    def load(self, co: CodeObject, name: str):
+        slot = self.slot(name)
+        if slot >= 0:
+            co.emit("LOAD_FAST", slot)
+        else:
+            co.emit("LOAD", co.name_index(name))
+
+    # ------- statements -------
+    def block(self, co: CodeObject, stmts: List[Node]):
+        for s in stmts:
+            self.stmt(co, s)
+
+    def stmt(self, co: CodeObject, s: Node):
+        if isinstance(s, Block):
+            if s.scoped:
+                outer = self.scope
+                self.scope = self.level(outer)
+                table = self.needs_table(s.children)
+                if table:
+                    co.emit("ENTER")
+                self.block(co, s.children)
+                if table:
+                    co.emit("LEAVE")
+                self.scope = outer
+            else:
+                self.block(co, s.children)
+        elif isinstance(s, VarDec):
+            name = s.children[0].value
+            if s.value == 'void' and not s.is_function:
+                co.emit("VOID_DECL", co.name_index(name))
+                return
+            t = TYPES.index(s.value)
+            slot = self.declare(name, s.value, self.scope)
+            if slot >= 0:
+                co.emit("DECLARE_FAST", slot, t)
+                if len(s.children) == 2:
+                    self.expr(co, s.children[1])
+                    co.emit("INIT_FAST", slot, t)
+                return
+            n = co.name_index(name)
+            co.emit("DECLARE", n, t)
+            if len(s.children) == 2:
+                self.expr(co, s.children[1])
+                co.emit("INIT", n, t)
+        elif isinstance(s, Assignment):
+            self.expr(co, s.children[1])
+            name = s.children[0].value
+            slot = self.slot(name)
+            if slot >= 0:
+                co.emit("STORE_FAST", slot)
+            else:
+                co.emit("STORE", co.name_index(name))
+        elif isinstance(s, TempDec):
+            self.expr(co, s.children[1])
+            co.emit("TEMP", co.name_index(s.children[0].value))
+        elif isinstance(s, Print):
+            self.expr(co, s.children[0])
+            co.emit("PRINT")
+        elif isinstance(s, Output):
+            co.emit("OUTPUT", co.const('string', s.value))
+        elif isinstance(s, Fail):
+            co.emit("FAIL", co.const('string', s.value))
+        elif isinstance(s, Return):
+            if isinstance(s.children[0], TailCall):
+                self.call(co, s.children[0])
+                co.emit("TAIL_CALL", int(s.children[0].detach))
+            else:
+                self.expr(co, s.children[0])
+                co.emit("RETURN")
+        elif isinstance(s, FuncCall):
+            self.call(co, s)
+            co.emit("CALL")
+            co.emit("STMT_CALL")
+        elif isinstance(s, If):
+            self.expr(co, s.children[0])
+            jf = co.emit("JUMP_IF_FALSE", 0, 0)
+            lv = self.scope
+            shared = self.shared(s, lv)
+            before = dict(lv.names), set(lv.maybe)
+            self.block(co, s.children[1].children)
+            lv.names, lv.maybe = dict(before[0]), set(before[1])
+            if len(s.children) == 3:
+                j = co.emit("JUMP", 0)
+                co.patch(jf, 0, len(co.code))
+                self.block(co, s.children[2].children)
+                co.patch(j, 0, len(co.code))
+            else:
+                co.patch(jf, 0, len(co.code))
+            lv.names, lv.maybe = before
+            self.settle(shared, self.scope)
+        elif isinstance(s, CountedWhile):
+            cond = s.children[0]
+            self.load(co, s.ind)  # i é buscado antes do limite, como no evaluate
+            self.expr(co, cond.children[1])
+            co.emit("FOR_PREP", STOP_ADJUST[cond.value], co.extra(s.step))
+            top = co.emit("FOR_NEXT", 0)
+            shared = self.shared(s, self.scope)
+            self.scope.maybe |= shared  # numa volta seguinte, a declaração da volta anterior já existe
+            self.block(co, s.children[1].children[:-1])
+            self.settle(shared, self.scope)
+            co.emit("JUMP", top)
+            co.patch(top, 0, len(co.code))
+        elif isinstance(s, While):
+            shared = self.shared(s, self.scope)
+            self.scope.maybe |= shared
+            top = len(co.code)
+            self.expr(co, s.children[0])
+            jf = co.emit("JUMP_IF_FALSE", 0, 1)
+            self.block(co, s.children[1].children)
+            self.settle(shared, self.scope)
+            co.emit("JUMP", top)
+            co.patch(jf, 0, len(co.code))
+        elif isinstance(s, FuncDec):
+            co.emit("FUNC", self.function(s))
+        elif isinstance(s, NoOp):
+            pass
+        else:
+            raise Exception(f"[Bytecode] Statement não suportado: {type(s).__name__}")
+
+    def function(self, f: FuncDec) -> int:
+        params = [(p.children[0].value, p.value) for p in f.children[1:-1]]
+        fco = CodeObject(f.children[0].value, f.public, f.value, params, f.memo is not None)
+        index = len(self.codes)
+        self.codes.append(fco)
+        outer = self.key, self.co, self.scope
+        self.enter(id(f), fco)
+        fco.param_slots = [self.declare(name, vtype, self.scope) for name, vtype in params]
+        body = f.children[-1].children
+        fco.table = self.named is None or -1 in fco.param_slots or self.needs_table(body)
+        self.block(fco, body)
+        fco.emit("RETURN_NONE")
+        self.key, self.co, self.scope = outer
+        return index
+
+    # ------- expressões -------
+    def expr(self, co: CodeObject, e: Node):
+        if isinstance(e, IntVal):
+            co.emit("CONST", co.const('number', e.value))
+        elif isinstance(e, BoolVal):
+            co.emit("CONST", co.const('boolean', e.value))
+        elif isinstance(e, StringVal):
+            co.emit("CONST", co.const('string', e.value))
+        elif isinstance(e, Identifier):
+            self.load(co, e.value)
+        elif isinstance(e, Read):
+            co.emit("READ")
+        elif isinstance(e, UnOp):
+            self.expr(co, e.children[0])
+            co.emit("UNARY", operator_index(UNOPS, e.value))
+        elif isinstance(e, ShiftOp):
+            self.expr(co, e.children[0])
+            co.emit("SHIFT", operator_index(BINOPS, e.value), e.k)
+        elif isinstance(e, BinOp):
+            self.expr(co, e.children[0])
+            self.expr(co, e.children[1])
+            co.emit("UNCHECKED" if isinstance(e, UncheckedOp) else "BINARY", operator_index(BINOPS, e.value))
+        elif isinstance(e, FuncCall):
+            self.call(co, e)
+            co.emit("CALL")
+        else:
+            raise Exception(f"[Bytecode] Expressão não suportada: {type(e).__name__}")
+
+    def call(self, co: CodeObject, c: FuncCall):
+        """Prepara a chamada; o chamador emite CALL ou TAIL_CALL em seguida."""
+        co.emit("CALL_BEGIN", co.name_index(c.value), len(c.children))
+        for i, arg in enumerate(c.children):
+            co.emit("ARG_DECL", i)
+            self.expr(co, arg)
+            co.emit("ARG", i)
+
+
+def _level_decls(stmts: List[Node]) -> List[Node]:
+    """Declarações que caem no escopo destes statements (corpos de if/while incluídos, blocos aninhados não)."""
+    out: List[Node] = []
+    for s in stmts:
+        if isinstance(s, (VarDec, TempDec, FuncDec)):
+            out.append(s)
+        elif isinstance(s, (If, While)):
+            for body in s.children[1:]:
+                out.extend(_level_decls(body.children))
+        elif isinstance(s, Block) and not s.scoped:
+            out.extend(_level_decls(s.children))
+    return out
+
+
+def operator_index(table: tuple, op: str) -> int:
+    if op not in table:
+        raise Exception(f"[Bytecode] Operador não suportado: {op}")
+    return table.index(op)
+
+
+def disassemble(program: Program) -> str:
+    """Listagem legível do bytecode (para depuração)."""
+    lines: List[str] = []
+    for index, co in enumerate(program.codes):
+        params = ", ".join(f"{n}: {t}" for n, t in co.params)
+        lines.append(f"#{index} {co.name}({params}): {co.rtype}" + (" [memo]" if co.memo else "")
+                     + (f" [{len(co.slot_names)} slots]" if co.slot_names else "") + ("" if co.table else " [sem tabela]"))
+        pc = 0
+        code = co.code
+        while pc < len(code):
+            op = code[pc]
+            name, arity = OPS[op]
+            args = list(code[pc + 1:pc + 1 + arity])
+            lines.append(f"  {pc:5d} {name:<14}{' '.join(str(a) for a in args):<12}{_comment(co, program, name, args)}".rstrip())
+            pc += 1 + arity
+    return "\n".join(lines)
+
+
+def _comment(co: CodeObject, program: Program, name: str, args: List[int]) -> str:
+    if name in ("CONST", "OUTPUT", "FAIL"):
+        vtype, value = co.consts[args[0]]
+        return f"; {value!r}" if vtype == 'string' else f"; {str(value).lower() if vtype == 'boolean' else value}"
+    if name in ("LOAD", "STORE", "TEMP", "VOID_DECL", "CALL_BEGIN"):
+        return f"; {co.names[args[0]]}"
+    if name in ("DECLARE", "INIT"):
+        return f"; {co.names[args[0]]}: {TYPES[args[1]]}"
+    if name in ("LOAD_FAST", "STORE_FAST"):
+        return f"; {co.slot_names[args[0]]}"
+    if name in ("DECLARE_FAST", "INIT_FAST"):
+        return f"; {co.slot_names[args[0]]}: {TYPES[args[1]]}"
+    if name == "UNARY":
+        return f"; {UNOPS[args[0]]}"
+    if name in ("BINARY", "UNCHECKED", "SHIFT"):
+        return f"; {BINOPS[args[0]]}"
+    if name == "JUMP_IF_FALSE":
+        return f"; {CONTEXTS[args[1]]}"
+    if name == "FOR_PREP":
+        return f"; passo {co.extras[args[1]]}"
+    if name == "FUNC":
+        return f"; {program.codes[args[0]].name}"
+    return ""
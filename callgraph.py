@@ -0,0 +1,126 @@
+from __future__ import annotations
+from typing import Dict, List, Set
+from nodes import Node, Identifier, Assignment, VarDec, FuncDec, FuncCall
+from analysis import walk
+
+
+class CallGraph:
+    """
+    Grafo de chamadas do programa (funções só existem no escopo global).
+
+    edges[f]   : funções chamadas (ou referenciadas por nome) no corpo de f
+    roots      : funções usadas pelos statements de topo
+    reachable  : funções alcançáveis a partir de roots
+    sccs       : componentes fortemente conexas (Tarjan), em ordem topológica
+                 reversa (callees antes dos callers)
+    recursive  : funções que participam de algum ciclo (inclui auto-recursão)
+    """
+    def __init__(self, root: Node):
+        self.funcs: Dict[str, FuncDec] = {}
+        self.edges: Dict[str, Set[str]] = {}
+        self.roots: Set[str] = set()
+        for stmt in root.children:
+            if isinstance(stmt, FuncDec):
+                name = stmt.children[0].value
+                self.funcs.setdefault(name, stmt)
+                self.edges.setdefault(name, set()).update(CallGraph._uses(stmt.children[-1]))
+            else:
+                self.roots.update(CallGraph._uses(stmt))
+        for name in self.edges:
+            self.edges[name] &= self.funcs.keys()
+        self.roots &= self.funcs.keys()
+        self.reachable = self._reach(self.roots)
+        self.sccs = self._tarjan()
+        self.recursive: Set[str] = set()
+        for comp in self.sccs:
+            if len(comp) > 1 or comp[0] in self.edges[comp[0]]:
+                self.recursive.update(comp)
+
+    @staticmethod
+    def _uses(node: Node) -> Set[str]:
+        # chamadas e qualquer outro uso do nome (log(f), x = f, ...) mantêm a função viva
+        names: Set[str] = set()
+        for n in walk(node):
+            if isinstance(n, (FuncCall, Identifier)):
+                names.add(n.value)
+        return names
+
+    def _reach(self, start: Set[str]) -> Set[str]:
+        seen: Set[str] = set()
+        stack = list(start)
+        while stack:
+            f = stack.pop()
+            if f in seen:
+                continue
+            seen.add(f)
+            stack.extend(self.edges.get(f, ()))
+        return seen
+
+    def _tarjan(self) -> List[List[str]]:
+        index: Dict[str, int] = {}
+        low: Dict[str, int] = {}
+        on_stack: Set[str] = set()
+        stack: List[str] = []
+        sccs: List[List[str]] = []
+        for start in self.funcs:
+            if start in index:
+                continue
+            # versão iterativa para não estourar a pilha do Python
+            work = [(start, iter(sorted(self.edges[start])))]
+            index[start] = low[start] = len(index)
+            stack.append(start)
+            on_stack.add(start)
+            while work:
+                v, it = work[-1]
+                w = next(it, None)
+                if w is not None:
+                    if w not in index:
+                        index[w] = low[w] = len(index)
+                        stack.append(w)
+                        on_stack.add(w)
+                        work.append((w, iter(sorted(self.edges[w]))))
+                    elif w in on_stack:
+                        low[v] = min(low[v], index[w])
+                    continue
+                work.pop()
+                if work:
+                    low[work[-1][0]] = min(low[work[-1][0]], low[v])
+                if low[v] == index[v]:
+                    comp = []
+                    while True:
+                        w = stack.pop()
+                        on_stack.discard(w)
+                        comp.append(w)
+                        if w == v:
+                            break
+                    sccs.append(comp)
+        return sccs
+
+
+class FunctionPruner:
+    """Remove FuncDecs que nenhum statement de topo alcança pelo grafo de chamadas."""
+    removed: List[str] = []
+
+    @staticmethod
+    def run(root: Node) -> Node:
+        FunctionPruner.removed = []
+        graph = CallGraph(root)
+        # nomes repetidos ou compartilhados com variáveis podem gerar erro de
+        # redeclaração ao registrar a função; nesses casos a FuncDec fica
+        counts: Dict[str, int] = {}
+        for n in walk(root):
+            if isinstance(n, FuncDec):
+                name = n.children[0].value
+                counts[name] = counts.get(name, 0) + 1
+            elif isinstance(n, (VarDec, Assignment)):
+                counts[n.children[0].value] = counts.get(n.children[0].value, 0) + 2
+        kept: List[Node] = []
+        for stmt in root.children:
+            if isinstance(stmt, FuncDec):
+                name = stmt.children[0].value
+                if name not in graph.reachable and counts[name] == 1:
+                    FunctionPruner.removed.append(name)
+                    continue
+            kept.append(stmt)
+        root.children = kept
+        return root
@@ -0,0 +1,456 @@
+from __future__ import annotations
+import operator
+from typing import Any, Callable, Dict, List
+from nodes import (
+    Node, IntVal, BoolVal, StringVal, Identifier, Print, Assignment, VarDec, TempDec, UnOp, BinOp, ShiftOp,
+    UncheckedOp, If, While, CountedWhile, Block, Return, FuncDec, FuncCall, TailCall, PendingCall,
+    TRUE, FALSE, V_bool, V_num, V_str, ensure_type, str_value_of, int_div, int_mod, shift_right
+)
+from symbol_table import SymbolTable, Variable
+from analysis import recursion_room
+
+# closure compilada: recebe o escopo corrente e devolve o que o evaluate devolveria
+Code = Callable[[SymbolTable], Any]
+
+_REL: Dict[str, Callable[[Any, Any], bool]] = {
+    '<': operator.lt, '>': operator.gt, '<=': operator.le, '>=': operator.ge,
+}
+_STOP = {'<': 0, '>': 0, '<=': 1, '>=': -1}
+
+
+class ClosureCompiler:
+    """
+    Motor alternativo ao Node.evaluate (--engine=closure): a AST é compilada
+    uma vez em closures Python aninhadas. Operador, nomes, tipos declarados e
+    as closures dos filhos ficam presos em tempo de compilação, então cada
+    execução não relê self.value/self.children nem percorre a cadeia de
+    comparações de operador do BinOp.
+
+    A semântica é a do evaluate, inclusive mensagens de erro, ordem de
+    avaliação e o Identifier que devolve a própria Variable (BinOp lê o valor
+    da esquerda depois de avaliar a direita). Nós sem forma compilada (Read,
+    Output, Fail, Reduction, NoOp) caem no evaluate da própria árvore.
+
+    Corpos de função ficam em FuncDec.compiled; PendingCall.run usa o corpo
+    compilado quando existe.
+    """
+    compiled: int = 0  # nós compilados (os demais usam o evaluate)
+
+    @staticmethod
+    def compile(root: Node) -> Code:
+        ClosureCompiler.compiled = 0
+        with recursion_room(root, 4):
+            return ClosureCompiler._block(root.children)
+
+    @staticmethod
+    def _node(node: Node) -> Code:
+        method = _COMPILERS.get(type(node))
+        if method is None:
+            return node.evaluate
+        ClosureCompiler.compiled += 1
+        return method(node)
+
+    # ------- literais e nomes -------
+    # a Variable de um literal já é criada uma vez, na construção do nó
+    @staticmethod
+    def _literal(node: Node) -> Code:
+        v = node.var
+        return lambda st: v
+
+    @staticmethod
+    def _ident(node: Identifier) -> Code:
+        name = node.value
+        return lambda st: st.get(name)
+
+    # ------- statements simples -------
+    @staticmethod
+    def _print(node: Print) -> Code:
+        expr = ClosureCompiler._node(node.children[0])
+        def run(st):
+            print(str_value_of(expr(st)))
+        return run
+
+    @staticmethod
+    def _assign(node: Assignment) -> Code:
+        name = node.children[0].value
+        expr = ClosureCompiler._node(node.children[1])
+        def run(st):
+            st.set(name, expr(st))
+        return run
+
+    @staticmethod
+    def _vardec(node: VarDec) -> Code:
+        name = node.children[0].value
+        vtype = node.value
+        if vtype == 'void' and not node.is_function:
+            def fail(st):
+                raise Exception(f"[Semantic] Variável '{name}' não pode ter tipo void")
+            return fail
+        if len(node.children) == 1:
+            return lambda st: st.create_variable(name, vtype)
+        init = ClosureCompiler._node(node.children[1])
+        def run(st):
+            st.create_variable(name, vtype)
+            v = init(st)
+            if v.type != vtype:
+                raise Exception(f"[Semantic] Tipos incompatíveis em inicialização de '{name}': esperado {vtype}, recebeu {v.type}")
+            st.set(name, v)
+        return run
+
+    @staticmethod
+    def _temp(node: TempDec) -> Code:
+        name = node.children[0].value
+        expr = ClosureCompiler._node(node.children[1])
+        def run(st):
+            st.set_temp(name, expr(st))
+        return run
+
+    @staticmethod
+    def _return(node: Return) -> Code:
+        return ClosureCompiler._node(node.children[0])
+
+    # ------- operadores -------
+    @staticmethod
+    def _unop(node: UnOp) -> Code:
+        op = node.value
+        child = ClosureCompiler._node(node.children[0])
+        if op == '+':
+            def run(st):
+                v = child(st)
+                ensure_type(v, "number", "unário +")
+                return V_num(+v.value)
+        elif op == '-':
+            def run(st):
+                v = child(st)
+                ensure_type(v, "number", "unário -")
+                return V_num(-v.value)
+        elif op == '!':
+            def run(st):
+                v = child(st)
+                ensure_type(v, "boolean", "unário !")
+                return V_bool(not v.value)
+        else:
+            def run(st):
+                child(st)
+                raise Exception(f"[Semantic] Operador unário inválido: {op}")
+        return run
+
+    @staticmethod
+    def _binop(node: BinOp) -> Code:
+        op = node.value
+        left = ClosureCompiler._node(node.children[0])
+        right = ClosureCompiler._node(node.children[1])
+
+        def arith_error(a, b):
+            return Exception(f"[Semantic] Operação aritmética requer 'number', recebeu {a.type} {op} {b.type}")
+
+        k = node.children[1]
+        if isinstance(k, IntVal) and (op in ('+', '-', '*') or op in _REL or (op == '%' and k.value != 0)):
+            # lado direito literal number: sem a chamada nem as checagens dele
+            return ClosureCompiler._binop_const(op, left, k.value, arith_error)
+
+        if op == '+':
+            def run(st):
+                a = left(st)
+                b = right(st)
+                if a.type == 'string' or b.type == 'string':
+                    return V_str(str_value_of(a) + str_value_of(b))
+                if a.type != 'number' or b.type != 'number':
+                    raise arith_error(a, b)
+                return Variable("number", a.value + b.value)
+        elif op in ('-', '*'):
+            fn = operator.sub if op == '-' else operator.mul
+            def run(st):
+                a = left(st)
+                b = right(st)
+                if a.type != 'number' or b.type != 'number':
+                    raise arith_error(a, b)
+                return Variable("number", fn(a.value, b.value))
+        elif op == '/':
+            def run(st):
+                a = left(st)
+                b = right(st)
+                if a.type != 'number' or b.type != 'number':
+                    raise arith_error(a, b)
+                return V_num(int_div(a.value, b.value))
+        elif op == '%':
+            def run(st):
+                a = left(st)
+                b = right(st)
+                if a.type != 'number' or b.type != 'number':
+                    raise arith_error(a, b)
+                return Variable("number", int_mod(a.value, b.value))
+        elif op in _REL:
+            fn = _REL[op]
+            def run(st):
+                a = left(st)
+                b = right(st)
+                if a.type != b.type or a.type not in ('number', 'string'):
+                    raise Exception(f"[Semantic] Operador relacional '{op}' requer tipos iguais number/number ou string/string; recebeu {a.type} e {b.type}")
+                return TRUE if fn(a.value, b.value) else FALSE
+        elif op in ('===', '!=='):
+            same = op == '==='
+            def run(st):
+                a = left(st)
+                b = right(st)
+                if a.type != b.type:
+                    raise Exception(f"[Semantic] Tipos incompatíveis em comparação estrita: {a.type} {op} {b.type}")
+                return V_bool((a.value == b.value) == same)
+        elif op in ('==', '!='):
+            same = op == '=='
+            def run(st):
+                a = left(st)
+                b = right(st)
+                if a.type != b.type:
+                    return V_bool(not same)
+                return V_bool((a.value == b.value) == same)
+        elif op in ('&&', '||'):
+            both = op == '&&'
+            def run(st):
+                a = left(st)
+                b = right(st)
+                if a.type != 'boolean' or b.type != 'boolean':
+                    raise Exception(f"[Semantic] Operadores lógicos requerem boolean: recebeu {a.type} {op} {b.type}")
+                return V_bool(a.value and b.value if both else a.value or b.value)
+        else:
+            def run(st):
+                left(st)
+                right(st)
+                raise Exception(f"[Semantic] Operador inválido: {op}")
+        return run
+
+    @staticmethod
+    def _binop_const(op: str, left: Code, c: int, arith_error) -> Code:
+        """BinOp com IntVal à direita ('+', '-', '*', '%' e relacionais)."""
+        kv = V_num(c)
+        if op == '+':
+            text = str(c)
+            def run(st):
+                a = left(st)
+                if a.type == 'string':
+                    return V_str(a.value + text)
+                if a.type != 'number':
+                    raise arith_error(a, kv)
+                return Variable("number", a.value + c)
+        elif op in _REL:
+            fn = _REL[op]
+            def run(st):
+                a = left(st)
+                if a.type != 'number':
+                    raise Exception(f"[Semantic] Operador relacional '{op}' requer tipos iguais number/number ou string/string; recebeu {a.type} e number")
+                return TRUE if fn(a.value, c) else FALSE
+        else:
+            fn = {'-': operator.sub, '*': operator.mul, '%': operator.mod}[op]
+            def run(st):
+                a = left(st)
+                if a.type != 'number':
+                    raise arith_error(a, kv)
+                return Variable("number", fn(a.value, c))
+        return run
+
+    @staticmethod
+    def _shift(node: ShiftOp) -> Code:
+        op, k, mask = node.value, node.k, node.mask
+        left = ClosureCompiler._node(node.children[0])
+        def run(st):
+            a = left(st)
+            if a.type != 'number':
+                raise Exception(f"[Semantic] Operação aritmética requer 'number', recebeu {a.type} {op} number")
+            v = a.value
+            if op == '*': return V_num(v << k)
+            if op == '%': return V_num(v & mask)
+            return V_num(shift_right(v, k))
+        return run
+
+    @staticmethod
+    def _unchecked(node: UncheckedOp) -> Code:
+        op = node.value
+        left = ClosureCompiler._node(node.children[0])
+        right = ClosureCompiler._node(node.children[1])
+        fn = {'+': operator.add, '-': operator.sub, '*': operator.mul, '%': operator.mod}.get(op)
+        if fn is None:  # '/'
+            def run(st):
+                a = left(st)
+                b = right(st).value
+                return Variable("number", int(a.value / b))
+        else:
+            def run(st):
+                a = left(st)
+                b = right(st).value
+                return Variable("number", fn(a.value, b))
+        return run
+
+    # ------- controle de fluxo -------
+    @staticmethod
+    def _block(children: List[Node]) -> Code:
+        codes = []
+        for ch in children:
+            code = ClosureCompiler._node(ch)
+            if isinstance(ch, Block) and ch.scoped:
+                code = _scoped(ch, code)
+            codes.append(code)
+        if not codes:
+            return lambda st: None
+        if len(codes) == 1:
+            return codes[0]
+        # statements devolvem None ou a Variable de um return
+        def run(st):
+            for code in codes:
+                r = code(st)
+                if r is not None:
+                    return r
+            return None
+        return run
+
+    @staticmethod
+    def _nested(node: Block) -> Code:
+        return ClosureCompiler._block(node.children)
+
+    @staticmethod
+    def _if(node: If) -> Code:
+        cond = ClosureCompiler._node(node.children[0])
+        then = ClosureCompiler._node(node.children[1])
+        other = ClosureCompiler._node(node.children[2]) if len(node.children) == 3 else None
+        def run(st):
+            c = cond(st)
+            if c.type != 'boolean':
+                ensure_type(c, 'boolean', 'if(cond)')
+            if c.value:
+                return then(st)
+            if other is not None:
+                return other(st)
+            return None
+        return run
+
+    @staticmethod
+    def _while(node: While) -> Code:
+        cond = ClosureCompiler._node(node.children[0])
+        body = ClosureCompiler._node(node.children[1])
+        def run(st):
+            while True:
+                c = cond(st)
+                if c.type != 'boolean':
+                    ensure_type(c, 'boolean', 'while(cond)')
+                if not c.value:
+                    return None
+                r = body(st)
+                if r is not None:
+                    return r
+        return run
+
+    @staticmethod
+    def _counted(node: CountedWhile) -> Code:
+        cond = node.children[0]
+        ind, step = node.ind, node.step
+        bound = ClosureCompiler._node(cond.children[1])
+        adjust = _STOP[cond.value]
+        body = ClosureCompiler._block(node.children[1].children[:-1])
+        def run(st):
+            iv = st.get(ind)
+            stop = bound(st).value + adjust
+            v = None
+            for v in range(iv.value, stop, step):
+                iv.value = v
+                r = body(st)
+                if r is not None:
+                    return r
+            if v is not None:
+                iv.value = v + step
+            return None
+        return run
+
+    # ------- funções -------
+    @staticmethod
+    def _funcdec(node: FuncDec) -> Code:
+        name = node.children[0].value
+        rtype = node.value
+        node.compiled = ClosureCompiler._nested(node.children[-1])
+        node.signature = [(p.children[0].value, p.value) for p in node.children[1:-1]]
+        return lambda st: st.create_function(name, rtype, node)
+
+    @staticmethod
+    def _bind(node: FuncCall) -> Callable[[SymbolTable], tuple]:
+        fname = node.value
+        args = [ClosureCompiler._node(a) for a in node.children]
+        nargs = len(args)
+        def bind(st):
+            fvar = st.get(fname)
+            if not getattr(fvar, "is_function", False):
+                raise Exception(f"[Semantic] '{fname}' não é uma função")
+            fnode = fvar.value
+            params = fnode.signature
+            if len(params) != nargs:
+                raise Exception(f"[Semantic] Chamada de '{fname}' com {nargs} argumentos; esperado {len(params)}")
+            call_st = SymbolTable(parent=st)
+            for (pname, ptype), arg in zip(params, args):
+                call_st.create_variable(pname, ptype)
+                aval = arg(st)
+                if aval.type != ptype:
+                    raise Exception(f"[Semantic] Tipo inválido no argumento '{pname}' de '{fnode.public}': esperado {ptype}, recebeu {aval.type}")
+                call_st.set(pname, aval)
+            return fnode, call_st
+        return bind
+
+    @staticmethod
+    def _call(node: FuncCall) -> Code:
+        bind = ClosureCompiler._bind(node)
+        def run(st):
+            fnode, call_st = bind(st)
+            memo = fnode.memo
+            if memo is not None:
+                key = tuple(call_st.get(p).value for p, _ in fnode.signature)
+                r = memo.get(key)
+                if r is not None:
+                    return r
+            r = fnode.compiled(call_st)
+            if isinstance(r, PendingCall):
+                r = r.run(call_st)
+            r = FuncCall.check_return(fnode.public, fnode.value, r)
+            if memo is not None:
+                memo.put(key, r)
+            return r
+        return run
+
+    @staticmethod
+    def _tailcall(node: TailCall) -> Code:
+        bind = ClosureCompiler._bind(node)
+        detach = node.detach
+        def run(st):
+            fnode, call_st = bind(st)
+            return PendingCall(fnode.public, fnode, call_st, detach)
+        return run
+
+
+def _scoped(blk: Block, code: Code) -> Code:
+    """Bloco aninhado com escopo próprio: frame do pool do bloco, como Block.evaluate."""
+    frames = blk.frames
+    def run(st):
+        inner = frames.pop().reset(st) if frames else SymbolTable(parent=st)
+        r = code(inner)
+        frames.append(inner)
+        return r
+    return run
+
+
+_COMPILERS: Dict[type, Callable[[Node], Code]] = {
+    IntVal: ClosureCompiler._literal,
+    BoolVal: ClosureCompiler._literal,
+    StringVal: ClosureCompiler._literal,
+    Identifier: ClosureCompiler._ident,
+    Print: ClosureCompiler._print,
+    Assignment: ClosureCompiler._assign,
+    VarDec: ClosureCompiler._vardec,
+    TempDec: ClosureCompiler._temp,
+    Return: ClosureCompiler._return,
+    UnOp: ClosureCompiler._unop,
+    BinOp: ClosureCompiler._binop,
+    ShiftOp: ClosureCompiler._shift,
+    UncheckedOp: ClosureCompiler._unchecked,
+    Block: ClosureCompiler._nested,
+    If: ClosureCompiler._if,
+    While: ClosureCompiler._while,
+    CountedWhile: ClosureCompiler._counted,
+    FuncDec: ClosureCompiler._funcdec,
+    FuncCall: ClosureCompiler._call,
+    TailCall: ClosureCompiler._tailcall,
+}
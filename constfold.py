@@ -0,0 +1,105 @@
+from __future__ import annotations
+from typing import Dict, List
+from nodes import (
+    Node, Identifier, UnOp, BinOp, Block, VarDec, Assignment, FuncDec
+)
+from symbol_table import SymbolTable
+from analysis import is_literal, literal_of, literal_type, subtree_indices, walk, transform
+
+
+class ConstFolder:
+    """
+    Dobra de constantes + propagação de constantes.
+
+    - Dobra: UnOp/BinOp cujos operandos são literais viram o literal do resultado.
+      O cálculo usa o próprio evaluate do nó, então a semântica é exatamente a do
+      interpretador (divisão truncada, % do Python, concatenação via str_value_of).
+      Se a avaliação lança erro (ex.: divisão por zero), o nó fica como está e o
+      erro continua acontecendo em tempo de execução.
+    - Propagação: variável com nome único no programa, atribuída exatamente uma vez
+      com um literal do seu tipo, tem as leituras posteriores (no mesmo bloco)
+      substituídas pelo literal.
+    """
+    folded: int = 0
+    propagated: int = 0
+
+    @staticmethod
+    def run(root: Node) -> Node:
+        ConstFolder.folded = 0
+        ConstFolder.propagated = 0
+        while True:
+            root = transform(root, ConstFolder._fold)
+            if not ConstFolder._propagate(root):
+                return root
+
+    # ------- dobra -------
+    @staticmethod
+    def _fold(node: Node) -> Node:
+        if isinstance(node, (UnOp, BinOp)) and all(is_literal(c) for c in node.children):
+            try:
+                res = node.evaluate(SymbolTable())
+            except Exception:
+                return node  # erro fica para o tempo de execução
+            ConstFolder.folded += 1
+            return literal_of(res)
+        return node
+
+    # ------- propagação -------
+    @staticmethod
+    def _propagate(root: Node) -> bool:
+        decls: Dict[str, List[VarDec]] = {}
+        assigns: Dict[str, List[Assignment]] = {}
+        funcs = set()
+        for n in walk(root):
+            if isinstance(n, VarDec):
+                decls.setdefault(n.children[0].value, []).append(n)
+            elif isinstance(n, Assignment):
+                assigns.setdefault(n.children[0].value, []).append(n)
+            elif isinstance(n, FuncDec):
+                funcs.add(n.children[0].value)
+                for p in n.children[1:-1]:
+                    decls.setdefault(p.children[0].value, []).append(p)
+
+        # id(nó que define o valor) -> (nome, literal)
+        defs: Dict[int, tuple[str, Node]] = {}
+        for name, ds in decls.items():
+            if len(ds) != 1 or name in funcs:
+                continue
+            dec = ds[0]
+            sets = assigns.get(name, [])
+            if len(dec.children) == 2 and not sets:
+                def_node, expr = dec, dec.children[1]
+            elif len(dec.children) == 1 and len(sets) == 1:
+                def_node, expr = sets[0], sets[0].children[1]
+            else:
+                continue
+            if is_literal(expr) and literal_type(expr) == dec.value:
+                defs[id(def_node)] = (name, expr)
+
+        if not defs:
+            return False
+        changed = False
+        for blk in walk(root):
+            if not isinstance(blk, Block):
+                continue
+            for i, stmt in enumerate(blk.children):
+                if id(stmt) not in defs:
+                    continue
+                name, lit = defs[id(stmt)]
+                # leituras posteriores no mesmo bloco sempre veem o valor definido
+                for j in range(i + 1, len(blk.children)):
+                    blk.children[j], n = ConstFolder._replace(blk.children[j], name, lit)
+                    if n:
+                        changed = True
+                        ConstFolder.propagated += n
+        return changed
+
+    @staticmethod
+    def _replace(node: Node, name: str, lit: Node) -> tuple[Node, int]:
+        if isinstance(node, Identifier) and node.value == name:
+            return literal_of(lit.evaluate(None)), 1
+        total = 0
+        for i in subtree_indices(node):
+            node.children[i], n = ConstFolder._replace(node.children[i], name, lit)
+            total += n
+        return node, total
@@ -0,0 +1,119 @@
+from __future__ import annotations
+from typing import Dict, List, Optional, Set, Tuple
+from nodes import Node, Identifier, Print, Assignment, VarDec, TempDec, UnOp, BinOp, Return, FuncCall
+from analysis import (
+    Env, ScopedVisitor, count_nodes, identifier_names, is_safe, key_id, new_temp, subtree_indices, type_of, walk,
+    written_names
+)
+
+# statements sem desvio: sequência deles forma um bloco básico
+_STRAIGHT = (VarDec, Assignment, TempDec, Print, Return, FuncCall)
+
+
+class CommonSubexpressions(ScopedVisitor):
+    """
+    Eliminação de subexpressões comuns dentro de um bloco básico.
+
+    Expressões puras e seguras estruturalmente iguais, em statements seguidos,
+    são calculadas uma vez num temporário (TempDec antes do primeiro uso) e as
+    ocorrências passam a ler o temporário. Uma atribuição (inclusive feita por
+    função chamada) ou redeclaração de uma variável da expressão invalida o valor:
+    os usos seguintes formam um novo grupo.
+    """
+    eliminated: int = 0
+
+    @staticmethod
+    def run(root: Node) -> Node:
+        CommonSubexpressions.eliminated = 0
+        CommonSubexpressions(root).visit()
+        return root
+
+    def block(self, blk: Node, env: Env):
+        outer, self.cur_block = self.cur_block, blk
+        segment: List[Tuple[Node, Env]] = []
+        for stmt in list(blk.children):
+            self.at(blk, stmt)
+            if isinstance(stmt, _STRAIGHT):
+                segment.append((stmt, env.snapshot()))
+            else:
+                self._flush(blk, segment)
+                segment = []
+            self.stmt(stmt, env)
+        self._flush(blk, segment)
+        self.cur_block = outer
+
+    # ------- bloco básico -------
+    def _flush(self, blk: Node, segment: List[Tuple[Node, Env]]):
+        while True:
+            group = self._best_group(segment)
+            if group is None:
+                return
+            first, node, occs = group
+            name = new_temp()
+            tmp = TempDec(Identifier(name), node)
+            blk.children.insert(blk.children.index(segment[first][0]), tmp)
+            for parent, i in occs:
+                parent.children[i] = Identifier(name)
+            vtype = type_of(node, segment[first][1])
+            # o próprio temporário entra no bloco básico: partes dele ainda podem se repetir
+            segment.insert(first, (tmp, segment[first][1].snapshot()))
+            for _, senv in segment[first + 1:]:
+                senv.declare(name, vtype)
+            CommonSubexpressions.eliminated += len(occs) - 1
+
+    def _best_group(self, segment: List[Tuple[Node, Env]]):
+        # grupos abertos: chave -> (statement do primeiro uso, nó, ocorrências)
+        open_: Dict[int, Tuple[int, Node, List[Tuple[Node, int]], Set[str]]] = {}
+        done: List[Tuple[int, Node, List[Tuple[Node, int]]]] = []
+        # chave e nomes não dependem do env: calculados uma vez por nó na varredura
+        keys: Dict[int, tuple] = {}
+        table: Dict[tuple, int] = {}
+        names_of: Dict[int, tuple] = {}
+        for s, (stmt, senv) in enumerate(segment):
+            facts: Dict[int, tuple] = {}
+            kills = self._kills(stmt)
+            before: Set[str] | None = set()
+            if isinstance(stmt, VarDec):
+                before = {stmt.children[0].value}   # VarDec cria a variável antes do inicializador
+            if _has_call(stmt):
+                before = kills  # ordem entre chamada e expressão não é garantida
+            for parent, i, node in _occurrences(stmt):
+                names = identifier_names(node, names_of)
+                if before is None or names & before or not is_safe(node, senv, facts):
+                    continue
+                k = key_id(node, keys, table)
+                if k in open_:
+                    open_[k][2].append((parent, i))
+                else:
+                    open_[k] = (s, node, [(parent, i)], names)
+            for k in list(open_):
+                if kills is None or open_[k][3] & kills:
+                    first, node, occs, _ = open_.pop(k)
+                    done.append((first, node, occs))
+        done.extend((f, n, o) for f, n, o, _ in open_.values())
+        groups = [g for g in done if len(g[2]) >= 2]
+        if not groups:
+            return None
+        return max(groups, key=lambda g: count_nodes(g[1]))
+
+    def _kills(self, stmt: Node) -> Optional[Set[str]]:
+        w = written_names(stmt, self.funcs)
+        if w is None:
+            return None
+        if isinstance(stmt, VarDec):
+            w.add(stmt.children[0].value)
+        return w
+
+
+def _has_call(node: Node) -> bool:
+    return any(isinstance(n, FuncCall) for n in walk(node))
+
+def _occurrences(node: Node):
+    """(pai, índice, nó) de cada UnOp/BinOp nas expressões do statement, em pré-ordem."""
+    stack = [(node, i) for i in reversed(subtree_indices(node))]
+    while stack:
+        parent, i = stack.pop()
+        ch = parent.children[i]
+        if isinstance(ch, (UnOp, BinOp)):
+            yield parent, i, ch
+        stack.extend((ch, j) for j in reversed(subtree_indices(ch)))
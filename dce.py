@@ -0,0 +1,67 @@
+from __future__ import annotations
+from typing import List
+from nodes import Node, NoOp, BoolVal, If, While, Block, Return, FuncCall
+from analysis import count_nodes, walk
+
+
+class DeadCodeEliminator:
+    """
+    Eliminação de código morto:
+    - instruções depois de um término incondicional (return, if/else que retorna
+      nos dois ramos, while(true)) são removidas;
+    - if(true)/if(false) viram o ramo escolhido, while(false) some;
+    - NoOps e blocos vazios são removidos.
+
+    O ramo escolhido de um if é avaliado no mesmo escopo do if, então os filhos
+    do bloco podem ser inseridos direto no bloco pai sem mudar o escopo.
+    """
+    removed: int = 0
+
+    @staticmethod
+    def run(root: Node) -> Node:
+        before = count_nodes(root)
+        # pós-ordem: blocos internos já chegam limpos ao bloco pai
+        for n in reversed(list(walk(root))):
+            if isinstance(n, Block):
+                n.children = DeadCodeEliminator._clean(n.children)
+        DeadCodeEliminator.removed = before - count_nodes(root)
+        return root
+
+    @staticmethod
+    def terminates(stmt: Node) -> bool:
+        """O statement sempre retorna (ou nunca termina normalmente)?"""
+        if isinstance(stmt, Return):
+            # 'return f()' com f void devolve None e o bloco continua
+            return not isinstance(stmt.children[0], FuncCall)
+        if isinstance(stmt, Block):
+            return bool(stmt.children) and DeadCodeEliminator.terminates(stmt.children[-1])
+        if isinstance(stmt, If):
+            return (len(stmt.children) == 3
+                    and DeadCodeEliminator.terminates(stmt.children[1])
+                    and DeadCodeEliminator.terminates(stmt.children[2]))
+        if isinstance(stmt, While):
+            # sem break na linguagem: while(true) só sai por return ou erro
+            cond = stmt.children[0]
+            return isinstance(cond, BoolVal) and cond.value is True
+        return False
+
+    @staticmethod
+    def _clean(children: List[Node]) -> List[Node]:
+        out: List[Node] = []
+        for stmt in children:
+            if isinstance(stmt, If) and isinstance(stmt.children[0], BoolVal):
+                if stmt.children[0].value:
+                    out.extend(DeadCodeEliminator._clean(stmt.children[1].children))
+                elif len(stmt.children) == 3:
+                    out.extend(DeadCodeEliminator._clean(stmt.children[2].children))
+            elif isinstance(stmt, While) and isinstance(stmt.children[0], BoolVal) and not stmt.children[0].value:
+                pass
+            elif isinstance(stmt, NoOp):
+                pass
+            elif isinstance(stmt, Block) and not stmt.children:
+                pass
+            else:
+                out.append(stmt)
+            if out and DeadCodeEliminator.terminates(out[-1]):
+                break
+        return out
@@ -0,0 +1,144 @@
+from __future__ import annotations
+from typing import Dict, List, Set, Tuple
+from nodes import Node, Identifier, Print, Assignment, VarDec, TempDec, If, While, FuncDec, FuncCall
+from analysis import Env, ScopedVisitor, has_effects, is_safe, subtree_indices, type_of, walk
+
+
+class DeadStores(ScopedVisitor):
+    """
+    Remove escritas que ninguém observa:
+    - variáveis nunca lidas em lugar nenhum do programa (o escopo é dinâmico,
+      qualquer função poderia ler): a declaração e todas as atribuições somem,
+      desde que nenhuma delas possa dar erro (tipo, redeclaração, void);
+    - atribuição (ou inicializador de let) sobrescrita por uma atribuição
+      seguinte no mesmo bloco, sem leitura, chamada ou readline no meio.
+    Inicializadores e valores atribuídos com chamada ou readline ficam.
+    """
+    stores: int = 0
+    decls: int = 0
+
+    def __init__(self, root: Node):
+        super().__init__(root)
+        self.reads = read_names(root)
+        self.declared: Dict[str, int] = {}
+        for n in walk(root):
+            if isinstance(n, (VarDec, TempDec, FuncDec)):
+                name = n.children[0].value
+                self.declared[name] = self.declared.get(name, 0) + 1
+        self.looped: Set[int] = set()  # VarDecs que rodam de novo no mesmo escopo (corpo de while)
+        for n in walk(root):
+            if isinstance(n, While):
+                self.looped |= {id(d) for d in _shared_decs(n)}
+        self.unused: Dict[str, List[Tuple[Node, Node, bool]]] = {}
+        self.dead: List[Tuple[Node, Node]] = []
+
+    @staticmethod
+    def run(root: Node) -> Node:
+        DeadStores.stores = 0
+        DeadStores.decls = 0
+        while True:
+            ds = DeadStores(root)
+            ds.visit()
+            if not ds._apply():
+                return root
+
+    def block(self, blk: Node, env: Env):
+        outer, self.cur_block = self.cur_block, blk
+        for stmt in list(blk.children):
+            self.at(blk, stmt)
+            if isinstance(stmt, (VarDec, Assignment, TempDec)):
+                self._check(blk, stmt, env)
+            self.stmt(stmt, env)
+        self.cur_block = outer
+
+    def _check(self, blk: Node, stmt: Node, env: Env):
+        name = stmt.children[0].value
+        removable = self._removable(stmt, env)
+        if name not in self.reads:
+            self.unused.setdefault(name, []).append((blk, stmt, removable))
+        if len(stmt.children) == 2 and not isinstance(stmt, TempDec):
+            if removable and _overwritten(blk, stmt, name):
+                self.dead.append((blk, stmt))
+
+    def _removable(self, stmt: Node, env: Env) -> bool:
+        """Executar o statement com certeza não dá erro nem tem efeito além da escrita?"""
+        name = stmt.children[0].value
+        if isinstance(stmt, VarDec):
+            if stmt.value == 'void' or self.declared[name] != 1 or id(stmt) in self.looped:
+                return False
+            if len(stmt.children) == 1:
+                return True
+            env = env.snapshot()
+            env.declare(name, stmt.value)  # a variável já existe quando o inicializador roda
+            return type_of(stmt.children[1], env) == stmt.value and is_safe(stmt.children[1], env)
+        if isinstance(stmt, Assignment):
+            vtype = env.lookup(name)
+            return vtype is not None and type_of(stmt.children[1], env) == vtype and is_safe(stmt.children[1], env)
+        return is_safe(stmt.children[1], env)
+
+    def _apply(self) -> bool:
+        changed = False
+        for name, entries in self.unused.items():
+            decs = [s for _, s, _ in entries if isinstance(s, VarDec)]
+            temps = all(isinstance(s, TempDec) for _, s, _ in entries)
+            if not (len(decs) == 1 or temps) or not all(ok for _, _, ok in entries):
+                continue
+            for blk, stmt, _ in entries:
+                blk.children.remove(stmt)
+                if isinstance(stmt, Assignment):
+                    DeadStores.stores += 1
+            DeadStores.decls += len(entries) - sum(isinstance(s, Assignment) for _, s, _ in entries)
+            changed = True
+        for blk, stmt in self.dead:
+            if not any(s is stmt for s in blk.children):
+                continue  # já saiu junto com a variável não usada
+            if isinstance(stmt, VarDec):
+                del stmt.children[1]
+            else:
+                blk.children.remove(stmt)
+            DeadStores.stores += 1
+            changed = True
+        return changed
+
+
+def read_names(root: Node) -> Set[str]:
+    """Nomes buscados por Identifier ou chamada (alvos de atribuição/declaração não contam)."""
+    out: Set[str] = set()
+    stack = [root]
+    while stack:
+        n = stack.pop()
+        if isinstance(n, (Identifier, FuncCall)):
+            out.add(n.value)
+        stack.extend(n.children[i] for i in subtree_indices(n))
+    return out
+
+
+def _reads(node: Node, name: str) -> bool:
+    return name in read_names(node)
+
+
+def _overwritten(blk: Node, stmt: Node, name: str) -> bool:
+    """A próxima coisa que acontece com name no bloco é outra atribuição (sem leitura antes)?"""
+    for s in blk.children[blk.children.index(stmt) + 1:]:
+        if not isinstance(s, (Assignment, VarDec, TempDec, Print)) or has_effects(s) or _reads(s, name):
+            return False
+        if isinstance(s, Assignment) and s.children[0].value == name:
+            return True
+        if isinstance(s, VarDec) and s.children[0].value == name:
+            return False
+    return False
+
+
+def _shared_decs(loop: While) -> List[VarDec]:
+    """VarDecs que rodam no escopo do while (sem entrar em blocos aninhados)."""
+    out: List[VarDec] = []
+    work = [loop]
+    while work:
+        stmt = work.pop()
+        for body in stmt.children[1:]:
+            for ch in body.children:
+                if isinstance(ch, VarDec):
+                    out.append(ch)
+                elif isinstance(ch, (If, While)):
+                    work.append(ch)
+    return out
@@ -0,0 +1,95 @@
+from __future__ import annotations
+from typing import Optional, Tuple
+from nodes import Node, IntVal, Identifier, Assignment, BinOp, While, Reduction
+from analysis import Env, ScopedVisitor, induction_step, is_safe, type_of, walk
+
+
+class LoopIdioms(ScopedVisitor):
+    """
+    Reconhece laços de redução e troca por Reduction, que calcula o resultado
+    em forma fechada (somas) ou com math.prod (produtos):
+
+        while (i < B) { acc = acc + e; i = i + c; }    // também -, *, <=, >, >=
+        while (i < B) { i = i + c; acc = acc * i; }    // incremento antes
+        while (i < B) { i = i + c; }                   // só contagem
+
+    com e em {i, k, i*k, k*i} (k literal; em produtos só i ou k), c literal com
+    o sinal que faz o laço andar na direção da condição, i e acc variáveis
+    number distintas e B seguro e sem i/acc (vale o mesmo em toda iteração).
+    Nada no corpo pode errar, então só o estado final de i e acc importa.
+    """
+    reduced: int = 0
+
+    @staticmethod
+    def run(root: Node) -> Node:
+        LoopIdioms.reduced = 0
+        LoopIdioms(root).visit()
+        return root
+
+    def stmt(self, stmt: Node, env: Env):
+        if type(stmt) is While:
+            new = self._match(stmt, env)
+            if new is not None:
+                blk = self.cur_block
+                blk.children[blk.children.index(stmt)] = new
+                LoopIdioms.reduced += 1
+                return
+        super().stmt(stmt, env)
+
+    def _match(self, loop: While, env: Env) -> Optional[Reduction]:
+        cond, body = loop.children
+        if not (isinstance(cond, BinOp) and cond.value in ('<', '<=', '>', '>=')
+                and isinstance(cond.children[0], Identifier)):
+            return None
+        ind = cond.children[0].value
+        bound = cond.children[1]
+        stmts = body.children
+        if not 1 <= len(stmts) <= 2 or not all(isinstance(s, Assignment) for s in stmts):
+            return None
+        names = [s.children[0].value for s in stmts]
+        if names.count(ind) != 1 or len(set(names)) != len(names):
+            return None
+        pos = names.index(ind)
+        step = induction_step(stmts[pos], ind)
+        if step is None or (step > 0) != (cond.value in ('<', '<=')):
+            return None
+        acc = None if len(stmts) == 1 else names[1 - pos]
+        used = {n.value for n in walk(bound) if isinstance(n, Identifier)}
+        if ind in used or acc in used:
+            return None
+        if env.lookup(ind) != 'number' or type_of(bound, env) != 'number' or not is_safe(bound, env):
+            return None
+        if acc is None:
+            return Reduction(loop, ind, step, None, '+', 0, 0, False)
+        if env.lookup(acc) != 'number':
+            return None
+        update = _update(stmts[1 - pos], acc, ind)
+        if update is None:
+            return None
+        op, coef, const = update
+        return Reduction(loop, ind, step, acc, op, coef, const, shifted=(pos == 0))
+
+
+def _update(stmt: Assignment, acc: str, ind: str) -> Optional[Tuple[str, int, int]]:
+    """'acc = acc op e' -> (op, coef, const) com e = coef*i + const."""
+    e = stmt.children[1]
+    if not (isinstance(e, BinOp) and e.value in ('+', '-', '*')):
+        return None
+    a, b = e.children
+    if isinstance(a, Identifier) and a.value == acc:
+        term = b
+    elif e.value != '-' and isinstance(b, Identifier) and b.value == acc:
+        term = a
+    else:
+        return None
+    if isinstance(term, IntVal):
+        return e.value, 0, term.value
+    if isinstance(term, Identifier) and term.value == ind:
+        return e.value, 1, 0
+    if e.value != '*' and isinstance(term, BinOp) and term.value == '*':
+        x, y = term.children
+        if isinstance(x, Identifier) and x.value == ind and isinstance(y, IntVal):
+            return e.value, y.value, 0
+        if isinstance(y, Identifier) and y.value == ind and isinstance(x, IntVal):
+            return e.value, x.value, 0
+    return None
@@ -0,0 +1,36 @@
+from __future__ import annotations
+from typing import Optional
+from nodes import Node, While, CountedWhile
+from analysis import Env, ScopedVisitor, counted_loop
+
+
+class InductionLoops(ScopedVisitor):
+    """
+    Laços contados: 'while (i < B) { ...; i = i + c; }' (ou <=, >, >= com c
+    negativo) nas condições de analysis.counted_loop. A sequência de valores
+    de i é conhecida antes de entrar no laço e o CountedWhile percorre um
+    range, sem reavaliar a condição a cada volta.
+    """
+    counted: int = 0
+
+    @staticmethod
+    def run(root: Node) -> Node:
+        InductionLoops.counted = 0
+        InductionLoops(root).visit()
+        return root
+
+    def stmt(self, stmt: Node, env: Env):
+        if type(stmt) is While:
+            new = self._match(stmt, env)
+            if new is not None:
+                blk = self.cur_block
+                blk.children[blk.children.index(stmt)] = new
+                InductionLoops.counted += 1
+                stmt = new
+        super().stmt(stmt, env)
+
+    def _match(self, loop: While, env: Env) -> Optional[CountedWhile]:
+        counted = counted_loop(loop, env, self.funcs)
+        if counted is None:
+            return None
+        return CountedWhile(loop, *counted)
@@ -0,0 +1,140 @@
+from __future__ import annotations
+from typing import Dict, List, Optional
+from nodes import Node, Identifier, Block, Return, FuncDec, FuncCall
+from analysis import (
+    Env, ScopedVisitor, clone, count_nodes, has_effects, is_literal, is_safe, transform, type_of
+)
+from callgraph import CallGraph
+
+
+class Inliner(ScopedVisitor):
+    """
+    Substitui chamadas de funções pequenas e não recursivas cujo corpo é só
+    'return <expr>;' pela própria expressão, com os parâmetros trocados pelos
+    argumentos.
+
+    Só inlina quando o resultado é indistinguível da chamada:
+    - a função já foi registrada no ponto da chamada (FuncDec antes do statement
+      de topo ou da função que chama);
+    - tipos dos argumentos e do retorno são conhecidos estaticamente e batem;
+    - a expressão do corpo não chama funções nem readline;
+    - argumentos com efeito/erro possível aparecem exatamente uma vez, na mesma
+      ordem da lista de parâmetros, e o que o corpo avalia antes deles é seguro.
+    """
+    MAX_BODY_NODES: int = 12     # tamanho máximo da expressão do corpo
+    MAX_RESULT_NODES: int = 40   # tamanho máximo da expressão já substituída
+
+    decisions: List[str] = []
+    inlined: int = 0
+
+    def __init__(self, root: Node):
+        super().__init__(root)
+        self.graph = CallGraph(root)
+        self.index: Dict[str, int] = {
+            st.children[0].value: i for i, st in enumerate(root.children) if isinstance(st, FuncDec)
+        }
+        self.counts: Dict[str, int] = {}
+        self.refused: Dict[str, str] = {}
+        self.candidates: Dict[str, FuncDec] = {n: f for n, f in self.funcs.items() if self._candidate(f)}
+
+    @staticmethod
+    def run(root: Node) -> Node:
+        Inliner.decisions = []
+        Inliner.inlined = 0
+        inl = Inliner(root)
+        inl.visit()
+        for name, n in inl.counts.items():
+            Inliner.decisions.append(f"inline {name}: {n} chamada(s)")
+            Inliner.inlined += n
+        for name, why in inl.refused.items():
+            Inliner.decisions.append(f"não inlina {name}: {why}")
+        return root
+
+    # ------- critérios da função -------
+    def _candidate(self, f: FuncDec) -> bool:
+        name = f.children[0].value
+        body: Block = f.children[-1]
+        params = f.children[1:-1]
+        why: Optional[str] = None
+        if name in self.graph.recursive:
+            why = "recursiva"
+        elif f.value == 'void':
+            why = "void"
+        elif len(body.children) != 1 or not isinstance(body.children[0], Return):
+            why = "corpo não é um único return"
+        elif has_effects(body.children[0].children[0]):
+            why = "corpo com chamadas/readline"
+        elif count_nodes(body.children[0].children[0]) > Inliner.MAX_BODY_NODES:
+            why = "corpo grande"
+        elif len({p.children[0].value for p in params}) != len(params) or any(p.value == 'void' for p in params):
+            why = "parâmetros inválidos"
+        if why:
+            if name in self.graph.reachable:
+                self.refused[name] = why
+            return False
+        return True
+
+    # ------- reescrita das chamadas -------
+    def expr(self, node: Node, env: Env) -> Node:
+        return transform(node, lambda n: self._site(n, env))
+
+    def _site(self, call: Node, env: Env) -> Node:
+        if not isinstance(call, FuncCall) or call.value not in self.candidates:
+            return call
+        f: FuncDec = self.candidates[call.value]
+        name = call.value
+        # a função precisa estar registrada quando a chamada executa
+        where = self.index[self.func.children[0].value] if self.func is not None else self.top
+        if self.index[name] >= where:
+            return call
+        params = f.children[1:-1]
+        if len(params) != len(call.children):
+            return call
+        for p, arg in zip(params, call.children):
+            if type_of(arg, env) != p.value:
+                return call
+
+        body_expr: Node = f.children[-1].children[0].children[0]
+        if isinstance(body_expr, Identifier) and not all(is_literal(a) for a in call.children):
+            return call  # 'return p;' devolveria uma cópia, o argumento inlinado seria a própria variável
+        names = [p.children[0].value for p in params]
+        args = dict(zip(names, call.children))
+        if not all(is_safe(a, env) for a in call.children) and not self._order_ok(body_expr, names, args, params, env):
+            return call
+
+        new = transform(clone(body_expr), lambda n: clone(args[n.value]) if isinstance(n, Identifier) and n.value in args else n)
+        if count_nodes(new) > Inliner.MAX_RESULT_NODES or type_of(new, env) != f.value:
+            return call
+        self.counts[name] = self.counts.get(name, 0) + 1
+        return new
+
+    @staticmethod
+    def _order_ok(body_expr: Node, names: List[str], args: Dict[str, Node], params, env: Env) -> bool:
+        """Argumentos não triviais: uso único, na ordem dos parâmetros, sem nada inseguro antes."""
+        order = _postorder(body_expr)
+        uses = [n.value for n in order if isinstance(n, Identifier) and n.value in args]
+        wanted = [nm for nm in names if not is_literal(args[nm])]
+        if [u for u in uses if u in wanted] != wanted:
+            return False
+        penv = Env()
+        for p in params:
+            penv.declare(p.children[0].value, p.value)
+        last = max(i for i, n in enumerate(order)
+                   if isinstance(n, Identifier) and n.value in args and not is_safe(args[n.value], env))
+        # um Identifier lido antes de um efeito colateral veria o valor já alterado
+        # (BinOp lê .value depois de avaliar o outro lado); a chamada copiava antes
+        for n in order[:last]:
+            if not is_safe(n, penv):
+                return False
+            if isinstance(n, Identifier) and n.value in args and isinstance(args[n.value], Identifier):
+                return False
+        return True
+
+
+def _postorder(node: Node) -> List[Node]:
+    """Nós na ordem em que o interpretador termina de avaliá-los."""
+    out: List[Node] = []
+    for ch in node.children:
+        out.extend(_postorder(ch))
+    out.append(node)
+    return out
@@ -0,0 +1,66 @@
+from __future__ import annotations
+from typing import Dict, List, Set
+from nodes import Node, Identifier, UnOp, BinOp, While, TempDec
+from analysis import (
+    Env, ScopedVisitor, declared_names, identifier_names, is_safe, key, new_temp, subtree_indices, type_of,
+    written_names
+)
+
+
+class LoopInvariantMotion(ScopedVisitor):
+    """
+    Move para antes do while as subexpressões da condição e do corpo que não
+    mudam entre iterações. Cada uma é calculada uma vez num temporário
+    (TempDec no mesmo escopo do while) e as ocorrências passam a ler o temporário.
+
+    Uma expressão só sai do laço se:
+    - é segura no ponto anterior ao laço (sem chamada/readline, sem erro possível),
+      então calculá-la antes, mesmo que o laço rode zero vezes, é invisível;
+    - nenhuma variável dela é atribuída no laço, nem por funções chamadas nele;
+    - nenhuma variável dela é redeclarada dentro do laço (sombreamento).
+    Laços externos são tratados antes, então a expressão sobe o máximo possível.
+    """
+    hoisted: int = 0
+
+    @staticmethod
+    def run(root: Node) -> Node:
+        LoopInvariantMotion.hoisted = 0
+        LoopInvariantMotion(root).visit()
+        return root
+
+    def stmt(self, stmt: Node, env: Env):
+        if isinstance(stmt, While):
+            self._hoist(stmt, env)
+        super().stmt(stmt, env)
+
+    def _hoist(self, loop: While, env: Env):
+        written = written_names(loop, self.funcs)
+        if written is None:
+            return
+        blocked: Set[str] = written | declared_names(loop)
+        temps: Dict[tuple, str] = {}
+        decls: List[Node] = []
+        # a visita desce da raiz: cada nó é testado antes de seus filhos mudarem
+        facts: Dict[int, tuple] = {}
+        names: Dict[int, tuple] = {}
+
+        def visit(node: Node) -> Node:
+            if isinstance(node, (UnOp, BinOp)) and not (identifier_names(node, names) & blocked) \
+                    and is_safe(node, env, facts):
+                k = key(node)
+                if k not in temps:
+                    temps[k] = new_temp()
+                    decls.append(TempDec(Identifier(temps[k]), node))
+                return Identifier(temps[k])
+            for i in subtree_indices(node):
+                node.children[i] = visit(node.children[i])
+            return node
+
+        visit(loop)
+        if not decls:
+            return
+        pos = self.cur_block.children.index(loop)
+        self.cur_block.children[pos:pos] = decls
+        for d in decls:
+            env.declare(d.children[0].value, type_of(d.children[1], env))
+        LoopInvariantMotion.hoisted += len(decls)
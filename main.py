@@ -1,18 +1,121 @@
+import os
 import sys
 from prepro import PrePro
 from parser import Parser
 from symbol_table import SymbolTable
+from optimizer import Optimizer
+from purity import Memo, PurityAnalysis
+from specialize import Specializer
+from unroll import LoopUnroller
+from inliner import Inliner
+from closure import ClosureCompiler
+from bytecode import BytecodeCompiler, Program, MAGIC as VM_MAGIC, cache_path, disassemble
+from vm import StackVM
+from regvm import RegisterCompiler, RegisterProgram, RegisterVM, MAGIC as REG_MAGIC, disassemble as disassemble_registers
+from transpile import PythonTranspiler
+from unboxed import UnboxedCompiler
 
 def main():
-    if len(sys.argv) != 2:
-        raise Exception('Uso: python -m src.main caminho/para/programa.ts')
+    if len(sys.argv) < 2:
+        raise Exception('Uso: python -m src.main caminho/para/programa.ts [-O0|-O1|-O2] [--report] [--verify] '
+                        '[--passes=p1,p2] [--memo-size=N] [--memo-policy=lru|fifo] [--clone-budget=N] '
+                        '[--unroll=N] [--unroll-size=N] [--inline-body=N] [--inline-size=N] [--engine=tree|closure|unboxed|vm|reg|py] [--dis] [--py-cache=DIR] [--bc-cache=DIR]')
     filename = sys.argv[1]
+    report = "--report" in sys.argv[2:]
+    verify = "--verify" in sys.argv[2:]
+    dis = "--dis" in sys.argv[2:]
+    level = None
+    only = None
+    engine = "tree"
+    cache = None
+    bc_cache = None
+    for arg in sys.argv[2:]:
+        if arg in ("-O0", "-O1", "-O2"):
+            level = int(arg[2])
+        elif arg.startswith("--passes="):
+            only = [p for p in arg.split("=", 1)[1].split(",") if p]
+        elif arg.startswith("--memo-size="):
+            Memo.MAX_SIZE = int(arg.split("=", 1)[1])
+        elif arg.startswith("--memo-policy="):
+            Memo.POLICY = arg.split("=", 1)[1]
+        elif arg.startswith("--clone-budget="):
+            Specializer.BUDGET = int(arg.split("=", 1)[1])
+        elif arg.startswith("--engine="):
+            engine = arg.split("=", 1)[1]
+        elif arg.startswith("--py-cache="):
+            cache = arg.split("=", 1)[1]
+        elif arg.startswith("--bc-cache="):
+            bc_cache = arg.split("=", 1)[1]
+        elif arg.startswith("--unroll="):
+            LoopUnroller.FACTOR = int(arg.split("=", 1)[1])
+        elif arg.startswith("--unroll-size="):
+            LoopUnroller.MAX_NODES = int(arg.split("=", 1)[1])
+        elif arg.startswith("--inline-body="):
+            Inliner.MAX_BODY_NODES = int(arg.split("=", 1)[1])
+        elif arg.startswith("--inline-size="):
+            Inliner.MAX_RESULT_NODES = int(arg.split("=", 1)[1])
+    if engine not in ("tree", "closure", "unboxed", "vm", "reg", "py"):
+        raise Exception(f"[Main] Motor desconhecido: {engine}")
     with open(filename, 'r', encoding='utf-8') as f:
         raw_code = f.read()
     code = PrePro.filter(raw_code)
     root = Parser.run(code)
+    root = Optimizer.run(root, level, only, verify)
+    if report:
+        # relatório vai para stderr para não misturar com a saída do programa
+        for line in Optimizer.report:
+            print(line, file=sys.stderr)
+    program = None
+    path = None
+    if bc_cache and engine in ("vm", "reg"):
+        # programa compilado guardado com marshal (Program.dumps/loads)
+        path = cache_path(bc_cache, REG_MAGIC if engine == "reg" else VM_MAGIC, raw_code, sys.argv[2:])
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                program = (RegisterProgram if engine == "reg" else Program).loads(f.read())
+    if program is None:
+        if engine == "reg":
+            program = RegisterCompiler.compile(root)
+        elif engine == "vm" or dis:
+            program = BytecodeCompiler.compile(root)
+    if path is not None and not os.path.exists(path):
+        os.makedirs(bc_cache, exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(program.dumps())
+    if dis:
+        print((disassemble_registers if engine == "reg" else disassemble)(program), file=sys.stderr)
+    compiled = None
+    if engine == "py":
+        key = PythonTranspiler.cache_key(raw_code, sys.argv[2:]) if cache else None
+        compiled = PythonTranspiler.load(cache, key) if cache else None
+        if compiled is None:
+            compiled = PythonTranspiler.compile(root)
+            if compiled is None and report:
+                print(f"py: programa fica no evaluate ({PythonTranspiler.fallback})", file=sys.stderr)
+            elif compiled is not None and cache:
+                PythonTranspiler.store(cache, key, compiled)
+    unboxed = None
+    if engine == "unboxed":
+        unboxed = UnboxedCompiler.compile(root)
+        if unboxed is None and report:
+            print(f"unboxed: programa fica nas closures com Variable ({UnboxedCompiler.fallback})", file=sys.stderr)
+    memos = {m.name: m for m in PurityAnalysis.memos}
     st = SymbolTable()
-    root.evaluate(st)
+    if compiled is not None:
+        PythonTranspiler.execute(compiled, memos)
+    elif unboxed is not None:
+        unboxed()
+    elif engine in ("closure", "unboxed"):
+        ClosureCompiler.compile(root)(st)
+    elif engine == "vm":
+        StackVM.run(program, st, memos)
+    elif engine == "reg":
+        RegisterVM.run(program, st, memos)
+    else:
+        root.evaluate(st)
+    if report:
+        for line in PurityAnalysis.stats():
+            print(line, file=sys.stderr)
 
 if __name__ == "__main__":
     try:
@@ -1,10 +1,22 @@
 from __future__ import annotations
+import math
+import sys
 from abc import ABC, abstractmethod
 from typing import Any, List
-from symbol_table import SymbolTable, Variable
+from symbol_table import SymbolTable, Variable, SharedValue
 
-def V_num(x: int) -> Variable: return Variable("number", int(x))
-def V_bool(b: bool) -> Variable: return Variable("boolean", bool(b))
+# valores compartilhados: resultados boolean e inteiros pequenos não alocam
+TRUE = SharedValue("boolean", True)
+FALSE = SharedValue("boolean", False)
+SMALL_MIN, SMALL_MAX = -256, 1024
+_SMALL = [SharedValue("number", i) for i in range(SMALL_MIN, SMALL_MAX + 1)]
+
+def V_num(x: int) -> Variable:
+    x = int(x)
+    if SMALL_MIN <= x <= SMALL_MAX:
+        return _SMALL[x - SMALL_MIN]
+    return Variable("number", x)
+def V_bool(b: bool) -> Variable: return TRUE if b else FALSE
 def V_str(s: str) -> Variable: return Variable("string", str(s))
 
 def str_value_of(var: Variable) -> str:
@@ -16,6 +28,32 @@ def ensure_type(var: Variable, expected: str, ctx: str):
     if var.type != expected:
         raise Exception(f"[Semantic] Esperado {expected} em {ctx}, recebeu {var.type}")
 
+# aritmética sobre valores crus: usada pelos nós e pelos motores que não passam por Variable
+def int_div(a: int, b: int) -> int:
+    if b == 0: raise Exception("[Semantic] Divisão por zero")
+    return int(a / b)
+
+def int_mod(a: int, b: int) -> int:
+    if b == 0: raise Exception("[Semantic] Módulo por zero")
+    return a % b
+
+def shift_right(v: int, k: int) -> int:
+    """int(v / 2^k) com deslocamento (ShiftOp)."""
+    # int(a / b) passa por float: o atalho só é exato enquanto |a| cabe na mantissa
+    if -(1 << 53) <= v <= (1 << 53):
+        return v >> k if v >= 0 else -((-v) >> k)
+    return int(v / (1 << k))
+
+def reduce_closed(acc: int, r: range, op: str, coef: int, const: int, shifted: bool, step: int) -> int:
+    """Forma fechada de Reduction sobre os valores de r (não vazio)."""
+    n = len(r)
+    off = step if shifted else 0
+    first, last = r[0] + off, r[-1] + off
+    if op == '*':
+        return acc * math.prod(range(first, last + step, step)) if coef else acc * const ** n
+    total = coef * (n * (first + last) // 2) + const * n
+    return acc + total if op == '+' else acc - total
+
 class Node(ABC):
     def __init__(self, value: Any, children: List['Node'] | None = None):
         self.value = value
@@ -23,17 +61,24 @@ class Node(ABC):
     @abstractmethod
     def evaluate(self, st: SymbolTable) -> Any: ...
 
+# literais: o valor é criado uma vez, na construção do nó
 class IntVal(Node):
-    def __init__(self, value: int): super().__init__(value)
-    def evaluate(self, st: SymbolTable) -> Variable: return V_num(self.value)
+    def __init__(self, value: int):
+        super().__init__(value)
+        self.var = V_num(value) if SMALL_MIN <= value <= SMALL_MAX else SharedValue("number", int(value))
+    def evaluate(self, st: SymbolTable) -> Variable: return self.var
 
 class BoolVal(Node):
-    def __init__(self, value: bool): super().__init__(value)
-    def evaluate(self, st: SymbolTable) -> Variable: return V_bool(self.value)
+    def __init__(self, value: bool):
+        super().__init__(value)
+        self.var = V_bool(value)
+    def evaluate(self, st: SymbolTable) -> Variable: return self.var
 
 class StringVal(Node):
-    def __init__(self, value: str): super().__init__(value)
-    def evaluate(self, st: SymbolTable) -> Variable: return V_str(self.value)
+    def __init__(self, value: str):
+        super().__init__(value)
+        self.var = SharedValue("string", str(value))
+    def evaluate(self, st: SymbolTable) -> Variable: return self.var
 
 class Identifier(Node):
     def __init__(self, name: str): super().__init__(name)
@@ -43,6 +88,18 @@ class NoOp(Node):
     def __init__(self): super().__init__(None)
     def evaluate(self, st: SymbolTable) -> None: return None
 
+class Output(Node):
+    # saída já calculada em tempo de compilação (partial.py): escreve o texto de uma vez
+    def __init__(self, text: str): super().__init__(text)
+    def evaluate(self, st: SymbolTable) -> None:
+        sys.stdout.write(self.value)
+
+class Fail(Node):
+    # erro que o programa com certeza levanta neste ponto (partial.py)
+    def __init__(self, message: str): super().__init__(message)
+    def evaluate(self, st: SymbolTable) -> None:
+        raise Exception(self.value)
+
 class Print(Node):
     def __init__(self, child: Node): super().__init__('print', [child])
     def evaluate(self, st: SymbolTable) -> None:
@@ -82,6 +139,12 @@ class VarDec(Node):
                 raise Exception(f"[Semantic] Tipos incompatíveis em inicialização de '{ident.value}': esperado {self.value}, recebeu {init.type}")
             st.set(ident.value, init)
 
+class TempDec(Node):
+    # temporário criado pelo otimizador; nomes começam com '_' e nunca colidem com o programa
+    def __init__(self, ident: Identifier, expr_node: Node): super().__init__('temp', [ident, expr_node])
+    def evaluate(self, st: SymbolTable) -> None:
+        st.set_temp(self.children[0].value, self.children[1].evaluate(st))
+
 class UnOp(Node):
     def __init__(self, op: str, child: Node): super().__init__(op, [child])
     def evaluate(self, st: SymbolTable) -> Variable:
@@ -96,10 +159,8 @@ class UnOp(Node):
 
 class BinOp(Node):
     def __init__(self, op: str, left: Node, right: Node): super().__init__(op, [left, right])
-    @staticmethod
-    def _int_div_trunc_toward_zero(a: int, b: int) -> int:
-        if b == 0: raise Exception("[Semantic] Divisão por zero")
-        return int(a / b)
+    # divisão inteira truncada para zero; a implementação é nodes.int_div
+    _int_div_trunc_toward_zero = staticmethod(int_div)
     def evaluate(self, st: SymbolTable) -> Variable:
         a = self.children[0].evaluate(st)
         b = self.children[1].evaluate(st)
@@ -112,10 +173,8 @@ class BinOp(Node):
             if op == '+': return V_num(a.value + b.value)
             if op == '-': return V_num(a.value - b.value)
             if op == '*': return V_num(a.value * b.value)
-            if op == '/': return V_num(self._int_div_trunc_toward_zero(a.value, b.value))
-            if op == '%':
-                if b.value == 0: raise Exception("[Semantic] Módulo por zero")
-                return V_num(a.value % b.value)
+            if op == '/': return V_num(int_div(a.value, b.value))
+            if op == '%': return V_num(int_mod(a.value, b.value))
         if op in ('==', '!=', '===', '!==', '<', '>', '<=', '>='):
             if op in ('<', '>', '<=', '>='):
                 if a.type == 'number' and b.type == 'number':
@@ -140,6 +199,36 @@ class BinOp(Node):
             if op == '||': return V_bool(a.value or b.value)
         raise Exception(f"[Semantic] Operador inválido: {op}")
 
+class ShiftOp(BinOp):
+    # x*2^k, x/2^k e x%2^k reescritos pelo otimizador com operações de bit;
+    # children[1] continua sendo o IntVal(2^k) original
+    def __init__(self, op: str, left: Node, right: Node):
+        super().__init__(op, left, right)
+        self.k = right.value.bit_length() - 1
+        self.mask = right.value - 1
+    def evaluate(self, st: SymbolTable) -> Variable:
+        a = self.children[0].evaluate(st)
+        if a.type != 'number':
+            raise Exception(f"[Semantic] Operação aritmética requer 'number', recebeu {a.type} {self.value} number")
+        v = a.value
+        if self.value == '*': return V_num(v << self.k)
+        if self.value == '%': return V_num(v & self.mask)  # % do Python com divisor positivo
+        return V_num(shift_right(v, self.k))
+
+class UncheckedOp(BinOp):
+    # aritmética com operandos comprovadamente number (e divisor != 0 em / e %),
+    # marcada por ranges.py: pula as checagens de tipo e de zero
+    def evaluate(self, st: SymbolTable) -> Variable:
+        a = self.children[0].evaluate(st)
+        b = self.children[1].evaluate(st).value
+        a = a.value  # lido depois do lado direito, como em BinOp
+        op = self.value
+        if op == '+': return V_num(a + b)
+        if op == '-': return V_num(a - b)
+        if op == '*': return V_num(a * b)
+        if op == '/': return V_num(int(a / b))
+        return V_num(a % b)
+
 class If(Node):
     def __init__(self, cond: Node, then_block: Node, else_block: Node | None = None):
         children = [cond, then_block] + ([else_block] if else_block is not None else [])
@@ -167,13 +256,65 @@ class While(Node):
                 return r
         return None
 
+class Reduction(While):
+    # while de contagem reconhecido por idioms.py: 'acc = acc op e(i)' e 'i = i + step'.
+    # Continua sendo um While (mesmos filhos) para as análises; evaluate usa forma fechada.
+    # e(i) = coef*i + const, com i já incrementado se o incremento vem antes no corpo.
+    def __init__(self, loop: While, ind: str, step: int, acc: str | None, op: str, coef: int, const: int, shifted: bool):
+        super().__init__(loop.children[0], loop.children[1])
+        self.ind, self.step = ind, step
+        self.acc, self.op, self.coef, self.const = acc, op, coef, const
+        self.shifted = shifted
+    def evaluate(self, st: SymbolTable) -> None:
+        cond = self.children[0]
+        iv = st.get(self.ind)
+        bound = cond.children[1].evaluate(st).value
+        stop = bound + {'<': 0, '>': 0, '<=': 1, '>=': -1}[cond.value]
+        r = range(iv.value, stop, self.step)
+        if len(r) == 0:
+            return None
+        if self.acc is not None:
+            av = st.get(self.acc)
+            av.value = reduce_closed(av.value, r, self.op, self.coef, self.const, self.shifted, self.step)
+        iv.value = r[-1] + self.step
+        return None
+
+class CountedWhile(While):
+    # while de contagem reconhecido por induction.py: o último statement do corpo é
+    # 'i = i + step' e nada mais escreve i nem o limite. Roda sobre um range nativo.
+    def __init__(self, loop: While, ind: str, step: int):
+        super().__init__(loop.children[0], loop.children[1])
+        self.ind, self.step = ind, step
+    def evaluate(self, st: SymbolTable) -> Any:
+        cond = self.children[0]
+        iv = st.get(self.ind)
+        bound = cond.children[1].evaluate(st).value
+        stop = bound + {'<': 0, '>': 0, '<=': 1, '>=': -1}[cond.value]
+        body = Block(self.children[1].children[:-1])  # corpo sem o incremento
+        v = None
+        for v in range(iv.value, stop, self.step):
+            iv.value = v
+            r = body.evaluate(st)
+            if isinstance(r, Variable):
+                return r
+        if v is not None:
+            iv.value = v + self.step
+        return None
+
 class Block(Node):
-    def __init__(self, children: list[Node]): super().__init__('block', children)
+    def __init__(self, children: list[Node]):
+        super().__init__('block', children)
+        self.scoped = True                   # False: roda no escopo do pai (scopes.py)
+        self.frames: list[SymbolTable] = []  # frames livres para reaproveitar
     def evaluate(self, st: SymbolTable) -> Any:
         for ch in self.children:
             if isinstance(ch, Block):
-                inner = SymbolTable(parent=st)
-                r = ch.evaluate(inner)
+                if not ch.scoped:
+                    r = ch.evaluate(st)
+                else:
+                    inner = ch.frames.pop().reset(st) if ch.frames else SymbolTable(parent=st)
+                    r = ch.evaluate(inner)
+                    ch.frames.append(inner)
             else:
                 r = ch.evaluate(st)
             if isinstance(r, Variable):
@@ -188,33 +329,41 @@ class Return(Node):
 class FuncDec(Node):
     def __init__(self, return_type: str, name_ident: Identifier, param_nodes: list[VarDec], body_block: Block):
         super().__init__(return_type, [name_ident] + param_nodes + [body_block])
+        self.memo = None  # cache de chamadas, ligado pela análise de pureza (purity.py)
+        self.public = name_ident.value  # nome nas mensagens de erro (clones de specialize.py mantêm o original)
+        self.compiled = None   # corpo compilado pelo motor de closures (closure.py)
+        self.signature = None  # [(parâmetro, tipo)], preenchido junto com compiled
     def evaluate(self, st: SymbolTable) -> None:
         name = self.children[0].value
         st.create_function(name, self.value, self)
 
 class FuncCall(Node):
     def __init__(self, name: str, arg_exprs: list[Node]): super().__init__(name, arg_exprs)
-    def evaluate(self, st: SymbolTable) -> Any:
+    def bind(self, st: SymbolTable) -> tuple:
+        """Resolve a função, avalia os argumentos em st e monta o escopo da chamada."""
         fname = self.value
         fvar = st.get(fname)
         if not getattr(fvar, "is_function", False):
             raise Exception(f"[Semantic] '{fname}' não é uma função")
         fnode: FuncDec = fvar.value
         params = fnode.children[1:-1]
-        body: Block = fnode.children[-1]
         if len(params) != len(self.children):
             raise Exception(f"[Semantic] Chamada de '{fname}' com {len(self.children)} argumentos; esperado {len(params)}")
         call_st = SymbolTable(parent=st)
+        memo = fnode.memo
+        key = []
         for pnode, arg_expr in zip(params, self.children, strict=True):
             p_ident = pnode.children[0]
             p_type = pnode.value
             call_st.create_variable(p_ident.value, p_type)
             aval = arg_expr.evaluate(st)
             if aval.type != p_type:
-                raise Exception(f"[Semantic] Tipo inválido no argumento '{p_ident.value}' de '{fname}': esperado {p_type}, recebeu {aval.type}")
+                raise Exception(f"[Semantic] Tipo inválido no argumento '{p_ident.value}' de '{fnode.public}': esperado {p_type}, recebeu {aval.type}")
             call_st.set(p_ident.value, aval)
-        r = body.evaluate(call_st)
-        ret_type = fnode.value
+            if memo is not None: key.append(aval.value)
+        return fnode, call_st, tuple(key)
+    @staticmethod
+    def check_return(fname: str, ret_type: str, r: Any) -> Variable | None:
         if ret_type == 'void':
             return None
         if not isinstance(r, Variable):
@@ -222,3 +371,51 @@ class FuncCall(Node):
         if r.type != ret_type:
             raise Exception(f"[Semantic] Return de '{fname}' incorreto: esperado {ret_type}, recebeu {r.type}")
         return r
+    def evaluate(self, st: SymbolTable) -> Any:
+        fnode, call_st, key = self.bind(st)
+        memo = fnode.memo
+        if memo is not None:
+            r = memo.get(key)
+            if r is not None:
+                return r
+        r = fnode.children[-1].evaluate(call_st)
+        if isinstance(r, PendingCall):
+            r = r.run(call_st)
+        r = FuncCall.check_return(fnode.public, fnode.value, r)
+        if memo is not None:
+            memo.put(key, r)
+        return r
+
+class TailCall(FuncCall):
+    # 'return f(...)' dentro de função, marcado por tailcall.py: em vez de chamar,
+    # devolve a chamada pendente para o FuncCall que executa a função corrente
+    def __init__(self, name: str, arg_exprs: list[Node], detach: bool):
+        super().__init__(name, arg_exprs)
+        self.detach = detach  # o escopo de f não precisa enxergar o da função que chama
+    def evaluate(self, st: SymbolTable) -> Any:
+        fnode, call_st, _ = self.bind(st)
+        return PendingCall(fnode.public, fnode, call_st, self.detach)
+
+class PendingCall(Variable):
+    # subclasse de Variable para atravessar Block/If/While como um return comum
+    __slots__ = ("fname", "fnode", "call_st", "detach")
+    def __init__(self, fname: str, fnode: FuncDec, call_st: SymbolTable, detach: bool):
+        self.fname = fname
+        self.fnode = fnode
+        self.call_st = call_st
+        self.detach = detach
+    def run(self, caller_st: SymbolTable) -> Any:
+        """Executa a cadeia de chamadas em cauda num laço, sem crescer a pilha do Python."""
+        checks: list[tuple[str, str]] = []  # verificações de retorno, da mais externa à mais interna
+        r: Any = self
+        while isinstance(r, PendingCall):
+            if r.detach:
+                r.call_st.parent = caller_st.parent
+            caller_st = r.call_st
+            check = (r.fname, r.fnode.value)
+            if not checks or checks[-1] != check:  # repetida em sequência não muda o resultado
+                checks.append(check)
+            r = (r.fnode.compiled or r.fnode.children[-1].evaluate)(r.call_st)
+        for fname, ret_type in reversed(checks):
+            r = FuncCall.check_return(fname, ret_type, r)
+        return r
@@ -0,0 +1,137 @@
+from __future__ import annotations
+import time
+from nodes import Node
+from typing import Callable, List, Optional
+from analysis import count_nodes
+from verifier import Verifier
+from constfold import ConstFolder
+from dce import DeadCodeEliminator
+from callgraph import FunctionPruner
+from inliner import Inliner
+from licm import LoopInvariantMotion
+from cse import CommonSubexpressions
+from algebraic import AlgebraicSimplifier
+from purity import PurityAnalysis
+from scopes import ScopeElision
+from tailcall import TailCalls
+from idioms import LoopIdioms
+from induction import InductionLoops
+from deadstore import DeadStores
+from ranges import RangeAnalysis
+from partial import PartialEvaluator
+from specialize import Specializer
+from unroll import LoopUnroller
+
+
+class Pass:
+    """
+    Um passo do pipeline: nome, nível mínimo (-O1/-O2) em que roda, a função
+    que transforma a AST e o resumo para o relatório. 'when' decide, na hora,
+    se uma repetição do passo vale a pena (ex.: dobrar constantes de novo só se
+    algo foi inlinado).
+    """
+    def __init__(self, name: str, level: int, run: Callable[[Node], Node], summary: Callable[[], str],
+                 when: Optional[Callable[[], bool]] = None):
+        self.name = name
+        self.level = level
+        self.run = run
+        self.summary = summary
+        self.when = when
+
+
+PIPELINE: List[Pass] = [
+    Pass("constfold", 1, ConstFolder.run,
+         lambda: f"{ConstFolder.folded} dobras, {ConstFolder.propagated} propagações"),
+    Pass("dce", 1, DeadCodeEliminator.run, lambda: f"{DeadCodeEliminator.removed} nós removidos"),
+    Pass("specialize", 2, Specializer.run, lambda: "; ".join(Specializer.decisions) or "nada a especializar"),
+    # dobra as constantes dentro dos clones
+    Pass("constfold", 2, ConstFolder.run,
+         lambda: f"{ConstFolder.folded} dobras, {ConstFolder.propagated} propagações",
+         when=lambda: Specializer.cloned > 0),
+    Pass("dce", 2, DeadCodeEliminator.run, lambda: f"{DeadCodeEliminator.removed} nós removidos",
+         when=lambda: Specializer.cloned > 0),
+    Pass("inliner", 2, Inliner.run, lambda: "; ".join(Inliner.decisions) or "nada a inlinar"),
+    # o corpo inlinado costuma abrir novas dobras/ramos constantes
+    Pass("constfold", 2, ConstFolder.run,
+         lambda: f"{ConstFolder.folded} dobras, {ConstFolder.propagated} propagações",
+         when=lambda: Inliner.inlined > 0),
+    Pass("dce", 2, DeadCodeEliminator.run, lambda: f"{DeadCodeEliminator.removed} nós removidos",
+         when=lambda: Inliner.inlined > 0),
+    Pass("algebraic", 1, AlgebraicSimplifier.run, lambda: f"{AlgebraicSimplifier.rewrites} reescritas"),
+    Pass("constfold", 1, ConstFolder.run,
+         lambda: f"{ConstFolder.folded} dobras, {ConstFolder.propagated} propagações",
+         when=lambda: AlgebraicSimplifier.rewrites > 0),
+    Pass("callgraph", 1, FunctionPruner.run,
+         lambda: f"{len(FunctionPruner.removed)} funções não usadas removidas"
+         + (f" ({', '.join(FunctionPruner.removed)})" if FunctionPruner.removed else "")),
+    Pass("licm", 2, LoopInvariantMotion.run,
+         lambda: f"{LoopInvariantMotion.hoisted} expressões movidas para fora de laços"),
+    Pass("cse", 2, CommonSubexpressions.run,
+         lambda: f"{CommonSubexpressions.eliminated} recomputações eliminadas"),
+    Pass("deadstore", 1, DeadStores.run,
+         lambda: f"{DeadStores.stores} escritas mortas, {DeadStores.decls} declarações não usadas"),
+    Pass("idioms", 2, LoopIdioms.run, lambda: f"{LoopIdioms.reduced} laços em forma fechada"),
+    Pass("unroll", 2, LoopUnroller.run,
+         lambda: f"{LoopUnroller.full} laços desenrolados, {LoopUnroller.partial} em blocos de {LoopUnroller.FACTOR} com resto"),
+    # as cópias desenroladas têm o índice como literal
+    Pass("constfold", 2, ConstFolder.run,
+         lambda: f"{ConstFolder.folded} dobras, {ConstFolder.propagated} propagações",
+         when=lambda: LoopUnroller.full > 0),
+    Pass("induction", 2, InductionLoops.run, lambda: f"{InductionLoops.counted} laços contados sobre range"),
+    Pass("ranges", 2, RangeAnalysis.run,
+         lambda: f"{RangeAnalysis.unchecked} operações sem checagem ({RangeAnalysis.divisions} divisões)"),
+    Pass("tailcall", 1, TailCalls.run, lambda: f"{TailCalls.marked} chamadas em cauda"),
+    Pass("purity", 2, PurityAnalysis.run,
+         lambda: f"funções puras com memo: {', '.join(PurityAnalysis.pure) or '-'}"),
+    Pass("scopes", 1, ScopeElision.run,
+         lambda: f"{ScopeElision.elided} blocos sem escopo próprio, {ScopeElision.framed} com frame pré-alocado"),
+    # por último: avalia a AST já otimizada
+    Pass("partial", 2, PartialEvaluator.run,
+         lambda: ("saída pré-calculada" if PartialEvaluator.folded else "não avaliado")
+         + f" ({PartialEvaluator.reason})"),
+]
+
+
+class Optimizer:
+    """
+    Gerenciador de passes: roda, em ordem, os passes de PIPELINE com nível até
+    'level' (-O0 não otimiza, -O1 só passes locais e baratos, -O2 todos).
+    'only' restringe a uma lista de nomes. Com 'verify', o Verifier confere a
+    AST depois de cada passe.
+
+    O relatório traz, por passe, o resumo, o tempo e a variação do número de nós.
+    """
+    LEVEL: int = 2
+    report: List[str] = []
+    total_ms: float = 0.0
+
+    @staticmethod
+    def run(root: Node, level: Optional[int] = None, only: Optional[List[str]] = None,
+            verify: bool = False) -> Node:
+        level = Optimizer.LEVEL if level is None else level
+        if only is not None:
+            unknown = set(only) - {p.name for p in PIPELINE}
+            if unknown:
+                raise Exception(f"[Optimizer] Passes desconhecidos: {', '.join(sorted(unknown))}")
+        Optimizer.report = []
+        Optimizer.total_ms = 0.0
+        if verify:
+            Verifier.check(root)
+        nodes = count_nodes(root)
+        for p in PIPELINE:
+            if p.level > level or (only is not None and p.name not in only):
+                continue
+            if p.when is not None and not p.when():
+                continue
+            start = time.perf_counter()
+            root = p.run(root)
+            ms = (time.perf_counter() - start) * 1000
+            Optimizer.total_ms += ms
+            after = count_nodes(root)
+            Optimizer.report.append(
+                f"{p.name}: {p.summary()} [{ms:.2f} ms, nós {nodes} -> {after} ({after - nodes:+d})]")
+            nodes = after
+            if verify:
+                Verifier.check(root, p.name)
+        Optimizer.report.append(f"total: {Optimizer.total_ms:.2f} ms em -O{level}")
+        return root
@@ -0,0 +1,75 @@
+from __future__ import annotations
+import contextlib
+import io
+import sys
+from nodes import Node, Read, Block, Output, Fail
+from symbol_table import SymbolTable
+from analysis import clone, walk
+
+
+class _OutOfBudget(BaseException):
+    # BaseException: nada no interpretador pode engolir a interrupção
+    pass
+
+
+class PartialEvaluator:
+    """
+    Programa sem readline tem a saída toda determinada em tempo de compilação.
+    Ele é executado aqui (numa cópia da AST) com um limite de passos e, se
+    terminar, vira um único Output com o texto impresso, seguido de Fail se o
+    programa termina com erro semântico.
+
+    Passo = chamada de função Python durante a avaliação (contada com
+    sys.setprofile, só aqui; a execução normal não paga nada). Estouro do
+    limite, saída grande demais ou erro que depende do ambiente (ex.:
+    profundidade de recursão) deixam o programa como está. O limite é baixo:
+    programas que cabem nele terminam em poucos milissegundos, e quem não cabe
+    paga a tentativa inteira antes de rodar de verdade.
+    """
+    MAX_STEPS: int = 20_000
+    MAX_OUTPUT: int = 1 << 20  # caracteres
+
+    folded: bool = False
+    reason: str = ""
+
+    @staticmethod
+    def run(root: Node) -> Node:
+        PartialEvaluator.folded = False
+        if any(isinstance(n, Read) for n in walk(root)):
+            PartialEvaluator.reason = "usa readline"
+            return root
+        out = io.StringIO()
+        steps = 0
+
+        def count(frame, event, arg):
+            nonlocal steps
+            if event == 'call':
+                steps += 1
+                if steps > PartialEvaluator.MAX_STEPS or out.tell() > PartialEvaluator.MAX_OUTPUT:
+                    raise _OutOfBudget()
+
+        error = None
+        sys.setprofile(count)
+        try:
+            with contextlib.redirect_stdout(out):
+                clone(root).evaluate(SymbolTable())
+        except _OutOfBudget:
+            PartialEvaluator.reason = f"passou de {PartialEvaluator.MAX_STEPS} passos ou da saída máxima"
+            return root
+        except RecursionError:
+            PartialEvaluator.reason = "recursão profunda"
+            return root
+        except Exception as e:
+            if type(e) is not Exception:
+                PartialEvaluator.reason = f"erro {type(e).__name__}"
+                return root
+            error = str(e)
+        finally:
+            sys.setprofile(None)
+
+        children: list[Node] = [Output(out.getvalue())]
+        if error is not None:
+            children.append(Fail(error))
+        PartialEvaluator.folded = True
+        PartialEvaluator.reason = f"{steps} passos"
+        return Block(children)
@@ -0,0 +1,3 @@
+function inc(x:number): number { return x + 1; }
+function main(): void { log(inc()); } // 0 vs 1
+main();
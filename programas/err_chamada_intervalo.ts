@@ -0,0 +1,5 @@
+let d:number = 5;
+let r:number = 7;
+function z(): void { d = 0; }
+z();
+log(r / d);
@@ -0,0 +1,2 @@
+let a:number = 5;
+log(a / (2 - 2)); // continua sendo erro em tempo de execução
@@ -0,0 +1,7 @@
+function main(): void {
+  {
+    let x:number; x = 3;
+  }
+  log(x);
+}
+main();
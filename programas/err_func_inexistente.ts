@@ -0,0 +1,2 @@
+function main(): void { foo(); }
+main();
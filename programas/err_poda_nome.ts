@@ -0,0 +1,8 @@
+// 'h' não é chamada, mas é declarada duas vezes: as FuncDecs ficam e a redeclaração aparece
+function h(): void {
+  log("nunca");
+}
+log(1);
+function h(): number {
+  return 2;
+}
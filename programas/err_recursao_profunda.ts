@@ -0,0 +1,6 @@
+function soma(n: number): number {
+  if (n === 0) { return 0; }
+  return n + soma(n - 1);
+}
+log(soma(100));
+log(soma(3000));
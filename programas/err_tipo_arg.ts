@@ -0,0 +1,3 @@
+function show(n:number): void { log(n); }
+function main(): void { show("oi"); }
+main();
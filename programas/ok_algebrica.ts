@@ -0,0 +1,26 @@
+// cada regra de simplificação com operandos negativos; saída igual à do interpretador sem otimização
+let x:number = 0;
+let y:number = 0;
+let b:boolean = true;
+let c:boolean = false;
+x = -7; y = -9;
+b = !c;
+log(x * 1); log(1 * x); log(x + 0); log(0 + x); log(x - 0); log(+x); log(-(-x));
+log(x * 0); log(0 * x); log(x - x); log(0 - x);
+log(!!b); log(b && true); log(true && b); log(c || false); log(false || c);
+log(b && false); log(c || true);
+log(x * 2); log(x * 8); log(4 * x); log(x / 2); log(x / 4); log(x / 1); log(y / 8); log(y % 8); log(y % 2); log(x % 1);
+let big:number = 0;
+big = 9007199254740993;
+log(big * -1 / 2);
+log(big / 2);
+log(big * 3 / 4);
+log((x * 1) + 0);
+let s:string = "s";
+log(s + 0);
+let g:number = 1;
+function bump(): number { g = g + 1; return g; }
+log(g * 1 + bump());
+log(g + 0 - bump());
+function idt(v:number): number { return v * 1; }
+log(idt(-4));
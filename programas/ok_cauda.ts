@@ -0,0 +1,34 @@
+// chamadas em cauda rodam num laço: recursão profunda sem estourar a pilha
+function soma(i:number, acc:number): number {
+  if (i == 0) { return acc; }
+  return soma(i - 1, acc + i);
+}
+// local declarado antes do uso não é nome livre: a cadeia de escopos não cresce
+function acumula(n:number, acc:number): number {
+  if (n == 0) { return acc; }
+  let t:number = acc + n;
+  return acumula(n - 1, t);
+}
+function par(n:number): boolean {
+  if (n == 0) { return true; }
+  return impar(n - 1);
+}
+function impar(n:number): boolean {
+  if (n == 0) { return false; }
+  return par(n - 1);
+}
+// escopo dinâmico: usa enxerga o 'base' de quem chama
+let base:number = 7;
+function usa(n:number): number {
+  let q:number = n;
+  return q + base;
+}
+function chama(k:number): number {
+  let base:number = 100;
+  return usa(k);
+}
+log(soma(50000, 0));
+log(acumula(50000, 0));
+log(par(20001));
+log(chama(1));
+log(usa(1));
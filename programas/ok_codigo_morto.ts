@@ -0,0 +1,10 @@
+function sinal(n:number): number {
+  if (n > 0) { return 1; } else { return -1; }
+  log("inalcançável");
+}
+log(sinal(5));
+if (false) { log("nunca"); }
+if (2 > 1) { let z:number = 3; log(z); } else { log("nunca"); }
+while (false) { log("nunca"); }
+{ ; { } }
+log("fim");
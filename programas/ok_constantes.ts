@@ -0,0 +1,10 @@
+let dia:number = 60 * 60 * 24;
+let s:string = "a" + "b";
+let k:number;
+k = -7;
+log(dia);          // 86400
+log(s + dia);      // ab86400
+log(!(true));      // false
+log(k / 2);        // -3
+log(k % 2);        // 1 (% do Python)
+if (1 < 2) { log("sim"); }
@@ -0,0 +1,19 @@
+// laços contados rodam sobre range; i tem o mesmo valor final
+let i:number = 0;
+let s:number = 0;
+while (i < 10) {
+  if (i % 3 == 0) { s = s + i * 2; } else { s = s - 1; }
+  i = i + 1;
+}
+log(s);
+log(i);
+function acha(n:number): number {
+  let k:number = 0;
+  while (k < n) { if (k * k > 20) { return k; } k = k + 1; }
+  return -1;
+}
+log(acha(10));
+log(acha(3));
+let j:number = 9;
+while (j > 0) { log(j); j = j - 4; }
+log(j);
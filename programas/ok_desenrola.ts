@@ -0,0 +1,17 @@
+// laços contados: os pequenos são desenrolados por inteiro, os outros em blocos com resto
+let s:number = 0;
+let i:number = 0;
+while (i < 4) { s = s + i * i; i = i + 1; }
+log(s);
+log(i);
+let n:number = 10;
+let q:number = 0;
+let j:number = 0;
+while (j < n) { q = q + j * j % 7; j = j + 1; }
+log(q);
+log(j);
+let t:string = "";
+let k:number = 9;
+while (k >= 1) { t = t + k; k = k - 2; }
+log(t);
+log(k);
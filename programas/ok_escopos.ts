@@ -0,0 +1,21 @@
+// blocos sem declaração rodam no escopo do pai; os outros reaproveitam frames
+function soma(n:number): number {
+  {
+    let r:number = 0;
+    if (n > 0) { r = n + soma(n - 1); }
+    return r;
+  }
+}
+let i:number = 0;
+let t:number = 0;
+while (i < 3) {
+  { t = t + i; }
+  {
+    let t:number = 100;
+    { t = t + 1; }
+    log(t);
+  }
+  i = i + 1;
+}
+log(t);
+log(soma(4));
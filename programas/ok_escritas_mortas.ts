@@ -0,0 +1,12 @@
+// variáveis nunca lidas e escritas sobrescritas somem; chamadas ficam
+let a:number = 1;
+let b:number = 2;
+let u:number = a + b;
+a = 5;
+a = 6;
+log(a);
+function f(): number { log("f"); return 1; }
+let g:number = f();
+let s:string = "x";
+s = "y";
+log(s);
@@ -0,0 +1,22 @@
+// chamadas repetidas com argumentos constantes ganham um clone especializado
+function pot(b:number, e:number): number {
+  let r:number = 1;
+  let i:number = 0;
+  while (i < e) { r = r * b; i = i + 1; }
+  return r;
+}
+function escala(x:number, modo:boolean): number {
+  if (modo) { return x * 10; }
+  return x - 1;
+}
+function soma(n:number, passo:number): number {
+  if (n <= 0) { return 0; }
+  return n + soma(n - passo, passo);
+}
+log(pot(3, 2));
+log(pot(5, 2));
+log(pot(2, 10));
+log(escala(4, true) + escala(7, true));
+log(escala(5, false));
+log(soma(10, 2));
+log(soma(9, 2));
@@ -0,0 +1,11 @@
+// cadeia longa de operadores: todo motor avalia o que a árvore avalia, e os
+// passes não recursam nem ficam quadráticos no comprimento da expressão
+let a:number = 0;
+let i:number = 0;
+while (i < 3) { a = a + i; i = i + 1; }
+log(a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a);
+log(a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a + a);
+let s:number = 0;
+let j:number = 0;
+while (j < 2) { s = s + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a + j + a; j = j + 1; }
+log(s);
@@ -0,0 +1,14 @@
+// laços de redução calculados em forma fechada
+let i:number = 0;
+let s:number = 0;
+while (i < 1000000) { s = s + i; i = i + 1; }
+log(s);
+let f:number = 1;
+i = 2;
+while (i < 21) { f = f * i; i = i + 1; }
+log(f);
+let c:number = 0;
+i = 100;
+while (i > 0) { c = c + 2; i = i - 3; }
+log(c);
+log(i);
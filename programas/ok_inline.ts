@@ -0,0 +1,11 @@
+let g:number = 1;
+function inc(x:number): number { return x + 1; }
+function sq(x:number): number { return x * x; }
+function add(a:number, b:number): number { return a + b; }
+function bump(): number { g = g + 1; return g; }
+log(sq(inc(3)));        // 16
+log(add(g, bump()));    // 3: o parâmetro 'a' copia g antes de bump()
+let i:number = 0;
+let s:number = 0;
+while (i < 4) { s = s + sq(i) - inc(i); i = i + 1; }
+log(s);                 // 4
@@ -0,0 +1,12 @@
+// divisores provados diferentes de zero dispensam a checagem
+let i:number = 1;
+let s:number = 0;
+while (i < 6) { s = s + 60 / i + 7 % i; i = i + 1; }
+log(s);
+let k:number = 4;
+while (k > 0) { s = s - 100 / k; k = k - 1; }
+log(s);
+let z:number = 5;
+function muda(): number { z = 3; return 1; }
+log(10 / z);
+log(muda() + 10 / z);
@@ -0,0 +1,13 @@
+let n:number = 5;
+let k:number = 3;
+let i:number = 0;
+let f:number = 1;
+n = n + 1;
+while (i < n + 1) {
+  if (i > 0) { f = f * i; }
+  log(i * (k * 2) + n % 4);
+  i = i + 1;
+}
+log(f);      // 720
+let z:number = 0;
+while (z < 2) { log(n / (k - 3)); z = z + 1; }
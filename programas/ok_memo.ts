@@ -0,0 +1,15 @@
+// fib ingênuo: a análise de pureza liga o cache de chamadas
+function fib(n:number): number {
+  if (n < 2) { return n; }
+  return fib(n - 1) + fib(n - 2);
+}
+// lê variável de fora (escopo dinâmico): não pode usar cache
+function escala(n:number): number {
+  let r:number = n * fator;
+  return r;
+}
+let fator:number = 2;
+log(fib(40));
+log(escala(5));
+fator = 3;
+log(escala(5));
@@ -0,0 +1,10 @@
+// sem readline: a saída inteira é calculada em tempo de compilação
+function rep(s:string, n:number): string {
+  let r:string = "";
+  let i:number = 0;
+  while (i < n) { r = r + s; i = i + 1; }
+  return r;
+}
+let k:number = 1;
+while (k < 4) { log(rep("ab", k)); k = k + 1; }
+log(k == 4);
@@ -0,0 +1,14 @@
+// funções que nenhum statement de topo alcança saem do programa (--report lista quais)
+function dobra(x:number): number {
+  return x * 2;
+}
+function usada(x:number): number {
+  return dobra(x) + 1;
+}
+function morta(x:number): number {
+  return esquecida(x) - 1;
+}
+function esquecida(x:number): number {
+  return morta(x);
+}
+log(usada(4));
@@ -0,0 +1,13 @@
+let a:number = 0;
+let b:number = 0;
+a = 6; b = 5;
+a = a + 0; b = b + 0;
+function seta(): number { a = a + 100; return 0; }
+let x:number;
+let y:number;
+x = a * b + 1;
+y = a * b + 1;
+log(x + y + a * b);    // 92
+x = a * b + seta();
+y = a * b;             // a mudou dentro de seta()
+log(x); log(y);        // 30 530
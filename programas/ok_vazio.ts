@@ -0,0 +1,2 @@
+let v9:string = "b";
+let v10:number;
@@ -0,0 +1,122 @@
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Dict, List, Set
+from nodes import Node, Identifier, Print, Read, Assignment, FuncCall, TailCall
+from analysis import Env, ScopedVisitor, walk
+from symbol_table import Variable
+
+
+class Memo:
+    """
+    Cache limitado de resultados de uma função pura, chaveado pelos valores dos
+    argumentos. Política de descarte: 'lru' (menos usado recentemente) ou 'fifo'.
+    """
+    MAX_SIZE: int = 1024
+    POLICY: str = 'lru'
+
+    def __init__(self, name: str, maxsize: int | None = None, policy: str | None = None):
+        self.name = name
+        self.maxsize = Memo.MAX_SIZE if maxsize is None else maxsize
+        self.policy = Memo.POLICY if policy is None else policy
+        if self.policy not in ('lru', 'fifo'):
+            raise Exception(f"[Optimizer] Política de cache inválida: {self.policy}")
+        self._data: OrderedDict[tuple, Variable] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: tuple) -> Variable | None:
+        r = self._data.get(key)
+        if r is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if self.policy == 'lru':
+            self._data.move_to_end(key)
+        return r
+
+    def put(self, key: tuple, value: Variable):
+        if self.maxsize <= 0:
+            return
+        self._data[key] = value
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+
+class PurityAnalysis(ScopedVisitor):
+    """
+    Marca como puras as funções com retorno que:
+    - não usam log nem readline;
+    - só leem e escrevem parâmetros e variáveis locais (o escopo é dinâmico: ler
+      uma variável de fora faria o resultado depender de quem chama);
+    - só chamam funções puras.
+    As chamadas a funções puras passam a usar um Memo (FuncDec.memo), exceto as
+    chamadas em cauda (TailCall): o laço de PendingCall.run não passa pelo cache.
+    """
+    pure: List[str] = []
+    memos: List[Memo] = []
+
+    def __init__(self, root: Node):
+        super().__init__(root)
+        self.impure: Set[str] = set()
+        self.calls: Dict[str, Set[str]] = {}
+        self.tail: Set[str] = {n.value for n in walk(root) if isinstance(n, TailCall)}
+
+    @staticmethod
+    def run(root: Node, maxsize: int | None = None, policy: str | None = None) -> Node:
+        pa = PurityAnalysis(root)
+        pa.visit()
+        pure = {name for name, f in pa.funcs.items()
+                if name not in pa.impure and f.value != 'void'}
+        changed = True
+        while changed:  # ponto fixo: chamar função impura contamina
+            changed = False
+            for name in list(pure):
+                if not pa.calls.get(name, set()) <= pure:
+                    pure.discard(name)
+                    changed = True
+        PurityAnalysis.pure = sorted(pure - pa.tail)
+        PurityAnalysis.memos = []
+        for name in PurityAnalysis.pure:
+            memo = Memo(name, maxsize, policy)
+            pa.funcs[name].memo = memo
+            PurityAnalysis.memos.append(memo)
+        return root
+
+    @staticmethod
+    def stats() -> List[str]:
+        return [f"memo {m.name}: {m.hits} acertos, {m.misses} faltas, {m.evictions} descartes"
+                for m in PurityAnalysis.memos]
+
+    def stmt(self, stmt: Node, env: Env):
+        if self.func is not None:
+            name = self.func.children[0].value
+            if isinstance(stmt, Print):
+                self.impure.add(name)
+            elif isinstance(stmt, FuncCall):
+                self.calls.setdefault(name, set()).add(stmt.value)
+            elif isinstance(stmt, Assignment) and env.lookup(stmt.children[0].value) is None:
+                self.impure.add(name)
+        super().stmt(stmt, env)
+
+    def expr(self, node: Node, env: Env) -> Node:
+        if self.func is None:
+            return node
+        name = self.func.children[0].value
+        for n in walk(node):
+            if isinstance(n, Read):
+                self.impure.add(name)
+            elif isinstance(n, FuncCall):
+                self.calls.setdefault(name, set()).add(n.value)
+            elif isinstance(n, Identifier) and env.lookup(n.value) is None:
+                self.impure.add(name)
+        return node
+
+    def visit(self) -> Node:
+        # parâmetros repetidos/void fazem a chamada falhar antes do corpo: fora do cache
+        for name, f in self.funcs.items():
+            params = [p.children[0].value for p in f.children[1:-1]]
+            if len(set(params)) != len(params) or any(p.value == 'void' for p in f.children[1:-1]):
+                self.impure.add(name)
+        return super().visit()
@@ -0,0 +1,275 @@
+from __future__ import annotations
+from typing import Dict, Optional, Tuple
+from nodes import (
+    Node, IntVal, Identifier, Assignment, VarDec, TempDec, UnOp, BinOp, If, While, Block,
+    FuncDec, FuncCall, UncheckedOp
+)
+from analysis import Env, ScopedVisitor, shared_decls, transform, type_of, walk, written_names
+
+INF = float('inf')
+TOP = (-INF, INF)
+Interval = Tuple[float, float]
+State = Optional[Dict[str, Interval]]  # None = ponto inalcançável
+
+
+class RangeAnalysis(ScopedVisitor):
+    """
+    Análise de intervalos das variáveis number (interpretação abstrata sobre a
+    AST, com alargamento nos laços). Serve para provar divisores diferentes de
+    zero: '/' e '%' com divisor provado e operandos number viram UncheckedOp,
+    assim como '+', '-' e '*' com os dois lados number, sem as checagens de tipo.
+
+    Escopo dinâmico: chamadas apagam o intervalo de tudo que a função (e quem ela
+    chama) pode atribuir; corpos de função começam sem nada conhecido.
+    """
+    unchecked: int = 0
+    divisions: int = 0
+
+    def __init__(self, root: Node):
+        super().__init__(root)
+        self.state: State = {}
+        self.proven: Dict[int, bool] = {}  # id da divisão -> divisor != 0 em todas as visitas
+
+    @staticmethod
+    def run(root: Node) -> Node:
+        RangeAnalysis.unchecked = 0
+        RangeAnalysis.divisions = 0
+        ra = RangeAnalysis(root)
+        ra.visit()
+        _Unguard(root, ra.proven).visit()
+        return root
+
+    # ------- expressões -------
+    def expr(self, node: Node, env: Env) -> Node:
+        if self.state is None:
+            return node
+        written = written_names(node, self.funcs)
+        if written is None:
+            self.state = {}
+        else:
+            for name in written:
+                self.state.pop(name, None)
+        for n in walk(node):
+            if isinstance(n, BinOp) and type(n) is BinOp and n.value in ('/', '%'):
+                lo, hi = self.interval(n.children[1])
+                self.proven[id(n)] = self.proven.get(id(n), True) and (lo > 0 or hi < 0)
+        return node
+
+    def interval(self, node: Node) -> Interval:
+        if isinstance(node, IntVal):
+            return (node.value, node.value)
+        if isinstance(node, Identifier):
+            return self.state.get(node.value, TOP)
+        if isinstance(node, UnOp):
+            a = self.interval(node.children[0])
+            if node.value == '-': return (-a[1], -a[0])
+            if node.value == '+': return a
+            return TOP
+        if isinstance(node, BinOp) and node.value in ('+', '-', '*', '/', '%'):
+            a = self.interval(node.children[0])
+            b = self.interval(node.children[1])
+            return _arith(node.value, a, b)
+        return TOP
+
+    # ------- statements -------
+    def stmt(self, stmt: Node, env: Env):
+        if isinstance(stmt, If):
+            self._if(stmt, env)
+        elif isinstance(stmt, While):
+            self._while(stmt, env)
+        elif isinstance(stmt, FuncDec):
+            outer, self.state = self.state, {}
+            super().stmt(stmt, env)
+            self.state = outer
+        elif isinstance(stmt, Block):
+            before = dict(self.state) if self.state is not None else None
+            super().stmt(stmt, env)
+            if self.state is not None:
+                written = written_names(stmt, self.funcs)
+                for name in _own_decls(stmt):
+                    # escrita no bloco pode ter ido para a variável de fora (antes do let)
+                    if before is not None and name in before and written is not None and name not in written:
+                        self.state[name] = before[name]
+                    else:
+                        self.state.pop(name, None)
+        elif isinstance(stmt, FuncCall):
+            # chamada como statement: os argumentos passam por expr, mas a própria
+            # chamada também pode atribuir (escopo dinâmico)
+            super().stmt(stmt, env)
+            if self.state is not None:
+                written = written_names(stmt, self.funcs)
+                if written is None:
+                    self.state = {}
+                else:
+                    for name in written:
+                        self.state.pop(name, None)
+        elif isinstance(stmt, (VarDec, Assignment, TempDec)):
+            name = stmt.children[0].value
+            if isinstance(stmt, VarDec) and self.state is not None:
+                self.state[name] = (0, 0)  # criada com o valor padrão antes do inicializador
+            super().stmt(stmt, env)
+            if self.state is None:
+                return
+            if len(stmt.children) == 2 and type_of(stmt.children[1], env) == 'number':
+                self.state[name] = self.interval(stmt.children[1])
+            elif not (isinstance(stmt, VarDec) and stmt.value == 'number' and len(stmt.children) == 1):
+                self.state.pop(name, None)
+        else:
+            super().stmt(stmt, env)
+
+    def _if(self, stmt: If, env: Env):
+        self._expr_slot(stmt, 0, env)
+        cond = stmt.children[0]
+        base = self.state
+        self.state = _refine(base, cond, True, env, self)
+        self.block(stmt.children[1], Env(env))
+        after_then = self.state
+        self.state = _refine(base, cond, False, env, self)
+        if len(stmt.children) == 3:
+            self.block(stmt.children[2], Env(env))
+        self.state = _join(after_then, self.state)
+        for name in shared_decls(stmt):
+            env.forget(name)
+            if self.state is not None:
+                self.state.pop(name, None)
+
+    def _while(self, stmt: While, env: Env):
+        for name in shared_decls(stmt):
+            env.forget(name)
+            if self.state is not None:
+                self.state.pop(name, None)
+        cond = stmt.children[0]
+        head = self.state
+        while True:
+            self.state = dict(head) if head is not None else None
+            self._expr_slot(stmt, 0, env)
+            at_cond = self.state
+            self.state = _refine(at_cond, cond, True, env, self)
+            self.block(stmt.children[1], Env(env))
+            new_head = _widen(head, _join(head, self.state))
+            if new_head == head:
+                break
+            head = new_head
+        self.state = _refine(at_cond, cond, False, env, self)
+
+
+class _Unguard(ScopedVisitor):
+    """Troca as operações aritméticas que não podem falhar por UncheckedOp."""
+    def __init__(self, root: Node, proven: Dict[int, bool]):
+        super().__init__(root)
+        self.proven = proven
+
+    def expr(self, node: Node, env: Env) -> Node:
+        # transform é pós-ordem: as subárvores já calculadas não mudam mais
+        facts: Dict[int, tuple] = {}
+        return transform(node, lambda n: self._op(n, env, facts))
+
+    def _op(self, node: Node, env: Env, facts: Dict[int, tuple]) -> Node:
+        if type(node) is not BinOp or node.value not in ('+', '-', '*', '/', '%'):
+            return node
+        a, b = node.children
+        if type_of(a, env, facts) != 'number' or type_of(b, env, facts) != 'number':
+            return node
+        if node.value in ('/', '%'):
+            if not self.proven.get(id(node), False):
+                return node
+            RangeAnalysis.divisions += 1
+        RangeAnalysis.unchecked += 1
+        return UncheckedOp(node.value, a, b)
+
+
+# ------- aritmética de intervalos -------
+def _mul(x: float, y: float) -> float:
+    return 0 if x == 0 or y == 0 else x * y
+
+def _arith(op: str, a: Interval, b: Interval) -> Interval:
+    if op == '+':
+        return (a[0] + b[0], a[1] + b[1])
+    if op == '-':
+        return (a[0] - b[1], a[1] - b[0])
+    if op == '*':
+        c = [_mul(x, y) for x in a for y in b]
+        return (min(c), max(c))
+    if op == '/':
+        # se não der erro, |int(a/b)| <= |a| (com folga para o arredondamento do float)
+        m = max(abs(a[0]), abs(a[1]))
+        if m > 2 ** 53:
+            m *= 2
+        if (a[0] >= 0 and b[0] > 0) or (a[1] <= 0 and b[1] < 0):
+            return (0, m)
+        if (a[0] >= 0 and b[1] < 0) or (a[1] <= 0 and b[0] > 0):
+            return (-m, 0)
+        return (-m, m)
+    # '%' do Python: o resto tem o sinal do divisor
+    if b[0] > 0:
+        return (0, min(a[1], b[1] - 1) if a[0] >= 0 else b[1] - 1)
+    if b[1] < 0:
+        return (b[0] + 1, 0)
+    m = max(abs(b[0]), abs(b[1])) - 1
+    return (-m, m)
+
+def _join(s: State, t: State) -> State:
+    if s is None: return None if t is None else dict(t)
+    if t is None: return dict(s)
+    return {n: (min(s[n][0], t[n][0]), max(s[n][1], t[n][1])) for n in s.keys() & t.keys()}
+
+def _widen(old: State, new: State) -> State:
+    if old is None or new is None:
+        return new
+    out = {}
+    for n, (lo, hi) in new.items():
+        if n in old:
+            lo = lo if lo >= old[n][0] else -INF
+            hi = hi if hi <= old[n][1] else INF
+        out[n] = (lo, hi)
+    return out
+
+_FLIP = {'<': '>', '>': '<', '<=': '>=', '>=': '<=', '==': '==', '===': '==='}
+_NEG = {'<': '>=', '>=': '<', '>': '<=', '<=': '>', '!=': '==', '!==': '===', '==': '!=', '===': '!=='}
+
+def _refine(state: State, cond: Node, truth: bool, env: Env, ra: RangeAnalysis) -> State:
+    """Estado sabendo que cond avaliou para truth (None se impossível)."""
+    if state is None:
+        return None
+    if isinstance(cond, UnOp) and cond.value == '!':
+        return _refine(state, cond.children[0], not truth, env, ra)
+    if not isinstance(cond, BinOp):
+        return state
+    op = cond.value
+    if (op == '&&' and truth) or (op == '||' and not truth):
+        return _refine(_refine(state, cond.children[0], truth, env, ra), cond.children[1], truth, env, ra)
+    if op not in _NEG:
+        return state
+    if not truth:
+        op = _NEG[op]
+    a, b = cond.children
+    if type_of(a, env) != 'number' or type_of(b, env) != 'number':
+        return state
+    out = dict(state)
+    saved, ra.state = ra.state, out
+    ia, ib = ra.interval(a), ra.interval(b)
+    ra.state = saved
+    for x, other, o in ((a, ib, op), (b, ia, _FLIP.get(op))):
+        if not isinstance(x, Identifier) or o is None:
+            continue
+        lo, hi = out.get(x.value, TOP)
+        if o == '<': hi = min(hi, other[1] - 1)
+        elif o == '<=': hi = min(hi, other[1])
+        elif o == '>': lo = max(lo, other[0] + 1)
+        elif o == '>=': lo = max(lo, other[0])
+        elif o in ('==', '==='): lo, hi = max(lo, other[0]), min(hi, other[1])
+        if lo > hi:
+            return None
+        out[x.value] = (lo, hi)
+    return out
+
+
+def _own_decls(blk: Block) -> set:
+    """Nomes declarados no escopo do próprio bloco (inclui corpos de if/while)."""
+    names = set()
+    for ch in blk.children:
+        if isinstance(ch, (VarDec, TempDec)):
+            names.add(ch.children[0].value)
+        elif isinstance(ch, (If, While)):
+            names |= shared_decls(ch)
+    return names
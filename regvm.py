@@ -0,0 +1,535 @@
+from __future__ import annotations
+import marshal
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+from nodes import (
+    Node, IntVal, BoolVal, StringVal, Identifier, NoOp, Output, Fail, Print, Read, Assignment, VarDec, TempDec,
+    UnOp, BinOp, ShiftOp, UncheckedOp, If, While, CountedWhile, Block, Return, FuncDec, FuncCall, TailCall,
+    ensure_type, str_value_of
+)
+from symbol_table import SymbolTable, Variable, SharedValue
+from purity import Memo
+from bytecode import TYPES, UNOPS, BINOPS, CONTEXTS, STOP_ADJUST, operator_index
+from vm import BINARY_HANDLERS, UNCHECKED_HANDLERS, PreparedCall, unary_op, shift_op
+
+# ------- conjunto de instruções -------
+# Instrução = tupla (opcode, operandos...). Operandos 'd', 'a', 'b', 's', 'p',
+# 'c' são registradores do frame; os demais são inteiros (índices de names,
+# destinos de salto, ...). Os primeiros opcodes são os operadores binários, na
+# ordem de BINOPS, para a VM despachar todos com um único teste.
+UNCHECKED_OPS = ('+', '-', '*', '/', '%')
+OPS: List[Tuple[str, str]] = (
+    [(f"BIN{op}", "d a b") for op in BINOPS]             # d = a op b
+    + [(f"UNCHECKED{op}", "d a b") for op in UNCHECKED_OPS]  # operandos já provados number
+    + [
+        ("UNARY", "d a o"),         # d = UNOPS[o] a
+        ("SHIFT", "d a o k"),       # d = a BINOPS[o] 2^k
+        ("LOAD", "d n"),            # d = st.get(names[n]) (a própria Variable)
+        ("STORE", "n s"),           # st.set(names[n], s)
+        ("DECLARE", "n t"),         # st.create_variable(names[n], TYPES[t])
+        ("INIT", "n t s"),          # confere o tipo de s e faz st.set
+        ("VOID_DECL", "n"),         # erro de variável void
+        ("TEMP", "n s"),            # st.set_temp(names[n], s)
+        ("PRINT", "s"),
+        ("READ", "d"),
+        ("OUTPUT", "s"),            # escreve o texto do registrador s
+        ("FAIL", "s"),              # erro com a mensagem do registrador s
+        ("JUMP", "t"),
+        ("JUMP_IF_FALSE", "c t x"),  # x: contexto da mensagem (CONTEXTS)
+        ("ENTER", ""),
+        ("LEAVE", ""),
+        ("FOR_PREP", "d a b adj step"),  # d = laço sobre range(a, b + adj, step), a é a Variable de i
+        ("FOR_NEXT", "d t"),        # próximo valor em i ou sai para t
+        ("FUNC", "f"),              # registra a função codes[f]
+        ("CALL_BEGIN", "p n argc"),  # p = chamada preparada de names[n]
+        ("ARG", "p i s"),           # s é o argumento i de p
+        ("CALL", "d p"),            # d = retorno da chamada p (None se void)
+        ("TAIL_CALL", "p detach"),  # troca o frame corrente pela chamada p
+        ("RETURN", "s"),            # retorna s; None (função void) não encerra o bloco
+        ("RETURN_NONE", ""),
+    ]
+)
+OPCODES: Dict[str, int] = {name: i for i, (name, _) in enumerate(OPS)}
+N_BINARY = len(BINOPS)
+N_UNCHECKED = N_BINARY + len(UNCHECKED_OPS)
+
+(UNARY, SHIFT, LOAD, STORE, DECLARE, INIT, VOID_DECL, TEMP, PRINT, READ, OUTPUT, FAIL, JUMP, JUMP_IF_FALSE, ENTER,
+ LEAVE, FOR_PREP, FOR_NEXT, FUNC, CALL_BEGIN, ARG, CALL, TAIL_CALL, RETURN, RETURN_NONE) = range(N_UNCHECKED, len(OPS))
+
+MAGIC = "ts-regcode-1"
+
+
+class RegisterCode:
+    """
+    Código de uma função para a VM de registradores: lista de instruções,
+    número de registradores temporários e literais.
+
+    Os literais ocupam o fim do frame, em ordem inversa: o literal k é o
+    registrador -(k+1), que a lista do Python indexa a partir do fim. Assim os
+    temporários podem ser numerados enquanto os literais ainda aparecem.
+    """
+    def __init__(self, name: str, public: str, rtype: str, params: List[Tuple[str, str]], memo: bool = False):
+        self.name = name
+        self.public = public
+        self.rtype = rtype
+        self.params = params
+        self.memo = memo
+        self.code: List[tuple] = []
+        self.consts: List[tuple] = []
+        self.names: List[str] = []
+        self.ntemps = 0
+        self.template: Optional[List[Any]] = None  # frame inicial, montado na primeira chamada
+
+    def emit(self, op: str, *args: int) -> int:
+        self.code.append((OPCODES[op],) + args)
+        return len(self.code) - 1
+
+    def patch(self, pos: int, slot: int, value: int):
+        ins = list(self.code[pos])
+        ins[1 + slot] = value
+        self.code[pos] = tuple(ins)
+
+    def const(self, vtype: str, value) -> int:
+        for i, (t, v) in enumerate(self.consts):
+            if t == vtype and v == value and type(v) is type(value):
+                return -(i + 1)
+        self.consts.append((vtype, value))
+        return -len(self.consts)
+
+    def name_index(self, name: str) -> int:
+        if name not in self.names:
+            self.names.append(name)
+        return self.names.index(name)
+
+    def frame(self) -> List[Any]:
+        """Registradores de uma chamada nova: temporários vazios e os literais (compartilhados)."""
+        if self.template is None:
+            self.template = [None] * self.ntemps + [SharedValue(t, v) for t, v in reversed(self.consts)]
+        return self.template[:]
+
+    def to_tuple(self) -> tuple:
+        return (self.name, self.public, self.rtype, tuple(self.params), self.memo, tuple(self.code),
+                tuple(self.consts), tuple(self.names), self.ntemps)
+
+    @staticmethod
+    def from_tuple(t: tuple) -> 'RegisterCode':
+        name, public, rtype, params, memo, code, consts, names, ntemps = t
+        co = RegisterCode(name, public, rtype, [tuple(p) for p in params], memo)
+        co.code, co.consts, co.names, co.ntemps = list(code), list(consts), list(names), ntemps
+        return co
+
+
+class RegisterProgram:
+    """codes[0] é o programa principal; serializável com marshal, como bytecode.Program."""
+    def __init__(self, codes: List[RegisterCode]):
+        self.codes = codes
+
+    def dumps(self) -> bytes:
+        return marshal.dumps((MAGIC, tuple(c.to_tuple() for c in self.codes)))
+
+    @staticmethod
+    def loads(data: bytes) -> 'RegisterProgram':
+        magic, codes = marshal.loads(data)
+        if magic != MAGIC:
+            raise Exception(f"[Bytecode] Formato desconhecido: {magic}")
+        return RegisterProgram([RegisterCode.from_tuple(t) for t in codes])
+
+
+class RegisterCompiler:
+    """
+    Compila a AST para código de três endereços ('BIN+ r3, r1, r2').
+
+    Alocação de registradores: cada statement usa temporários novos a partir
+    de 'base' (contador crescente, zerado no statement seguinte); um laço
+    contado reserva o registrador do seu estado enquanto o corpo compila.
+    Literais não custam instrução (ficam pré-carregados no frame) e, dentro de
+    uma expressão, cada nome é buscado uma vez só: até o fim da expressão
+    st.get devolve a mesma Variable (chamadas abrem escopos novos e não trocam
+    as do chamador), e o valor continua sendo lido dela na hora da operação.
+    """
+
+    @staticmethod
+    def compile(root: Node) -> RegisterProgram:
+        rc = RegisterCompiler()
+        main = RegisterCode("<main>", "<main>", "void", [])
+        rc.codes.append(main)
+        rc.body(main, root.children)
+        return RegisterProgram(rc.codes)
+
+    def __init__(self):
+        self.codes: List[RegisterCode] = []
+        self.co: Optional[RegisterCode] = None
+        self.base = 0
+        self.next = 0
+        self.loaded: Dict[str, int] = {}
+
+    def body(self, co: RegisterCode, stmts: List[Node]):
+        saved = self.co, self.base, self.next
+        self.co, self.base, self.next = co, 0, 0
+        self.block(stmts)
+        co.emit("RETURN_NONE")
+        self.co, self.base, self.next = saved
+
+    def temp(self) -> int:
+        r = self.next
+        self.next += 1
+        self.co.ntemps = max(self.co.ntemps, self.next)
+        return r
+
+    # ------- statements -------
+    def block(self, stmts: List[Node]):
+        for s in stmts:
+            self.next = self.base
+            self.loaded = {}
+            self.stmt(s)
+
+    def stmt(self, s: Node):
+        co = self.co
+        if isinstance(s, Block):
+            if s.scoped:
+                co.emit("ENTER")
+                self.block(s.children)
+                co.emit("LEAVE")
+            else:
+                self.block(s.children)
+        elif isinstance(s, VarDec):
+            n = co.name_index(s.children[0].value)
+            if s.value == 'void' and not s.is_function:
+                co.emit("VOID_DECL", n)
+                return
+            t = TYPES.index(s.value)
+            co.emit("DECLARE", n, t)
+            if len(s.children) == 2:
+                co.emit("INIT", n, t, self.expr(s.children[1]))
+        elif isinstance(s, Assignment):
+            co.emit("STORE", co.name_index(s.children[0].value), self.expr(s.children[1]))
+        elif isinstance(s, TempDec):
+            co.emit("TEMP", co.name_index(s.children[0].value), self.expr(s.children[1]))
+        elif isinstance(s, Print):
+            co.emit("PRINT", self.expr(s.children[0]))
+        elif isinstance(s, Output):
+            co.emit("OUTPUT", co.const('string', s.value))
+        elif isinstance(s, Fail):
+            co.emit("FAIL", co.const('string', s.value))
+        elif isinstance(s, Return):
+            if isinstance(s.children[0], TailCall):
+                co.emit("TAIL_CALL", self.call(s.children[0]), int(s.children[0].detach))
+            else:
+                co.emit("RETURN", self.expr(s.children[0]))
+        elif isinstance(s, FuncCall):
+            co.emit("RETURN", self.expr(s))  # não-void como statement retorna
+        elif isinstance(s, If):
+            jf = co.emit("JUMP_IF_FALSE", self.expr(s.children[0]), 0, 0)
+            self.block(s.children[1].children)
+            if len(s.children) == 3:
+                j = co.emit("JUMP", 0)
+                co.patch(jf, 1, len(co.code))
+                self.block(s.children[2].children)
+                co.patch(j, 0, len(co.code))
+            else:
+                co.patch(jf, 1, len(co.code))
+        elif isinstance(s, CountedWhile):
+            cond = s.children[0]
+            i = self.load(s.ind)  # i é buscado antes do limite, como no evaluate
+            bound = self.expr(cond.children[1])
+            d = self.temp()
+            co.emit("FOR_PREP", d, i, bound, STOP_ADJUST[cond.value], s.step)
+            top = co.emit("FOR_NEXT", d, 0)
+            saved = self.base
+            self.base = d + 1  # o estado do laço vive enquanto o corpo roda
+            self.block(s.children[1].children[:-1])
+            self.base = saved
+            co.emit("JUMP", top)
+            co.patch(top, 1, len(co.code))
+        elif isinstance(s, While):
+            top = len(co.code)
+            jf = co.emit("JUMP_IF_FALSE", self.expr(s.children[0]), 0, 1)
+            self.block(s.children[1].children)
+            co.emit("JUMP", top)
+            co.patch(jf, 1, len(co.code))
+        elif isinstance(s, FuncDec):
+            co.emit("FUNC", self.function(s))
+        elif isinstance(s, NoOp):
+            pass
+        else:
+            raise Exception(f"[Bytecode] Statement não suportado: {type(s).__name__}")
+
+    def function(self, f: FuncDec) -> int:
+        params = [(p.children[0].value, p.value) for p in f.children[1:-1]]
+        fco = RegisterCode(f.children[0].value, f.public, f.value, params, f.memo is not None)
+        index = len(self.codes)
+        self.codes.append(fco)
+        self.body(fco, f.children[-1].children)
+        return index
+
+    # ------- expressões: devolvem o registrador com o resultado -------
+    def load(self, name: str) -> int:
+        if name not in self.loaded:
+            self.loaded[name] = d = self.temp()
+            self.co.emit("LOAD", d, self.co.name_index(name))
+        return self.loaded[name]
+
+    def expr(self, e: Node) -> int:
+        co = self.co
+        if isinstance(e, IntVal):
+            return co.const('number', e.value)
+        if isinstance(e, BoolVal):
+            return co.const('boolean', e.value)
+        if isinstance(e, StringVal):
+            return co.const('string', e.value)
+        if isinstance(e, Identifier):
+            return self.load(e.value)
+        if isinstance(e, Read):
+            d = self.temp()
+            co.emit("READ", d)
+            return d
+        if isinstance(e, UnOp):
+            a = self.expr(e.children[0])
+            d = self.temp()
+            co.emit("UNARY", d, a, operator_index(UNOPS, e.value))
+            return d
+        if isinstance(e, ShiftOp):
+            a = self.expr(e.children[0])
+            d = self.temp()
+            co.emit("SHIFT", d, a, operator_index(BINOPS, e.value), e.k)
+            return d
+        if isinstance(e, BinOp):
+            a = self.expr(e.children[0])
+            b = self.expr(e.children[1])
+            d = self.temp()
+            operator_index(BINOPS, e.value)
+            co.emit(f"UNCHECKED{e.value}" if isinstance(e, UncheckedOp) else f"BIN{e.value}", d, a, b)
+            return d
+        if isinstance(e, FuncCall):
+            p = self.call(e)
+            d = self.temp()
+            co.emit("CALL", d, p)
+            return d
+        raise Exception(f"[Bytecode] Expressão não suportada: {type(e).__name__}")
+
+    def call(self, c: FuncCall) -> int:
+        p = self.temp()
+        self.co.emit("CALL_BEGIN", p, self.co.name_index(c.value), len(c.children))
+        for i, arg in enumerate(c.children):
+            self.co.emit("ARG", p, i, self.expr(arg))
+        return p
+
+
+class RegisterFrame:
+    """Chamada em execução na VM de registradores."""
+    __slots__ = ("co", "regs", "pc", "st", "base", "ret", "checks", "memo", "key")
+
+    def __init__(self, co: RegisterCode, regs: List[Any], st: SymbolTable, ret: int):
+        self.co = co
+        self.regs = regs
+        self.pc = 0
+        self.st = st
+        self.base = st      # escopo da chamada
+        self.ret = ret      # registrador do chamador que recebe o retorno
+        self.checks = [(co.public, co.rtype)]
+        self.memo: Optional[Memo] = None
+        self.key: tuple = ()
+
+
+class RegisterVM:
+    """
+    VM de registradores (--engine=reg). Cada chamada tem um frame com os
+    registradores da função; as instruções leem e escrevem nele diretamente,
+    sem empilhar e desempilhar operandos: 's = s + i * i' são 5 instruções
+    (LOAD, LOAD, BIN*, BIN+, STORE) contra 6 na VM de pilha e 7 evaluates.
+
+    Registradores guardam Variables, como a pilha de vm.StackVM; chamadas,
+    memo, chamadas em cauda e mensagens de erro seguem a mesma lógica de lá.
+    """
+
+    def __init__(self, program: RegisterProgram, memos: Optional[Dict[str, Memo]] = None):
+        self.program = program
+        self.memos: Dict[str, Memo] = dict(memos or {})
+
+    @staticmethod
+    def run(program: RegisterProgram, st: SymbolTable, memos: Optional[Dict[str, Memo]] = None):
+        RegisterVM(program, memos).execute(st)
+
+    def memo_of(self, co: RegisterCode) -> Optional[Memo]:
+        if not co.memo:
+            return None
+        if co.name not in self.memos:
+            self.memos[co.name] = Memo(co.name)
+        return self.memos[co.name]
+
+    def execute(self, st: SymbolTable):
+        codes = self.program.codes
+        frames: List[RegisterFrame] = []
+        binary, unchecked = BINARY_HANDLERS, UNCHECKED_HANDLERS
+        f = RegisterFrame(codes[0], codes[0].frame(), st, 0)
+        code, regs, names = f.co.code, f.regs, f.co.names
+        pc = 0
+        while True:
+            ins = code[pc]
+            op = ins[0]
+            pc += 1
+            if op < N_BINARY:
+                regs[ins[1]] = binary[op](regs[ins[2]], regs[ins[3]])
+            elif op < N_UNCHECKED:
+                b = regs[ins[3]].value
+                regs[ins[1]] = Variable("number", unchecked[op - N_BINARY](regs[ins[2]].value, b))
+            elif op == LOAD:
+                regs[ins[1]] = st.get(names[ins[2]])
+            elif op == STORE:
+                st.set(names[ins[1]], regs[ins[2]])
+            elif op == JUMP_IF_FALSE:
+                c = regs[ins[1]]
+                ensure_type(c, 'boolean', CONTEXTS[ins[3]])
+                if not c.value:
+                    pc = ins[2]
+            elif op == JUMP:
+                pc = ins[1]
+            elif op == FOR_NEXT:
+                loop = regs[ins[1]]  # [i, iterador, último valor, passo]
+                v = next(loop[1], None)
+                if v is None:
+                    if loop[2] is not None:
+                        loop[0].value = loop[2] + loop[3]
+                    pc = ins[2]
+                else:
+                    loop[0].value = loop[2] = v
+            elif op == FOR_PREP:
+                iv = regs[ins[2]]
+                regs[ins[1]] = [iv, iter(range(iv.value, regs[ins[3]].value + ins[4], ins[5])), None, ins[5]]
+            elif op == CALL_BEGIN:
+                fname = names[ins[2]]
+                fvar = st.get(fname)
+                if not getattr(fvar, "is_function", False):
+                    raise Exception(f"[Semantic] '{fname}' não é uma função")
+                callee: RegisterCode = fvar.value
+                if len(callee.params) != ins[3]:
+                    raise Exception(f"[Semantic] Chamada de '{fname}' com {ins[3]} argumentos; esperado {len(callee.params)}")
+                p = regs[ins[1]] = PreparedCall(callee, SymbolTable(parent=st))
+                if callee.params:
+                    # o parâmetro é criado antes de o argumento ser avaliado, como em FuncCall.bind
+                    p.call_st.create_variable(*callee.params[0])
+            elif op == ARG:
+                p = regs[ins[1]]
+                params = p.co.params
+                i = ins[2]
+                pname, ptype = params[i]
+                aval = regs[ins[3]]
+                if aval.type != ptype:
+                    raise Exception(f"[Semantic] Tipo inválido no argumento '{pname}' de '{p.co.public}': esperado {ptype}, recebeu {aval.type}")
+                p.call_st.set(pname, aval)
+                if p.co.memo:
+                    p.key.append(aval.value)
+                if i + 1 < len(params):
+                    p.call_st.create_variable(*params[i + 1])
+            elif op == CALL:
+                p = regs[ins[2]]
+                memo = self.memo_of(p.co)
+                key = tuple(p.key)
+                if memo is not None:
+                    r = memo.get(key)
+                    if r is not None:
+                        regs[ins[1]] = r
+                        continue
+                f.pc, f.st = pc, st
+                frames.append(f)
+                f = RegisterFrame(p.co, p.co.frame(), p.call_st, ins[1])
+                f.memo, f.key = memo, key
+                code, regs, names, st = f.co.code, f.regs, f.co.names, f.st
+                pc = 0
+            elif op == TAIL_CALL:
+                # troca o frame corrente pela chamada, como o laço de PendingCall.run
+                p = regs[ins[1]]
+                if ins[2]:
+                    p.call_st.parent = f.base.parent
+                check = (p.co.public, p.co.rtype)
+                if f.checks[-1] != check:
+                    f.checks.append(check)
+                f.co, f.regs, f.base = p.co, p.co.frame(), p.call_st
+                code, regs, names, st = f.co.code, f.regs, f.co.names, p.call_st
+                pc = 0
+            elif op == RETURN or op == RETURN_NONE:
+                r = regs[ins[1]] if op == RETURN else None
+                if r is None and op == RETURN:
+                    continue  # resultado de função void não encerra o bloco (Block só para em Variable)
+                if not frames:
+                    return  # return no nível de topo encerra o programa
+                for fname, rtype in reversed(f.checks):
+                    r = FuncCall.check_return(fname, rtype, r)
+                if f.memo is not None:
+                    f.memo.put(f.key, r)
+                ret = f.ret
+                f = frames.pop()
+                code, regs, names, st, pc = f.co.code, f.regs, f.co.names, f.st, f.pc
+                regs[ret] = r
+            elif op == DECLARE:
+                st.create_variable(names[ins[1]], TYPES[ins[2]])
+            elif op == INIT:
+                name, vtype = names[ins[1]], TYPES[ins[2]]
+                v = regs[ins[3]]
+                if v.type != vtype:
+                    raise Exception(f"[Semantic] Tipos incompatíveis em inicialização de '{name}': esperado {vtype}, recebeu {v.type}")
+                st.set(name, v)
+            elif op == ENTER:
+                st = SymbolTable(parent=st)
+            elif op == LEAVE:
+                st = st.parent
+            elif op == PRINT:
+                print(str_value_of(regs[ins[1]]))
+            elif op == READ:
+                regs[ins[1]] = _READ.evaluate(st)
+            elif op == TEMP:
+                st.set_temp(names[ins[1]], regs[ins[2]])
+            elif op == UNARY:
+                regs[ins[1]] = unary_op(UNOPS[ins[3]], regs[ins[2]])
+            elif op == SHIFT:
+                regs[ins[1]] = shift_op(BINOPS[ins[3]], ins[4], regs[ins[2]])
+            elif op == FUNC:
+                fco = codes[ins[1]]
+                st.create_function(fco.name, fco.rtype, fco)
+            elif op == VOID_DECL:
+                raise Exception(f"[Semantic] Variável '{names[ins[1]]}' não pode ter tipo void")
+            elif op == OUTPUT:
+                sys.stdout.write(regs[ins[1]].value)
+            elif op == FAIL:
+                raise Exception(regs[ins[1]].value)
+            else:
+                raise Exception(f"[VM] Opcode inválido: {op}")
+
+
+_READ = Read()
+
+
+def disassemble(program: RegisterProgram) -> str:
+    """Listagem do código de registradores: rN temporário, kN literal."""
+    lines: List[str] = []
+    for index, co in enumerate(program.codes):
+        params = ", ".join(f"{n}: {t}" for n, t in co.params)
+        lines.append(f"#{index} {co.name}({params}): {co.rtype} [{co.ntemps} temporários]" + (" [memo]" if co.memo else ""))
+        for pc, ins in enumerate(co.code):
+            name, fields = OPS[ins[0]]
+            args = []
+            for field, v in zip(fields.split(), ins[1:]):
+                if field in ('d', 'a', 'b', 's', 'p', 'c'):
+                    args.append(_register(co, v))
+                elif field == 'n':
+                    args.append(co.names[v])
+                elif field == 't' and name in ('DECLARE', 'INIT'):
+                    args.append(TYPES[v])
+                elif field == 'o':
+                    args.append(UNOPS[v] if name == 'UNARY' else BINOPS[v])
+                elif field == 'x':
+                    args.append(CONTEXTS[v])
+                elif field == 'f':
+                    args.append(program.codes[v].name)
+                else:
+                    args.append(str(v))
+            lines.append(f"  {pc:5d} {name:<14}{', '.join(args)}")
+    return "\n".join(lines)
+
+
+def _register(co: RegisterCode, r: int) -> str:
+    if r >= 0:
+        return f"r{r}"
+    vtype, value = co.consts[-r - 1]
+    shown = repr(value) if vtype == 'string' else str(value).lower() if vtype == 'boolean' else str(value)
+    return f"k{-r - 1}({shown})"
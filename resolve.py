@@ -0,0 +1,204 @@
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Set, Tuple
+from nodes import Node, IntVal, Read, BinOp, UncheckedOp, FuncDec, FuncCall
+from analysis import unique_functions, walk, shared_decls
+
+
+class Unsupported(Exception):
+    """O programa usa algo que a resolução estática não reproduz exatamente; roda no motor com Variable."""
+
+
+class Level:
+    """Um escopo da SymbolTable visto estaticamente: nomes certamente declarados e incertos."""
+    def __init__(self, parent: Optional['Level'], ident: int):
+        self.parent = parent
+        self.ident = ident
+        self.names: Dict[str, Tuple[object, str]] = {}  # nome -> (local do motor, tipo)
+        self.maybe: Set[str] = set()
+
+
+class StaticScopes(ABC):
+    """
+    Escopos da SymbolTable acompanhados em tempo de compilação: cada bloco é
+    um Level; o que um if/while pode ou não declarar fica incerto (maybe).
+    Cada motor decide o que é um local (new_local) e o que fazer com um nome
+    que não resolve estaticamente (uncertain, dynamic, redeclared).
+    """
+    levels = 0
+
+    @abstractmethod
+    def new_local(self, name: str, vtype: str, level: Level) -> object: ...
+
+    @abstractmethod
+    def uncertain(self, name: str) -> Tuple[object, Optional[str]]:
+        """Leitura ou escrita de um nome que pode ou não estar declarado."""
+
+    @abstractmethod
+    def dynamic(self, name: str) -> Tuple[object, Optional[str]]:
+        """Nome que não é local: só a busca dinâmica o encontra."""
+
+    @abstractmethod
+    def redeclared(self, name: str): ...
+
+    def level(self, parent: Optional[Level]) -> Level:
+        self.levels += 1
+        return Level(parent, self.levels)
+
+    def lookup(self, name: str, level: Level) -> Tuple[object, Optional[str]]:
+        lv: Optional[Level] = level
+        while lv is not None:
+            if name in lv.names:
+                return lv.names[name]
+            if name in lv.maybe:
+                return self.uncertain(name)
+            lv = lv.parent
+        return self.dynamic(name)
+
+    def declare(self, name: str, vtype: str, level: Level) -> object:
+        if name in level.names or name in level.maybe:
+            self.redeclared(name)
+        local = self.new_local(name, vtype, level)
+        level.names[name] = (local, vtype)
+        return local
+
+    def shared(self, stmt: Node, level: Level) -> Set[str]:
+        """Nomes que o if/while pode declarar no escopo corrente e que ainda não existem nele."""
+        return {n for n in shared_decls(stmt) if n not in level.names}
+
+    def settle(self, names: Set[str], level: Level):
+        """Depois do if/while: o que ele declarou no escopo corrente fica incerto."""
+        for n in names:
+            level.names.pop(n, None)
+            level.maybe.add(n)
+
+
+class StaticResolver(StaticScopes):
+    """
+    Base dos motores que trocam a SymbolTable por locais resolvidos em tempo
+    de compilação (transpile.py, unboxed.py): valores crus, sem Variable e
+    sem busca por nome.
+
+    Só vale quando o comportamento do evaluate é determinado estaticamente:
+    - todo nome lido ou escrito resolve, pelos blocos, para uma declaração que
+      com certeza já rodou na mesma função (sem escopo dinâmico: funções só
+      enxergam parâmetros e locais) e nenhuma variável tem nome de função;
+    - os tipos de todas as expressões batem (sem erro de tipo possível).
+    Fora disso levanta Unsupported. Cada motor decide o que é um local
+    (nome Python, índice de slot) em new_local; os escopos são os de
+    StaticScopes, que o bytecode.py também usa.
+    """
+
+    def __init__(self, root: Node):
+        self.root = root
+        self.funcs = unique_functions(root)
+        decls = [s for s in root.children if isinstance(s, FuncDec)]
+        if len(decls) != len(self.funcs) or sum(isinstance(n, FuncDec) for n in walk(root)) != len(decls):
+            raise Unsupported("função redeclarada, aninhada ou com nome de variável")
+        self.index = {s.children[0].value: i for i, s in enumerate(root.children) if isinstance(s, FuncDec)}
+        self.func: Optional[FuncDec] = None
+        self.top = 0  # statement de topo corrente (código principal)
+
+    # ------- escopos -------
+    def uncertain(self, name: str) -> Tuple[object, str]:
+        raise Unsupported(f"'{name}' pode ou não estar declarada")
+
+    def dynamic(self, name: str) -> Tuple[object, str]:
+        raise Unsupported(f"'{name}' não é local (escopo dinâmico)")
+
+    def redeclared(self, name: str):
+        raise Unsupported(f"redeclaração de '{name}'")
+
+    def redefine(self, name: str, vtype: Optional[str], level: Level) -> object:
+        """TempDec: (re)define o temporário no escopo corrente, com tipo fixo."""
+        if vtype is None or (name in level.names and level.names[name][1] != vtype):
+            raise Unsupported(f"temporário '{name}' sem tipo fixo")
+        level.maybe.discard(name)
+        if name not in level.names:
+            level.names[name] = (self.new_local(name, vtype, level), vtype)
+        return level.names[name][0]
+
+    def params(self, f: FuncDec, level: Level) -> List[object]:
+        """Declara os parâmetros de f no nível da função."""
+        params = f.children[1:-1]
+        if len({p.children[0].value for p in params}) != len(params) or any(p.value == 'void' for p in params):
+            raise Unsupported(f"parâmetros inválidos em '{f.public}'")
+        return [self.declare(p.children[0].value, p.value, level) for p in params]
+
+    # ------- tipos -------
+    @staticmethod
+    def binop_type(e: BinOp, ta: Optional[str], tb: Optional[str]) -> str:
+        """Tipo do resultado; Unsupported quando o evaluate poderia dar erro de tipo."""
+        op = e.value
+        if ta is None or tb is None:
+            raise Unsupported("valor void numa operação")
+        if op in ('+', '-', '*', '/', '%'):
+            if op == '+' and 'string' in (ta, tb):
+                return 'string'
+            if ta != 'number' or tb != 'number':
+                raise Unsupported(f"aritmética {ta} {op} {tb}")
+            return 'number'
+        if op in ('<', '>', '<=', '>='):
+            if ta != tb or ta not in ('number', 'string'):
+                raise Unsupported(f"relacional {ta} {op} {tb}")
+            return 'boolean'
+        if op in ('===', '!=='):
+            if ta != tb:
+                raise Unsupported(f"comparação estrita {ta} {op} {tb}")
+            return 'boolean'
+        if op in ('==', '!='):
+            return 'boolean'
+        if op in ('&&', '||'):
+            if ta != 'boolean' or tb != 'boolean':
+                raise Unsupported(f"lógico {ta} {op} {tb}")
+            return 'boolean'
+        raise Unsupported(f"operador {op}")
+
+    @staticmethod
+    def checks_zero(e: BinOp) -> bool:
+        """'/' e '%' que ainda precisam testar divisor zero."""
+        literal = isinstance(e.children[1], IntVal) and e.children[1].value != 0
+        return not (literal or isinstance(e, UncheckedOp))
+
+    # ------- chamadas -------
+    def callee(self, c: FuncCall) -> Tuple[FuncDec, bool]:
+        """
+        Função chamada por c e se a chamada precisa conferir em execução que a
+        FuncDec já rodou (função que chama declarada antes da chamada).
+        """
+        name = c.value
+        f = self.funcs.get(name)
+        if f is None:
+            raise Unsupported(f"chamada de '{name}', que não é uma função declarada")
+        params = f.children[1:-1]
+        if len(params) != len(c.children):
+            raise Unsupported(f"aridade errada em '{name}'")
+        if len({p.children[0].value for p in params}) != len(params) or any(p.value == 'void' for p in params):
+            raise Unsupported(f"parâmetros inválidos em '{name}'")
+        if self.func is None:
+            if self.index[name] >= self.top:
+                raise Unsupported(f"chamada de '{name}' antes da declaração")
+            return f, False
+        # a função corrente pode rodar antes de a FuncDec de 'name' ter sido executada
+        return f, self.func is not f and self.index[name] >= self.index[self.func.children[0].value]
+
+    @staticmethod
+    def arg_types(c: FuncCall, f: FuncDec, types: List[Optional[str]]):
+        for p, t in zip(f.children[1:-1], types):
+            if t != p.value:
+                raise Unsupported(f"argumento {t} para '{p.children[0].value}' de '{c.value}'")
+
+
+# ------- operações em tempo de execução sobre valores crus -------
+# (aritmética: int_div, int_mod, shift_right e reduce_closed de nodes.py)
+DEFAULT = {'number': 0, 'boolean': False, 'string': ""}
+
+_READ = Read()
+
+def read_number() -> int:
+    return _READ.evaluate(None).value
+
+def check_declared(declared: Set[str], name: str, fn):
+    if name not in declared:
+        raise Exception(f"[Semantic] Identificador '{name}' não declarado")
+    return fn
@@ -0,0 +1,48 @@
+from __future__ import annotations
+from nodes import Node, VarDec, TempDec, FuncDec, If, While, Block
+from symbol_table import SymbolTable
+from analysis import walk
+
+
+class ScopeElision:
+    """
+    Blocos aninhados ({ ... } dentro de outro bloco) abrem um SymbolTable novo
+    a cada execução. Se nada é declarado nesse escopo (nem no próprio bloco,
+    nem nos corpos de if/while dele, que usam o mesmo escopo), a tabela ficaria
+    vazia: toda busca e atribuição passaria direto para o pai. Esses blocos
+    passam a rodar no escopo do pai (Block.scoped = False).
+
+    Os demais ganham um frame pré-alocado (Block.frames), reaproveitado a cada
+    execução; chamadas recursivas que reentram no bloco pegam frames extras.
+    """
+    elided: int = 0
+    framed: int = 0
+
+    @staticmethod
+    def run(root: Node) -> Node:
+        ScopeElision.elided = 0
+        ScopeElision.framed = 0
+        for n in walk(root):
+            if not isinstance(n, Block):
+                continue
+            for ch in n.children:
+                if not isinstance(ch, Block):
+                    continue
+                if declares(ch):
+                    ch.scoped = True
+                    ch.frames = [SymbolTable()]
+                    ScopeElision.framed += 1
+                else:
+                    ch.scoped = False
+                    ScopeElision.elided += 1
+        return root
+
+
+def declares(blk: Node) -> bool:
+    """O bloco cria algum nome no próprio escopo (incluindo corpos de if/while)?"""
+    for ch in blk.children:
+        if isinstance(ch, (VarDec, TempDec, FuncDec)):
+            return True
+        if isinstance(ch, (If, While)) and any(declares(body) for body in ch.children[1:]):
+            return True
+    return False
@@ -0,0 +1,184 @@
+from __future__ import annotations
+from typing import Dict, List, Optional, Set, Tuple
+from nodes import Node, IntVal, BoolVal, StringVal, Identifier, Assignment, VarDec, Block, FuncDec, FuncCall
+from analysis import (
+    Env, ScopedVisitor, clone, count_nodes, declared_names, is_literal, literal_type, looked_up_names, transform, walk
+)
+
+# (função, ((posição do parâmetro, valor literal), ...))
+SpecKey = Tuple[str, Tuple[Tuple[int, object], ...]]
+
+
+class Specializer(ScopedVisitor):
+    """
+    Especialização interprocedural: para cada combinação (função, argumentos
+    literais) que aparece em pelo menos MIN_SITES chamadas, cria um clone
+    '_f_k' sem esses parâmetros, com os valores já no corpo, e reescreve as
+    chamadas para o clone. Os passes seguintes (constfold, dce, ...) dobram o
+    corpo de cada clone com as constantes.
+
+    O tamanho total dos clones (em nós) não passa de BUDGET; as combinações mais
+    frequentes são escolhidas primeiro.
+
+    Equivalência com a chamada original:
+    - o clone fica logo depois da FuncDec original, então está registrado
+      sempre que ela está; só são reescritas chamadas em pontos onde a função já
+      foi declarada (mesma regra do inliner) ou de dentro dela mesma;
+    - argumentos literais não falham nem têm efeito, removê-los não muda a ordem
+      dos erros dos outros argumentos;
+    - escopo dinâmico: o parâmetro só é trocado pelo literal se o corpo não o
+      redeclara nem atribui e nenhuma função chamada pode buscá-lo; senão o
+      clone começa com 'let p = <literal>', no mesmo escopo dos parâmetros;
+    - mensagens de erro usam o nome original (FuncDec.public).
+    """
+    BUDGET: int = 200   # nós somados de todos os clones
+    MIN_SITES: int = 2  # chamadas com a mesma combinação para valer um clone
+
+    decisions: List[str] = []
+    cloned: int = 0
+
+    def __init__(self, root: Node):
+        super().__init__(root)
+        self.index: Dict[str, int] = {
+            st.children[0].value: i for i, st in enumerate(root.children) if isinstance(st, FuncDec)
+        }
+        self.sites: Dict[SpecKey, List[FuncCall]] = {}
+
+    @staticmethod
+    def run(root: Node, budget: int | None = None) -> Node:
+        if budget is not None: Specializer.BUDGET = int(budget)
+        Specializer.decisions = []
+        Specializer.cloned = 0
+        sp = Specializer(root)
+        sp.visit()
+        sp._specialize()
+        return root
+
+    # ------- coleta das chamadas -------
+    def expr(self, node: Node, env: Env) -> Node:
+        for n in walk(node):
+            if isinstance(n, FuncCall):
+                self._site(n)
+        return node
+
+    def stmt(self, stmt: Node, env: Env):
+        if isinstance(stmt, FuncCall):
+            self._site(stmt)
+        super().stmt(stmt, env)
+
+    def _site(self, call: FuncCall):
+        name = call.value
+        f = self.funcs.get(name)
+        if f is None or name not in self.index:
+            return
+        if self.func is not f:
+            where = self.index[self.func.children[0].value] if self.func is not None else self.top
+            if self.index[name] >= where:
+                return
+        params = f.children[1:-1]
+        if len(params) != len(call.children):
+            return
+        if len({p.children[0].value for p in params}) != len(params) or any(p.value == 'void' for p in params):
+            return
+        consts = tuple((i, a.value) for i, (p, a) in enumerate(zip(params, call.children))
+                       if is_literal(a) and literal_type(a) == p.value)
+        if consts:
+            self.sites.setdefault((name, consts), []).append(call)
+
+    # ------- clones -------
+    def _specialize(self):
+        # candidatas: subconjuntos dos argumentos literais de cada chamada; uma
+        # chamada pode usar qualquer candidata contida nos seus literais
+        covers: Dict[SpecKey, List[FuncCall]] = {}
+        for (name, consts), calls in self.sites.items():
+            for sub in _subsets(consts):
+                covers.setdefault((name, sub), []).extend(calls)
+        ranked = sorted(covers.items(), key=lambda kv: (-len(kv[1]), -len(kv[0][1])))
+        taken: Set[int] = set()
+        spent = 0
+        counters: Dict[str, int] = {}
+        inserts: List[Tuple[FuncDec, Dict[int, object], str]] = []
+        for (name, consts), calls in ranked:
+            calls = [c for c in calls if id(c) not in taken]
+            if len(calls) < Specializer.MIN_SITES:
+                continue
+            label = f"{name}[{', '.join(self._describe(name, i, v) for i, v in consts)}]"
+            f = self.funcs[name]
+            size = count_nodes(f) - len(consts)
+            if spent + size > Specializer.BUDGET:
+                Specializer.decisions.append(f"não clona {label}: passa do orçamento ({spent} + {size} > {Specializer.BUDGET})")
+                continue
+            spent += size
+            k = counters.get(name, 0)
+            counters[name] = k + 1
+            new_name = f"_{name}_{k}"
+            positions = {i for i, _ in consts}
+            for call in calls:
+                taken.add(id(call))
+                call.value = new_name
+                call.children = [a for i, a in enumerate(call.children) if i not in positions]
+            inserts.append((f, dict(consts), new_name))
+            Specializer.cloned += 1
+            Specializer.decisions.append(f"{label} -> {new_name}: {len(calls)} chamada(s)")
+        # clona depois de reescrever todas as chamadas: as que estão no corpo
+        # original já apontam para o clone certo
+        for f, values, new_name in inserts:
+            self.root.children.insert(self.root.children.index(f) + 1, self._clone(f, values, new_name))
+
+    def _clone(self, f: FuncDec, values: Dict[int, object], new_name: str) -> FuncDec:
+        g: FuncDec = clone(f)
+        g.children[0].value = new_name
+        params = g.children[1:-1]
+        body: Block = g.children[-1]
+        prologue: List[Node] = []
+        for i in sorted(values):
+            p: VarDec = params[i]
+            pname = p.children[0].value
+            lit = self._literal(p.value, values[i])
+            if self._substitutable(body, pname):
+                transform(body, lambda n: clone(lit) if isinstance(n, Identifier) and n.value == pname else n)
+            else:
+                prologue.append(VarDec(p.value, Identifier(pname), lit))
+        body.children[:0] = prologue
+        # chamadas recursivas que, já com os literais no lugar, repetem os valores
+        # do clone passam a chamar o próprio clone
+        name = f.children[0].value
+        for n in walk(body):
+            if (isinstance(n, FuncCall) and n.value == name and len(n.children) == len(params)
+                    and all(is_literal(n.children[i]) and literal_type(n.children[i]) == params[i].value
+                            and n.children[i].value == v for i, v in values.items())):
+                n.value = new_name
+                n.children = [a for i, a in enumerate(n.children) if i not in values]
+        g.children = [g.children[0]] + [p for i, p in enumerate(params) if i not in values] + [body]
+        return g
+
+    def _substitutable(self, body: Block, pname: str) -> bool:
+        if pname in declared_names(body):
+            return False
+        cache: Dict[str, Optional[Set[str]]] = {}
+        for n in walk(body):
+            if isinstance(n, Assignment) and n.children[0].value == pname:
+                return False
+            if isinstance(n, FuncCall):
+                if n.value == pname:
+                    return False
+                seen = looked_up_names(n.value, self.funcs, cache)
+                if seen is None or pname in seen:
+                    return False
+        return True
+
+    @staticmethod
+    def _literal(vtype: str, value: object) -> Node:
+        return {'number': IntVal, 'boolean': BoolVal, 'string': StringVal}[vtype](value)
+
+    def _describe(self, name: str, i: int, value: object) -> str:
+        p = self.funcs[name].children[1 + i]
+        shown = f'"{value}"' if p.value == 'string' else str(value).lower()
+        return f"{p.children[0].value}={shown}"
+
+
+def _subsets(consts: tuple) -> List[tuple]:
+    """Subconjuntos não vazios (na ordem das posições); com muitos literais, só os unitários e o todo."""
+    if len(consts) > 4:
+        return [(c,) for c in consts] + [consts]
+    return [tuple(c for j, c in enumerate(consts) if mask >> j & 1) for mask in range(1, 1 << len(consts))]
@@ -17,12 +17,40 @@ class Variable:
         self.shift = shift
         self.is_function = is_function
 
+class SharedValue(Variable):
+    """
+    Variable imutável compartilhada por todos os usos (true/false, inteiros
+    pequenos, literais da AST). Seguro porque ninguém guarda a Variable
+    recebida: create_variable/set/set_temp copiam o valor.
+    """
+    __slots__ = ()
+
+    def __init__(self, vtype: str, value):
+        for name, v in (("type", vtype), ("value", value), ("is_const", False), ("shift", None), ("is_function", False)):
+            object.__setattr__(self, name, v)
+
+    def __setattr__(self, name, value):
+        raise Exception(f"[SymbolTable] Valor compartilhado não pode ser alterado ({name})")
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
 class SymbolTable:
     def __init__(self, parent: Optional['SymbolTable']=None):
         self.parent = parent
         self._table = {}
         self._next_shift = 0
 
+    def reset(self, parent: Optional['SymbolTable']) -> 'SymbolTable':
+        # reaproveita a tabela como um escopo novo (frames pré-alocados dos blocos)
+        self.parent = parent
+        self._table.clear()
+        self._next_shift = 0
+        return self
+
     def create_variable(self, name: str, vtype: str):
         if name in self._table:
             raise Exception(f"[Semantic] Variável '{name}' já declarada")
@@ -35,6 +63,10 @@ class SymbolTable:
             raise Exception(f"[Semantic] Identificador '{name}' já declarado")
         self._table[name] = Variable(return_type, func_node, is_const=True, shift=None, is_function=True)
 
+    def set_temp(self, name: str, var_value: Variable):
+        # temporários do otimizador: (re)definidos no escopo corrente, sem checagem de redeclaração
+        self._table[name] = Variable(var_value.type, var_value.value)
+
     def get(self, name: str) -> Variable:
         if name in self._table:
             return self._table[name]
@@ -0,0 +1,55 @@
+from __future__ import annotations
+from typing import Dict, Optional, Set
+from nodes import Node, If, While, Block, Return, FuncDec, FuncCall, TailCall
+from analysis import declared_names, looked_up_names, unique_functions, walk
+
+
+class TailCalls:
+    """
+    Marca 'return f(...);' dentro de funções como chamada em cauda (TailCall).
+    O FuncCall que executa a função passa a rodar a cadeia de chamadas em cauda
+    num laço (PendingCall.run), com pilha do Python constante.
+
+    Só marca quando f é uma função única com retorno: 'return g();' com g void
+    devolve None e o bloco continua, o que uma chamada em cauda não reproduz.
+
+    Escopo dinâmico: o escopo de f tem como pai o escopo de quem chama. Se os
+    nomes livres de f (e das funções que ela chama) não estão entre os declarados
+    pela função que chama, f pode usar o pai desta (detach) e a cadeia de escopos
+    não cresce. Senão a chamada só é marcada fora de blocos aninhados, cujos
+    frames são reaproveitados ao sair do bloco.
+    """
+    marked: int = 0
+
+    @staticmethod
+    def run(root: Node) -> Node:
+        TailCalls.marked = 0
+        funcs = unique_functions(root)
+        free: Dict[str, Optional[Set[str]]] = {}
+        for f in walk(root):
+            if isinstance(f, FuncDec):
+                declared = declared_names(f)
+                TailCalls._mark(f.children[-1], f, funcs, declared, free, nested=False)
+        return root
+
+    @staticmethod
+    def _mark(blk: Node, f: FuncDec, funcs, declared: Set[str], free, nested: bool):
+        for i, ch in enumerate(blk.children):
+            if isinstance(ch, Block):
+                TailCalls._mark(ch, f, funcs, declared, free, nested=True)
+            elif isinstance(ch, If):
+                for body in ch.children[1:]:
+                    TailCalls._mark(body, f, funcs, declared, free, nested)
+            elif isinstance(ch, While):
+                TailCalls._mark(ch.children[1], f, funcs, declared, free, nested)
+            elif isinstance(ch, Return) and type(ch.children[0]) is FuncCall:
+                call = ch.children[0]
+                callee = funcs.get(call.value)
+                if callee is None or callee.value == 'void':
+                    continue
+                names = looked_up_names(call.value, funcs, free)
+                detach = names is not None and not (names & declared)
+                if nested and not detach:
+                    continue
+                ch.children[0] = TailCall(call.value, call.children, detach)
+                TailCalls.marked += 1
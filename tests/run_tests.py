@@ -0,0 +1,97 @@
+import subprocess, sys, pathlib, shutil, tempfile
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+runner = [sys.executable, str(ROOT / "main.py")]
+cache = tempfile.mkdtemp()  # --bc-cache: a 1ª rodada grava o programa compilado, a 2ª carrega
+
+tests = [
+    ("ok_exemplo.ts", True, ["7", "3", "5"]),
+    ("ok_recursao.ts", True, ["120"]),
+    ("err_args_qtd.ts", False, ["Chamada de 'inc'"]),
+    ("err_tipo_arg.ts", False, ["Tipo inválido", "show"]),
+    ("err_func_inexistente.ts", False, ["Identificador 'foo'"]),
+    ("err_escopo.ts", False, ["Identificador 'x'"]),
+    ("ok_constantes.ts", True, ["86400", "ab86400", "false", "-3", "sim"]),
+    ("err_div_zero.ts", False, ["Divisão por zero"]),
+    ("ok_codigo_morto.ts", True, ["1\n3\nfim"]),
+    ("ok_inline.ts", True, ["16\n3\n4"]),
+    ("ok_invariantes.ts", False, ["Divisão por zero"]),
+    ("ok_subexpressoes.ts", True, ["92\n30\n530"]),
+    ("ok_algebrica.ts", True, ["-7\n-7\n-7\n-7\n-7\n-7\n-7\n0\n0\n0\n7\ntrue\ntrue\ntrue\nfalse\nfalse\nfalse\ntrue\n-14\n-56\n-28\n-3\n-1\n-7\n-1\n7\n1\n0\n-4503599627370496\n4503599627370496\n6755399441055745\n-7\ns0\n3\n-1\n-4"]),
+    ("ok_memo.ts", True, ["102334155\n10\n15"]),
+    ("ok_escopos.ts", True, ["101\n101\n101\n3\n10"]),
+    ("ok_cauda.ts", True, ["1250025000\n1250025000\nfalse\n101\n8"]),
+    ("ok_idiomas.ts", True, ["499999500000\n2432902008176640000\n68\n-2"]),
+    ("ok_contados.ts", True, ["30\n10\n5\n-1\n9\n5\n1\n-3"]),
+    ("ok_escritas_mortas.ts", True, ["6\nf\ny"]),
+    ("ok_intervalos.ts", True, ["144\n-64\n2\n4"]),
+    ("err_chamada_intervalo.ts", False, ["Divisão por zero"]),
+    ("ok_parcial.ts", True, ["ab\nabab\nababab\ntrue"]),
+    ("ok_especializa.ts", True, ["9\n25\n1024\n110\n4\n30\n25"]),
+    ("ok_desenrola.ts", True, ["14\n4\n19\n10\n97531\n-1"]),
+    # (arquivo, deve passar, trechos esperados[, flags extras])
+    ("ok_vazio.ts", True, [], ["-O1"]),
+    ("ok_cauda.ts", True, ["1250025000\n1250025000\nfalse\n101\n8"], ["-O1", f"--bc-cache={cache}"]),
+    ("ok_cauda.ts", True, ["1250025000\n1250025000\nfalse\n101\n8"], ["-O1", f"--bc-cache={cache}"]),
+    ("ok_poda.ts", True, ["9", "3 funções não usadas removidas (dobra, morta, esquecida)"], ["--report"]),
+    ("err_poda_nome.ts", False, ["Identificador 'h' já declarado", "0 funções não usadas removidas"], ["--report"]),
+    # recursão de 3000 níveis: todos os motores recusam, inclusive a VM (sem pilha do Python)
+    ("err_recursao_profunda.ts", False, ["maximum recursion depth exceeded"]),
+    # cadeia de 500 operadores: os motores compilam o que a árvore avalia
+    ("ok_expressao_longa.ts", True, ["1500\n1500\n1750"], ["-O0"]),
+    # ... e os passes não estouram a pilha nem ficam quadráticos (cse agrupa a repetida)
+    ("ok_expressao_longa.ts", True, ["1500\n1500\n1750", "cse: 1 recomputações eliminadas"], ["-O2", "--verify", "--report"]),
+    # --passes roda só os passes pedidos, na ordem do pipeline
+    ("ok_algebrica.ts", True, ["-7\n-7\n-7", "-4503599627370496\n4503599627370496", "algebraic: 33 reescritas", "total:"], ["--passes=algebraic,constfold", "--report"]),
+]
+
+# cada programa roda em todos os motores de execução
+engines = [[], ["--engine=closure"], ["--engine=unboxed"], ["--engine=vm"], ["--engine=reg"], ["--engine=py"]]
+
+def run(fname, flags):
+    print(f"==> {fname} {' '.join(flags)}".rstrip())
+    return subprocess.run(runner + [str(ROOT / "programas" / fname)] + flags, capture_output=True, text=True)
+
+def check(proc, should_pass, expects):
+    out = proc.stdout.strip()
+    err = proc.stderr.strip()
+    success = (proc.returncode == 0)
+
+    # o relatório de --report vai para o stderr
+    if should_pass and success and all(e in out or e in err for e in expects):
+        print("   PASS (stdout):")
+        print("   " + out.replace("\n", "\n   "))
+        return True
+    if (not should_pass) and (not success) and all(e in err for e in expects):
+        print("   PASS (erro esperado):")
+        print("   " + err.replace("\n", "\n   "))
+        return True
+    print("   FAIL")
+    print("   returncode:", proc.returncode)
+    print("   stdout:\n   " + (out or "<vazio>").replace("\n", "\n   "))
+    print("   stderr:\n   " + (err or "<vazio>").replace("\n", "\n   "))
+    return False
+
+ok = total = 0
+for (fname, should_pass, expects, *extra), flags in [(t, e) for e in engines for t in tests]:
+    ok += check(run(fname, flags + (extra[0] if extra else [])), should_pass, expects)
+    total += 1
+
+# níveis de otimização: a saída é a mesma em -O0, -O1 e -O2, e o Verifier
+# aceita a AST depois de cada passe
+levels = [["-O0"], ["-O1", "--verify"], ["-O2", "--verify"]]
+needs_opt = {"ok_memo.ts", "ok_cauda.ts"}  # só terminam com memo / chamadas em cauda
+for fname, should_pass, expects, *extra in tests:
+    if extra or fname in needs_opt:
+        continue
+    procs = [run(fname, flags) for flags in levels]
+    passed = all([check(p, should_pass, expects) for p in procs])
+    if len({(p.returncode, p.stdout, p.stderr) for p in procs}) != 1:
+        print("   FAIL: saída muda com o nível de otimização")
+        passed = False
+    ok += passed
+    total += 1
+
+shutil.rmtree(cache, ignore_errors=True)
+print(f"\n{ok}/{total} testes passaram.")
+sys.exit(0 if ok == total else 1)
@@ -0,0 +1,383 @@
+from __future__ import annotations
+import ast
+import hashlib
+import marshal
+import os
+import sys
+from types import CodeType
+from typing import Dict, List, Optional, Tuple
+from nodes import (
+    Node, IntVal, BoolVal, StringVal, Identifier, NoOp, Output, Fail, Print, Read, Assignment, VarDec, TempDec,
+    UnOp, BinOp, ShiftOp, If, While, Reduction, CountedWhile, Block, Return, FuncDec, FuncCall,
+    TailCall, int_div, int_mod, shift_right, reduce_closed
+)
+from analysis import recursion_room, walk
+from bytecode import STOP_ADJUST
+from purity import Memo
+from resolve import (
+    Unsupported, Level, StaticResolver, DEFAULT, read_number, check_declared
+)
+
+
+_PY_OPS = {'+': ast.Add, '-': ast.Sub, '*': ast.Mult, '%': ast.Mod}
+_PY_CMP = {'<': ast.Lt, '>': ast.Gt, '<=': ast.LtE, '>=': ast.GtE,
+           '==': ast.Eq, '!=': ast.NotEq, '===': ast.Eq, '!==': ast.NotEq}
+
+
+class PythonTranspiler(StaticResolver):
+    """
+    Traduz o programa para um módulo Python (ast.Module), compilado com
+    compile() e executado com exec (--engine=py). Variáveis viram locais
+    Python com o valor cru (int/bool/str), funções viram funções Python e log
+    escreve direto em sys.stdout.
+
+    A tradução só vale quando os nomes e tipos resolvem estaticamente
+    (StaticResolver) e as chamadas em cauda são para a própria função (viram
+    um laço). Fora disso compile() devolve None, o motivo fica em 'fallback'
+    e o programa roda no evaluate. Os erros que sobram são de execução
+    (divisão e módulo por zero, readline, função sem return, função ainda não
+    declarada) e usam as mesmas mensagens.
+
+    O code object resultante pode ser guardado com marshal (store/load),
+    chaveado pelo hash do fonte e das opções (cache_key).
+    """
+    VERSION = 1
+    fallback: Optional[str] = None
+
+    @staticmethod
+    def compile(root: Node) -> Optional[CodeType]:
+        PythonTranspiler.fallback = None
+        with recursion_room(root, 4):
+            try:
+                module = PythonTranspiler(root).module()
+            except Unsupported as e:
+                PythonTranspiler.fallback = str(e)
+                return None
+            return compile(module, "<ts>", "exec")
+
+    @staticmethod
+    def execute(code: CodeType, memos: Dict[str, Memo]):
+        ns = dict(_RUNTIME)
+        ns["_write"] = sys.stdout.write
+        ns["_declared"] = set()
+        ns.update({f"_memo_{name}": m for name, m in memos.items()})
+        exec(code, ns)
+
+    # ------- cache -------
+    @staticmethod
+    def cache_key(source: str, options: List[str]) -> str:
+        h = hashlib.sha256()
+        h.update(f"{PythonTranspiler.VERSION}:{sys.version_info[:2]}:{' '.join(options)}\0".encode())
+        h.update(source.encode())
+        return h.hexdigest()
+
+    @staticmethod
+    def load(cache_dir: str, key: str) -> Optional[CodeType]:
+        path = os.path.join(cache_dir, key + ".tsc")
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            return marshal.load(f)
+
+    @staticmethod
+    def store(cache_dir: str, key: str, code: CodeType):
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(os.path.join(cache_dir, key + ".tsc"), "wb") as f:
+            marshal.dump(code, f)
+
+    # ------- tradução -------
+    def __init__(self, root: Node):
+        super().__init__(root)
+        self.loops = 0        # profundidade de laços Python na função corrente
+        self.arg_names: List[str] = []  # variáveis Python dos parâmetros da função corrente
+        self.temps = 0
+
+    def module(self) -> ast.Module:
+        body: List[ast.stmt] = []
+        for f in self.funcs.values():
+            body.extend(self.function(f))
+        self.func = None
+        level = self.level(None)
+        main: List[ast.stmt] = []
+        for i, s in enumerate(self.root.children):
+            self.top = i
+            main.extend(self.stmt(s, level))
+        # código principal vazio (ou todo morto): def sem corpo não compila
+        body.append(_def("_main", [], main or [ast.Pass()]))
+        body.append(ast.Expr(_call("_main")))
+        return ast.fix_missing_locations(ast.Module(body=body, type_ignores=[]))
+
+    def new_local(self, name: str, vtype: str, level: Level) -> str:
+        return f"{name}_{level.ident}"
+
+    def temp(self) -> str:
+        self.temps += 1
+        return f"_r{self.temps}"
+
+    def function(self, f: FuncDec) -> List[ast.stmt]:
+        name, public, rtype = f.children[0].value, f.public, f.value
+        self.func, self.loops = f, 0
+        level = self.level(None)
+        args = self.arg_names = self.params(f, level)
+        body = self.block(f.children[-1].children, level)
+        if rtype != 'void':
+            body.append(_raise(f"[Semantic] Função '{public}' ({rtype}) sem return"))
+        else:
+            body.append(ast.Return(None))
+        if any(isinstance(n, TailCall) for n in walk(f)):
+            body = [ast.While(ast.Constant(True), body, [])]  # 'return f(...)' vira 'continue'
+        if f.memo is None:
+            return [_def(f"fn_{name}", args, body)]
+        # memo: mesma ordem do FuncCall (argumentos avaliados, depois o cache)
+        key = ast.Tuple([_name(a) for a in args], ast.Load())
+        wrapper = [
+            _assign("_k", key),
+            _assign("_v", _call_attr(f"_memo_{name}", "get", _name("_k"))),
+            ast.If(ast.Compare(_name("_v"), [ast.IsNot()], [ast.Constant(None)]), [ast.Return(_name("_v"))], []),
+            _assign("_v", _call(f"_body_{name}", *[_name(a) for a in args])),
+            ast.Expr(_call_attr(f"_memo_{name}", "put", _name("_k"), _name("_v"))),
+            ast.Return(_name("_v")),
+        ]
+        return [_def(f"_body_{name}", args, body), _def(f"fn_{name}", args, wrapper)]
+
+    # ------- statements -------
+    def block(self, stmts: List[Node], level: Level) -> List[ast.stmt]:
+        out: List[ast.stmt] = []
+        for s in stmts:
+            out.extend(self.stmt(s, level))
+        return out or [ast.Pass()]
+
+    def stmt(self, s: Node, level: Level) -> List[ast.stmt]:
+        if isinstance(s, Block):
+            return self.block(s.children, self.level(level) if s.scoped else level)
+        if isinstance(s, VarDec):
+            name = s.children[0].value
+            if s.value == 'void':
+                raise Unsupported(f"variável void '{name}'")
+            py = self.declare(name, s.value, level)
+            if len(s.children) == 1:
+                return [_assign(py, ast.Constant(DEFAULT[s.value]))]
+            code, t = self.expr(s.children[1], level)
+            if t != s.value:
+                raise Unsupported(f"inicialização de '{name}' com {t}")
+            out = []
+            if any(isinstance(n, Identifier) and n.value == name for n in walk(s.children[1])):
+                out.append(_assign(py, ast.Constant(DEFAULT[s.value])))  # a variável existe antes do inicializador
+            return out + [_assign(py, code)]
+        if isinstance(s, Assignment):
+            py, vtype = self.lookup(s.children[0].value, level)
+            code, t = self.expr(s.children[1], level)
+            if t != vtype:
+                raise Unsupported(f"atribuição de {t} em '{s.children[0].value}'")
+            return [_assign(py, code)]
+        if isinstance(s, TempDec):
+            name = s.children[0].value
+            code, t = self.expr(s.children[1], level)
+            return [_assign(self.redefine(name, t, level), code)]
+        if isinstance(s, Print):
+            code, t = self.expr(s.children[0], level)
+            if t is None:
+                raise Unsupported("log de valor void")
+            line = ast.JoinedStr([ast.FormattedValue(_as_str(code, t), -1, None), ast.Constant("\n")])
+            return [ast.Expr(_call("_write", line))]
+        if isinstance(s, Output):
+            return [ast.Expr(_call("_write", ast.Constant(s.value)))]
+        if isinstance(s, Fail):
+            return [_raise(s.value)]
+        if isinstance(s, Return):
+            if isinstance(s.children[0], TailCall):
+                return self.tail_call(s.children[0], level)
+            return self.returns(*self.expr(s.children[0], level))
+        if isinstance(s, FuncCall):
+            return self.returns(*self.call(s, level))  # não-void como statement retorna
+        if isinstance(s, If):
+            cond, t = self.expr(s.children[0], level)
+            if t != 'boolean':
+                raise Unsupported("condição do if não é boolean")
+            shared = self.shared(s, level)
+            before = dict(level.names), set(level.maybe)
+            then = self.block(s.children[1].children, level)
+            level.names, level.maybe = dict(before[0]), set(before[1])
+            other = self.block(s.children[2].children, level) if len(s.children) == 3 else []
+            level.names, level.maybe = before
+            self.settle(shared, level)
+            return [ast.If(cond, then, other)]
+        if isinstance(s, (Reduction, CountedWhile)):
+            return self.counted(s, level)
+        if isinstance(s, While):
+            shared = self.shared(s, level)
+            level.maybe |= shared  # numa volta seguinte, a declaração da volta anterior já existe
+            cond, t = self.expr(s.children[0], level)
+            if t != 'boolean':
+                raise Unsupported("condição do while não é boolean")
+            self.loops += 1
+            body = self.block(s.children[1].children, level)
+            self.loops -= 1
+            self.settle(shared, level)
+            return [ast.While(cond, body, [])]
+        if isinstance(s, FuncDec):
+            return [ast.Expr(_call_attr("_declared", "add", ast.Constant(s.children[0].value)))]
+        if isinstance(s, NoOp):
+            return []
+        raise Unsupported(f"statement {type(s).__name__}")
+
+    def returns(self, code: ast.expr, t: Optional[str]) -> List[ast.stmt]:
+        """'return e' e chamada não-void como statement: valor None (void) não encerra o bloco."""
+        if t is None:
+            return [ast.Expr(code)]
+        if self.func is None:
+            return [ast.Expr(code), ast.Return(None)]  # return no topo encerra o programa
+        rtype = self.func.value
+        if rtype == 'void':
+            return [ast.Expr(code), ast.Return(None)]
+        if t != rtype:
+            raise Unsupported(f"return de {t} em '{self.func.public}'")
+        return [ast.Return(code)]
+
+    def tail_call(self, c: TailCall, level: Level) -> List[ast.stmt]:
+        if self.func is None or c.value != self.func.children[0].value or self.loops:
+            raise Unsupported("chamada em cauda para outra função ou dentro de laço")
+        args = self.args(c, self.callee(c)[0], level)
+        if not args:
+            return [ast.Continue()]
+        # todos os argumentos são avaliados antes de trocar os parâmetros
+        return [ast.Assign([ast.Tuple([_name(p, ast.Store()) for p in self.arg_names], ast.Store())],
+                           ast.Tuple(args, ast.Load())),
+                ast.Continue()]
+
+    def counted(self, s: CountedWhile, level: Level) -> List[ast.stmt]:
+        cond = s.children[0]
+        iv, it = self.lookup(s.ind, level)
+        bound, bt = self.expr(cond.children[1], level)
+        if it != 'number' or bt != 'number':
+            raise Unsupported("laço contado sem limites number")
+        r = self.temp()
+        stop = ast.BinOp(bound, ast.Add(), ast.Constant(STOP_ADJUST[cond.value])) if STOP_ADJUST[cond.value] else bound
+        out: List[ast.stmt] = [_assign(r, _call("range", _name(iv), stop, ast.Constant(s.step)))]
+        last = ast.BinOp(ast.Subscript(_name(r), ast.Constant(-1), ast.Load()), ast.Add(), ast.Constant(s.step))
+        if isinstance(s, Reduction):
+            done: List[ast.stmt] = []
+            if s.acc is not None:
+                acc, at = self.lookup(s.acc, level)
+                if at != 'number':
+                    raise Unsupported("redução sobre acumulador não number")
+                done.append(_assign(acc, _call("_reduce", _name(acc), _name(r), *[
+                    ast.Constant(v) for v in (s.op, s.coef, s.const, s.shifted, s.step)])))
+            done.append(_assign(iv, last))
+            return out + [ast.If(_name(r), done, [])]
+        shared = self.shared(s, level)
+        level.maybe |= shared
+        self.loops += 1
+        body = self.block(s.children[1].children[:-1], level)
+        self.loops -= 1
+        self.settle(shared, level)
+        return out + [ast.For(_name(iv, ast.Store()), _name(r), body, []),
+                      ast.If(_name(r), [_assign(iv, last)], [])]
+
+    # ------- expressões: (código, tipo); tipo None = void -------
+    def expr(self, e: Node, level: Level) -> Tuple[ast.expr, Optional[str]]:
+        if isinstance(e, IntVal):
+            return ast.Constant(e.value), 'number'
+        if isinstance(e, BoolVal):
+            return ast.Constant(e.value), 'boolean'
+        if isinstance(e, StringVal):
+            return ast.Constant(e.value), 'string'
+        if isinstance(e, Identifier):
+            py, t = self.lookup(e.value, level)
+            return _name(py), t
+        if isinstance(e, Read):
+            return _call("_read"), 'number'
+        if isinstance(e, UnOp):
+            code, t = self.expr(e.children[0], level)
+            want = 'boolean' if e.value == '!' else 'number'
+            if e.value not in ('+', '-', '!') or t != want:
+                raise Unsupported(f"unário {e.value} sobre {t}")
+            op = {'+': ast.UAdd, '-': ast.USub, '!': ast.Not}[e.value]
+            return ast.UnaryOp(op(), code), want
+        if isinstance(e, ShiftOp):
+            code, t = self.expr(e.children[0], level)
+            if t != 'number':
+                raise Unsupported(f"deslocamento sobre {t}")
+            if e.value == '*':
+                return ast.BinOp(code, ast.LShift(), ast.Constant(e.k)), 'number'
+            if e.value == '%':
+                return ast.BinOp(code, ast.BitAnd(), ast.Constant(e.mask)), 'number'
+            return _call("_shr", code, ast.Constant(e.k)), 'number'
+        if isinstance(e, BinOp):
+            return self.binop(e, level)
+        if isinstance(e, FuncCall):
+            return self.call(e, level)
+        raise Unsupported(f"expressão {type(e).__name__}")
+
+    def binop(self, e: BinOp, level: Level) -> Tuple[ast.expr, str]:
+        a, ta = self.expr(e.children[0], level)
+        b, tb = self.expr(e.children[1], level)
+        t = self.binop_type(e, ta, tb)
+        op = e.value
+        if op in ('+', '-', '*', '/', '%'):
+            if t == 'string':
+                return ast.BinOp(_as_str(a, ta), ast.Add(), _as_str(b, tb)), t
+            if op == '/':
+                if not self.checks_zero(e):
+                    return _call("int", ast.BinOp(a, ast.Div(), b)), t
+                return _call("_div", a, b), t
+            if op == '%' and self.checks_zero(e):
+                return _call("_mod", a, b), t
+            return ast.BinOp(a, _PY_OPS[op](), b), t
+        if op in ('&&', '||'):
+            # & e | entre bools avaliam os dois lados, como o evaluate
+            return ast.BinOp(a, ast.BitAnd() if op == '&&' else ast.BitOr(), b), t
+        if ta != tb:  # '==' / '!=' entre tipos diferentes
+            return _call("_pick", ast.Constant(op == '!='), a, b), t  # avalia os dois lados
+        return ast.Compare(a, [_PY_CMP[op]()], [b]), t
+
+    def args(self, c: FuncCall, f: FuncDec, level: Level) -> List[ast.expr]:
+        out = [self.expr(a, level) for a in c.children]
+        self.arg_types(c, f, [t for _, t in out])
+        return [code for code, _ in out]
+
+    def call(self, c: FuncCall, level: Level) -> Tuple[ast.expr, Optional[str]]:
+        name = c.value
+        f, check = self.callee(c)
+        fn: ast.expr = _name(f"fn_{name}")
+        if check:
+            fn = _call("_declared_fn", _name("_declared"), ast.Constant(name), fn)
+        return ast.Call(fn, self.args(c, f, level), []), (f.value if f.value != 'void' else None)
+
+
+# ------- construção de nós -------
+def _name(n: str, ctx: ast.expr_context | None = None) -> ast.Name:
+    return ast.Name(n, ctx or ast.Load())
+
+def _call(fn: str, *args: ast.expr) -> ast.Call:
+    return ast.Call(_name(fn), list(args), [])
+
+def _call_attr(obj: str, attr: str, *args: ast.expr) -> ast.Call:
+    return ast.Call(ast.Attribute(_name(obj), attr, ast.Load()), list(args), [])
+
+def _assign(n: str, value: ast.expr) -> ast.Assign:
+    return ast.Assign([_name(n, ast.Store())], value)
+
+def _raise(msg: str) -> ast.Raise:
+    return ast.Raise(_call("Exception", ast.Constant(msg)), None)
+
+def _def(n: str, args: List[str], body: List[ast.stmt]) -> ast.FunctionDef:
+    arguments = ast.arguments(posonlyargs=[], args=[ast.arg(a) for a in args], vararg=None, kwonlyargs=[],
+                              kw_defaults=[], kwarg=None, defaults=[])
+    return ast.FunctionDef(n, arguments, body, [], None)
+
+def _as_str(code: ast.expr, t: str) -> ast.expr:
+    """str_value_of sobre o valor cru."""
+    if t == 'string':
+        return code
+    if t == 'number':
+        return _call("str", code)
+    return ast.IfExp(code, ast.Constant("true"), ast.Constant("false"))
+
+
+# ------- funções de apoio usadas pelo código gerado -------
+def _pick(value, *evaluated):
+    return value
+
+_RUNTIME = {"_div": int_div, "_mod": int_mod, "_shr": shift_right, "_pick": _pick, "_read": read_number, "_reduce": reduce_closed,
+            "_declared_fn": check_declared}
@@ -0,0 +1,435 @@
+from __future__ import annotations
+import operator
+import sys
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from nodes import (
+    Node, IntVal, BoolVal, StringVal, Identifier, NoOp, Output, Fail, Print, Read, Assignment, VarDec, TempDec,
+    UnOp, BinOp, ShiftOp, If, While, Reduction, CountedWhile, Block, Return, FuncDec, FuncCall, TailCall,
+    int_div, int_mod, shift_right, reduce_closed
+)
+from analysis import recursion_room, walk
+from bytecode import STOP_ADJUST
+from resolve import Unsupported, Level, StaticResolver, DEFAULT, read_number
+
+# closure compilada: recebe o frame (lista de valores crus) da função corrente
+Code = Callable[[list], Any]
+
+# resultado de statement: None segue para o próximo; (valor,) é um return;
+# AGAIN pede nova volta da função com os parâmetros já trocados (cauda)
+DONE = (None,)
+AGAIN = ("again",)
+
+_OPS: Dict[str, Callable[[Any, Any], Any]] = {
+    '+': operator.add, '-': operator.sub, '*': operator.mul,
+    '<': operator.lt, '>': operator.gt, '<=': operator.le, '>=': operator.ge,
+    '==': operator.eq, '!=': operator.ne, '===': operator.eq, '!==': operator.ne,
+    '&&': operator.and_, '||': operator.or_,  # entre bools: avaliam os dois lados, como o evaluate
+}
+
+
+class _Function:
+    """Função compilada; as chamadas leem os campos em execução (recursão e funções declaradas depois)."""
+    __slots__ = ("invoke", "pad")
+    def __init__(self):
+        self.invoke: Optional[Callable[[list], Any]] = None
+        self.pad: List[Any] = []  # slots dos locais, completados depois dos argumentos
+
+
+class UnboxedCompiler(StaticResolver):
+    """
+    Modo sem Variable do motor de closures (--engine=unboxed). Expressões
+    devolvem int/bool/str crus com o tipo conhecido em tempo de compilação, e
+    cada chamada guarda os locais numa lista com um slot por declaração
+    (índice resolvido pelo StaticResolver). Sem Variable por operação e sem
+    busca por nome na SymbolTable.
+
+    Vale nas mesmas condições do transpile.py; fora delas compile() devolve
+    None, o motivo fica em 'fallback' e o programa roda nas closures com
+    Variable (closure.py). Chamadas em cauda só para a própria função: trocam
+    os parâmetros no mesmo frame e repetem o corpo.
+    """
+    fallback: Optional[str] = None
+
+    @staticmethod
+    def compile(root: Node) -> Optional[Callable[[], None]]:
+        UnboxedCompiler.fallback = None
+        try:
+            with recursion_room(root, 4):
+                return UnboxedCompiler(root).program()
+        except Unsupported as e:
+            UnboxedCompiler.fallback = str(e)
+            return None
+
+    def __init__(self, root: Node):
+        super().__init__(root)
+        self.slots = 0  # locais da função corrente
+        self.compiled = {name: _Function() for name in self.funcs}
+        self.declared = set()  # FuncDecs do código principal que já rodaram
+        self.write = sys.stdout.write
+
+    def new_local(self, name: str, vtype: str, level: Level) -> int:
+        self.slots += 1
+        return self.slots - 1
+
+    def program(self) -> Callable[[], None]:
+        for f in self.funcs.values():
+            self.function(f)
+        self.func, self.slots = None, 0
+        level = self.level(None)
+        codes = []
+        for i, s in enumerate(self.root.children):
+            self.top = i
+            codes.append(self.stmt(s, level))
+        main = _sequence(codes)
+        size = self.slots
+        def run():
+            main([None] * size)
+        return run
+
+    def function(self, f: FuncDec):
+        self.func, self.slots = f, 0
+        level = self.level(None)
+        n = len(self.params(f, level))
+        body = self.block(f.children[-1].children, level)
+        rec = self.compiled[f.children[0].value]
+        rec.pad = [None] * (self.slots - n)
+        tail = any(isinstance(x, TailCall) for x in walk(f))
+        if f.value == 'void':
+            if tail:
+                def invoke(frame):
+                    while body(frame) is AGAIN:
+                        pass
+                    return None
+            else:
+                def invoke(frame):
+                    body(frame)
+                    return None
+        else:
+            missing = f"[Semantic] Função '{f.public}' ({f.value}) sem return"
+            def invoke(frame):
+                r = body(frame)
+                while r is AGAIN:
+                    r = body(frame)
+                if r is None:
+                    raise Exception(missing)
+                return r[0]
+        memo = f.memo
+        if memo is not None:
+            # mesma ordem do FuncCall: argumentos avaliados, depois o cache
+            plain = invoke
+            def invoke(frame):
+                key = tuple(frame[:n])
+                r = memo.get(key)
+                if r is not None:
+                    return r
+                r = plain(frame)
+                memo.put(key, r)
+                return r
+        rec.invoke = invoke
+
+    # ------- statements -------
+    def block(self, stmts: List[Node], level: Level) -> Code:
+        return _sequence([self.stmt(s, level) for s in stmts])
+
+    def stmt(self, s: Node, level: Level) -> Code:
+        if isinstance(s, Block):
+            return self.block(s.children, self.level(level) if s.scoped else level)
+        if isinstance(s, VarDec):
+            return self.vardec(s, level)
+        if isinstance(s, Assignment):
+            slot, vtype = self.lookup(s.children[0].value, level)
+            code, t = self.expr(s.children[1], level)
+            if t != vtype:
+                raise Unsupported(f"atribuição de {t} em '{s.children[0].value}'")
+            return _store(slot, code)
+        if isinstance(s, TempDec):
+            code, t = self.expr(s.children[1], level)
+            return _store(self.redefine(s.children[0].value, t, level), code)
+        if isinstance(s, Print):
+            code, t = self.expr(s.children[0], level)
+            if t is None:
+                raise Unsupported("log de valor void")
+            text, write = _as_str(code, t), self.write
+            def run(f):
+                write(text(f) + "\n")
+            return run
+        if isinstance(s, Output):
+            text, write = s.value, self.write
+            def run(f):
+                write(text)
+            return run
+        if isinstance(s, Fail):
+            message = s.value
+            def fail(f):
+                raise Exception(message)
+            return fail
+        if isinstance(s, Return):
+            if isinstance(s.children[0], TailCall):
+                return self.tail_call(s.children[0], level)
+            return self.returns(*self.expr(s.children[0], level))
+        if isinstance(s, FuncCall):
+            return self.returns(*self.call(s, level))  # não-void como statement retorna
+        if isinstance(s, If):
+            return self.if_(s, level)
+        if isinstance(s, (Reduction, CountedWhile)):
+            return self.counted(s, level)
+        if isinstance(s, While):
+            return self.while_(s, level)
+        if isinstance(s, FuncDec):
+            name, declared = s.children[0].value, self.declared
+            return lambda f: declared.add(name)
+        if isinstance(s, NoOp):
+            return lambda f: None
+        raise Unsupported(f"statement {type(s).__name__}")
+
+    def vardec(self, s: VarDec, level: Level) -> Code:
+        name = s.children[0].value
+        if s.value == 'void':
+            raise Unsupported(f"variável void '{name}'")
+        slot = self.declare(name, s.value, level)
+        default = DEFAULT[s.value]
+        if len(s.children) == 1:
+            def run(f):
+                f[slot] = default
+            return run
+        code, t = self.expr(s.children[1], level)
+        if t != s.value:
+            raise Unsupported(f"inicialização de '{name}' com {t}")
+        if any(isinstance(n, Identifier) and n.value == name for n in walk(s.children[1])):
+            def run(f):
+                f[slot] = default  # a variável existe antes do inicializador
+                f[slot] = code(f)
+            return run
+        return _store(slot, code)
+
+    def returns(self, code: Code, t: Optional[str]) -> Code:
+        """'return e' e chamada não-void como statement: valor None (void) não encerra o bloco."""
+        if t is None:
+            def run(f):
+                code(f)
+            return run
+        if self.func is None or self.func.value == 'void':
+            def run(f):
+                code(f)
+                return DONE  # no topo encerra o programa
+            return run
+        if t != self.func.value:
+            raise Unsupported(f"return de {t} em '{self.func.public}'")
+        return lambda f: (code(f),)
+
+    def tail_call(self, c: TailCall, level: Level) -> Code:
+        if self.func is None or c.value != self.func.children[0].value:
+            raise Unsupported("chamada em cauda para outra função")
+        args = self.args(c, self.callee(c)[0], level)
+        n = len(args)
+        # todos os argumentos são avaliados antes de trocar os parâmetros
+        def run(f):
+            f[:n] = [a(f) for a in args]
+            return AGAIN
+        return run
+
+    def if_(self, s: If, level: Level) -> Code:
+        cond, t = self.expr(s.children[0], level)
+        if t != 'boolean':
+            raise Unsupported("condição do if não é boolean")
+        shared = self.shared(s, level)
+        before = dict(level.names), set(level.maybe)
+        then = self.block(s.children[1].children, level)
+        level.names, level.maybe = dict(before[0]), set(before[1])
+        other = self.block(s.children[2].children, level) if len(s.children) == 3 else None
+        level.names, level.maybe = before
+        self.settle(shared, level)
+        if other is None:
+            def run(f):
+                if cond(f):
+                    return then(f)
+                return None
+        else:
+            def run(f):
+                if cond(f):
+                    return then(f)
+                return other(f)
+        return run
+
+    def while_(self, s: While, level: Level) -> Code:
+        shared = self.shared(s, level)
+        level.maybe |= shared  # numa volta seguinte, a declaração da volta anterior já existe
+        cond, t = self.expr(s.children[0], level)
+        if t != 'boolean':
+            raise Unsupported("condição do while não é boolean")
+        body = self.block(s.children[1].children, level)
+        self.settle(shared, level)
+        def run(f):
+            while cond(f):
+                r = body(f)
+                if r is not None:
+                    return r
+            return None
+        return run
+
+    def counted(self, s: CountedWhile, level: Level) -> Code:
+        cond = s.children[0]
+        iv, it = self.lookup(s.ind, level)
+        bound, bt = self.expr(cond.children[1], level)
+        if it != 'number' or bt != 'number':
+            raise Unsupported("laço contado sem limites number")
+        adjust, step = STOP_ADJUST[cond.value], s.step
+        if isinstance(s, Reduction):
+            if s.acc is None:
+                def run(f):
+                    r = range(f[iv], bound(f) + adjust, step)
+                    if r:
+                        f[iv] = r[-1] + step
+                return run
+            acc, at = self.lookup(s.acc, level)
+            if at != 'number':
+                raise Unsupported("redução sobre acumulador não number")
+            shape = (s.op, s.coef, s.const, s.shifted, step)
+            def run(f):
+                r = range(f[iv], bound(f) + adjust, step)
+                if r:
+                    f[acc] = reduce_closed(f[acc], r, *shape)
+                    f[iv] = r[-1] + step
+            return run
+        shared = self.shared(s, level)
+        level.maybe |= shared
+        body = self.block(s.children[1].children[:-1], level)
+        self.settle(shared, level)
+        def run(f):
+            r = range(f[iv], bound(f) + adjust, step)
+            for v in r:
+                f[iv] = v
+                x = body(f)
+                if x is not None:
+                    return x
+            if r:
+                f[iv] = r[-1] + step
+            return None
+        return run
+
+    # ------- expressões: (closure, tipo); tipo None = void -------
+    def expr(self, e: Node, level: Level) -> Tuple[Code, Optional[str]]:
+        if isinstance(e, (IntVal, BoolVal, StringVal)):
+            v = e.value
+            return (lambda f: v), {IntVal: 'number', BoolVal: 'boolean', StringVal: 'string'}[type(e)]
+        if isinstance(e, Identifier):
+            slot, t = self.lookup(e.value, level)
+            return operator.itemgetter(slot), t
+        if isinstance(e, Read):
+            return (lambda f: read_number()), 'number'
+        if isinstance(e, UnOp):
+            code, t = self.expr(e.children[0], level)
+            want = 'boolean' if e.value == '!' else 'number'
+            if e.value not in ('+', '-', '!') or t != want:
+                raise Unsupported(f"unário {e.value} sobre {t}")
+            if e.value == '+':
+                return code, want
+            if e.value == '-':
+                return (lambda f: -code(f)), want
+            return (lambda f: not code(f)), want
+        if isinstance(e, ShiftOp):
+            code, t = self.expr(e.children[0], level)
+            if t != 'number':
+                raise Unsupported(f"deslocamento sobre {t}")
+            k, mask = e.k, e.mask
+            if e.value == '*':
+                return (lambda f: code(f) << k), 'number'
+            if e.value == '%':
+                return (lambda f: code(f) & mask), 'number'
+            return (lambda f: shift_right(code(f), k)), 'number'
+        if isinstance(e, BinOp):
+            return self.binop(e, level)
+        if isinstance(e, FuncCall):
+            return self.call(e, level)
+        raise Unsupported(f"expressão {type(e).__name__}")
+
+    def binop(self, e: BinOp, level: Level) -> Tuple[Code, str]:
+        left, ta = self.expr(e.children[0], level)
+        right, tb = self.expr(e.children[1], level)
+        t = self.binop_type(e, ta, tb)
+        op = e.value
+        if t == 'string' and op == '+':
+            a, b = _as_str(left, ta), _as_str(right, tb)
+            return (lambda f: a(f) + b(f)), t
+        if op in ('==', '!=') and ta != tb:
+            value = op == '!='
+            def run(f):
+                left(f)
+                right(f)
+                return value
+            return run, t
+        if op == '/':
+            fn = int_div if self.checks_zero(e) else (lambda a, b: int(a / b))
+        elif op == '%':
+            fn = int_mod if self.checks_zero(e) else operator.mod
+        else:
+            fn = _OPS[op]
+        # formas comuns sem a chamada da closure do operando
+        x, y = e.children
+        if isinstance(y, (IntVal, BoolVal, StringVal)):
+            c = y.value
+            if isinstance(x, Identifier):
+                s = self.lookup(x.value, level)[0]
+                return (lambda f: fn(f[s], c)), t
+            return (lambda f: fn(left(f), c)), t
+        if isinstance(x, Identifier) and isinstance(y, Identifier):
+            s, r = self.lookup(x.value, level)[0], self.lookup(y.value, level)[0]
+            return (lambda f: fn(f[s], f[r])), t
+        return (lambda f: fn(left(f), right(f))), t
+
+    def args(self, c: FuncCall, f: FuncDec, level: Level) -> List[Code]:
+        out = [self.expr(a, level) for a in c.children]
+        self.arg_types(c, f, [t for _, t in out])
+        return [code for code, _ in out]
+
+    def call(self, c: FuncCall, level: Level) -> Tuple[Code, Optional[str]]:
+        name = c.value
+        f, check = self.callee(c)
+        args = self.args(c, f, level)
+        rec, declared = self.compiled[name], self.declared
+        if check:
+            def run(fr):
+                if name not in declared:
+                    raise Exception(f"[Semantic] Identificador '{name}' não declarado")
+                frame = [a(fr) for a in args]
+                frame += rec.pad
+                return rec.invoke(frame)
+        elif len(args) == 1:
+            a0 = args[0]
+            def run(fr):
+                frame = [a0(fr)]
+                frame += rec.pad
+                return rec.invoke(frame)
+        else:
+            def run(fr):
+                frame = [a(fr) for a in args]
+                frame += rec.pad
+                return rec.invoke(frame)
+        return run, (f.value if f.value != 'void' else None)
+
+
+def _sequence(codes: List[Code]) -> Code:
+    if not codes:
+        return lambda f: None
+    if len(codes) == 1:
+        return codes[0]
+    def run(f):
+        for code in codes:
+            r = code(f)
+            if r is not None:
+                return r
+        return None
+    return run
+
+def _store(slot: int, code: Code) -> Code:
+    def run(f):
+        f[slot] = code(f)
+    return run
+
+def _as_str(code: Code, t: str) -> Code:
+    """str_value_of sobre o valor cru."""
+    if t == 'string':
+        return code
+    if t == 'number':
+        return lambda f: str(code(f))
+    return lambda f: "true" if code(f) else "false"
@@ -0,0 +1,119 @@
+from __future__ import annotations
+from typing import Set
+from nodes import (
+    Node, IntVal, BoolVal, StringVal, Identifier, NoOp, Output, Fail, Print, Read, Assignment, VarDec, TempDec,
+    UnOp, BinOp, ShiftOp, If, While, Block, Return, FuncDec, FuncCall
+)
+
+_STATEMENTS = (NoOp, Output, Fail, Block, VarDec, TempDec, Print, If, While, Return, Assignment, FuncCall)
+_EXPRESSIONS = (IntVal, BoolVal, StringVal, Identifier, Read, UnOp, BinOp, FuncCall)
+_TYPES = ('number', 'boolean', 'string', 'void')
+_BINOPS = ('+', '-', '*', '/', '%', '==', '!=', '===', '!==', '<', '>', '<=', '>=', '&&', '||')
+
+
+class Verifier:
+    """
+    Confere a forma da AST entre passes de otimização: tipos de nó em cada
+    posição, aridade, operadores, valores dos literais e que nenhum nó aparece
+    duas vezes na árvore (reescritas devem clonar).
+    """
+
+    @staticmethod
+    def check(root: Node, after: str = "parser"):
+        def fail(msg: str):
+            raise Exception(f"[Verifier] após {after}: {msg}")
+
+        if not isinstance(root, Block):
+            fail(f"raiz deveria ser Block, é {type(root).__name__}")
+        seen: Set[int] = set()
+        # (nó, papel): 'stmt', 'top' (statement de topo), 'expr', 'block', 'name', 'param'
+        stack = [(root, 'block')]
+        while stack:
+            node, role = stack.pop()
+            name = type(node).__name__
+            if id(node) in seen:
+                fail(f"nó {name} compartilhado entre dois pontos da árvore")
+            seen.add(id(node))
+            if not isinstance(node.children, list):
+                fail(f"{name} com children que não é lista")
+
+            if role == 'top':
+                if not isinstance(node, _STATEMENTS + (FuncDec,)):
+                    fail(f"{name} não é statement")
+            elif role == 'stmt':
+                if isinstance(node, FuncDec):
+                    fail("declaração de função fora do escopo global")
+                if not isinstance(node, _STATEMENTS):
+                    fail(f"{name} não é statement")
+            elif role == 'expr' and not isinstance(node, _EXPRESSIONS):
+                fail(f"{name} não é expressão")
+            elif role == 'block' and not isinstance(node, Block):
+                fail(f"esperado Block, encontrado {name}")
+            elif role == 'name' and not (isinstance(node, Identifier) and isinstance(node.value, str)):
+                fail(f"esperado Identifier, encontrado {name}")
+            elif role == 'param' and not (isinstance(node, VarDec) and len(node.children) == 1):
+                fail(f"parâmetro inválido: {name}")
+
+            kids = node.children
+            if isinstance(node, Block):
+                inner = 'top' if node is root else 'stmt'
+                stack.extend((ch, inner) for ch in kids)
+            elif isinstance(node, (IntVal, BoolVal, StringVal)):
+                want = {IntVal: int, BoolVal: bool, StringVal: str}[type(node)]
+                if type(node.value) is not want or kids:
+                    fail(f"literal {name} inválido: {node.value!r}")
+            elif isinstance(node, (Output, Fail)):
+                if not isinstance(node.value, str) or kids:
+                    fail(f"{name} inválido")
+            elif isinstance(node, (Identifier, NoOp, Read)):
+                if kids:
+                    fail(f"{name} não deveria ter filhos")
+            elif isinstance(node, (Print, Return)):
+                Verifier._arity(fail, node, 1)
+                stack.append((kids[0], 'expr'))
+            elif isinstance(node, (Assignment, TempDec)):
+                Verifier._arity(fail, node, 2)
+                if isinstance(node, TempDec) and not str(kids[0].value).startswith('_'):
+                    fail(f"temporário com nome de usuário: {kids[0].value}")
+                stack.extend([(kids[0], 'name'), (kids[1], 'expr')])
+            elif isinstance(node, VarDec):
+                if node.value not in _TYPES or len(kids) not in (1, 2):
+                    fail(f"VarDec inválida: {node.value} com {len(kids)} filhos")
+                stack.append((kids[0], 'name'))
+                if len(kids) == 2:
+                    stack.append((kids[1], 'expr'))
+            elif isinstance(node, UnOp):
+                Verifier._arity(fail, node, 1)
+                if node.value not in ('+', '-', '!'):
+                    fail(f"operador unário inválido: {node.value}")
+                stack.append((kids[0], 'expr'))
+            elif isinstance(node, BinOp):
+                Verifier._arity(fail, node, 2)
+                if node.value not in _BINOPS:
+                    fail(f"operador binário inválido: {node.value}")
+                if isinstance(node, ShiftOp) and not (isinstance(kids[1], IntVal) and kids[1].value == 1 << node.k):
+                    fail("ShiftOp sem potência de 2 no divisor")
+                stack.extend((ch, 'expr') for ch in kids)
+            elif isinstance(node, If):
+                if len(kids) not in (2, 3):
+                    fail(f"If com {len(kids)} filhos")
+                stack.append((kids[0], 'expr'))
+                stack.extend((ch, 'block') for ch in kids[1:])
+            elif isinstance(node, While):
+                Verifier._arity(fail, node, 2)
+                stack.extend([(kids[0], 'expr'), (kids[1], 'block')])
+            elif isinstance(node, FuncDec):
+                if node.value not in _TYPES or len(kids) < 2:
+                    fail(f"FuncDec inválida: {node.value}")
+                stack.append((kids[0], 'name'))
+                stack.extend((p, 'param') for p in kids[1:-1])
+                stack.append((kids[-1], 'block'))
+            elif isinstance(node, FuncCall):
+                stack.extend((ch, 'expr') for ch in kids)
+            else:
+                fail(f"tipo de nó desconhecido: {name}")
+
+    @staticmethod
+    def _arity(fail, node: Node, n: int):
+        if len(node.children) != n:
+            fail(f"{type(node).__name__} com {len(node.children)} filhos, esperado {n}")
@@ -0,0 +1,367 @@
+from __future__ import annotations
+import sys
+from typing import Any, Callable, Dict, List, Optional
+from nodes import Read, FuncCall, V_bool, V_num, V_str, ensure_type, str_value_of, int_div, int_mod, shift_right
+from symbol_table import SymbolTable, Variable, SharedValue
+from purity import Memo
+from bytecode import OPCODES, TYPES, UNOPS, BINOPS, CONTEXTS, CodeObject, Program
+
+(CONST, LOAD_FAST, STORE_FAST, DECLARE_FAST, INIT_FAST, LOAD, STORE, DECLARE, INIT, VOID_DECL, TEMP, POP, PRINT,
+ READ, OUTPUT, FAIL, UNARY, BINARY, UNCHECKED, SHIFT, JUMP, JUMP_IF_FALSE, ENTER, LEAVE, FOR_PREP, FOR_NEXT, FUNC,
+ CALL_BEGIN, ARG_DECL, ARG, CALL, TAIL_CALL, STMT_CALL, RETURN, RETURN_NONE) = (OPCODES[n] for n in (
+    "CONST", "LOAD_FAST", "STORE_FAST", "DECLARE_FAST", "INIT_FAST", "LOAD", "STORE", "DECLARE", "INIT", "VOID_DECL",
+    "TEMP", "POP", "PRINT", "READ", "OUTPUT", "FAIL",
+    "UNARY", "BINARY", "UNCHECKED", "SHIFT", "JUMP", "JUMP_IF_FALSE", "ENTER", "LEAVE", "FOR_PREP", "FOR_NEXT",
+    "FUNC", "CALL_BEGIN", "ARG_DECL", "ARG", "CALL", "TAIL_CALL", "STMT_CALL", "RETURN", "RETURN_NONE"))
+
+
+_DEFAULTS = {'number': 0, 'boolean': False, 'string': ""}
+
+
+class Frame:
+    """Uma chamada em execução: código, pc de retorno, slots, escopos e pilha de operandos."""
+    __slots__ = ("co", "values", "pc", "st", "outer", "slots", "stack", "checks", "memo", "key")
+
+    def __init__(self, co: CodeObject, values: List[Variable], st: SymbolTable, outer: Optional[SymbolTable],
+                 slots: List[Optional[Variable]]):
+        self.co = co
+        self.values = values  # Variables dos literais de co.consts
+        self.pc = 0
+        self.st = st          # escopo corrente (ENTER/LEAVE)
+        self.outer = outer    # escopo em que a chamada foi feita (pai da tabela da chamada, se houver)
+        self.slots = slots    # Variables das declarações fora da SymbolTable (co.slot_names)
+        self.stack: List[Any] = []
+        self.checks = [(co.public, co.rtype)]  # retornos a conferir, do mais externo ao mais interno
+        self.memo: Optional[Memo] = None
+        self.key: tuple = ()
+
+
+class PreparedCall:
+    """Chamada entre CALL_BEGIN e CALL/TAIL_CALL; a lista de slots já nasce com o tamanho do layout."""
+    __slots__ = ("co", "call_st", "outer", "slots", "key")
+
+    def __init__(self, co: CodeObject, call_st: SymbolTable, outer: Optional[SymbolTable] = None, nslots: int = 0):
+        self.co = co
+        self.call_st = call_st
+        self.outer = outer
+        self.slots: List[Optional[Variable]] = [None] * nslots
+        self.key: List[Any] = []
+
+
+class StackVM:
+    """
+    Máquina de pilha para o bytecode de bytecode.py (--engine=vm).
+
+    A pilha de operandos guarda Variables, como o evaluate: LOAD empilha a
+    própria Variable da tabela, e as operações leem .value de quem está embaixo
+    só depois de avaliado o lado direito. Literais viram Variables uma vez, na
+    carga do programa (set/create_variable copiam o valor, então compartilhar
+    é seguro).
+
+    As chamadas são Frames numa lista, sem recursão do Python. Variáveis que
+    o compilador pôs em slots ficam na lista Frame.slots (LOAD_FAST/
+    STORE_FAST por índice, com as mesmas checagens de tipo e mensagens de
+    SymbolTable.set); chamadas de funções sem declarações por nome nem criam
+    SymbolTable. O único limite de profundidade que sobra é o de
+    SymbolTable.get subindo a cadeia de escopos, que só cresce com funções
+    que ainda têm tabela própria. Escopo dinâmico, memo (os mesmos Memo de
+    purity.py), chamadas em cauda e mensagens de erro seguem o evaluate.
+    A lista de Frames vai no máximo até sys.getrecursionlimit(), com a
+    mensagem do RecursionError do Python: um Frame por frame do Python, como
+    reg e py (tree, closure e unboxed gastam vários frames por chamada e
+    param antes), em vez de aceitar recursões que os outros motores recusam.
+    """
+
+    def __init__(self, program: Program, memos: Optional[Dict[str, Memo]] = None):
+        self.program = program
+        self.values: Dict[int, List[Variable]] = {
+            id(co): [SharedValue(t, v) for t, v in co.consts] for co in program.codes}
+        self.memos: Dict[str, Memo] = dict(memos or {})
+
+    @staticmethod
+    def run(program: Program, st: SymbolTable, memos: Optional[Dict[str, Memo]] = None):
+        StackVM(program, memos).execute(st)
+
+    def memo_of(self, co: CodeObject) -> Optional[Memo]:
+        if not co.memo:
+            return None
+        if co.name not in self.memos:
+            self.memos[co.name] = Memo(co.name)
+        return self.memos[co.name]
+
+    def execute(self, st: SymbolTable):
+        codes = self.program.codes
+        frames: List[Frame] = []
+        prepared: List[PreparedCall] = []
+        f = Frame(codes[0], self.values[id(codes[0])], st, st.parent, [None] * len(codes[0].slot_names))
+        code, values, names, stack, slots = f.co.code, f.values, f.co.names, f.stack, f.slots
+        pc = 0
+        max_depth = sys.getrecursionlimit()
+        while True:
+            op = code[pc]
+            if op == LOAD_FAST:
+                stack.append(slots[code[pc + 1]])
+                pc += 2
+            elif op == LOAD:
+                stack.append(f.st.get(names[code[pc + 1]]))
+                pc += 2
+            elif op == CONST:
+                stack.append(values[code[pc + 1]])
+                pc += 2
+            elif op == BINARY:
+                b = stack.pop()
+                stack[-1] = BINARY_HANDLERS[code[pc + 1]](stack[-1], b)
+                pc += 2
+            elif op == UNCHECKED:
+                b = stack.pop().value
+                stack[-1] = Variable("number", UNCHECKED_HANDLERS[code[pc + 1]](stack[-1].value, b))
+                pc += 2
+            elif op == STORE_FAST:
+                target, v = slots[code[pc + 1]], stack.pop()
+                if target.type != v.type:
+                    raise Exception(f"[Semantic] Tipos incompatíveis em atribuição: esperado {target.type}, recebeu {v.type}")
+                target.value = v.value
+                pc += 2
+            elif op == STORE:
+                f.st.set(names[code[pc + 1]], stack.pop())
+                pc += 2
+            elif op == JUMP_IF_FALSE:
+                c = stack.pop()
+                ensure_type(c, 'boolean', CONTEXTS[code[pc + 2]])
+                pc = pc + 3 if c.value else code[pc + 1]
+            elif op == JUMP:
+                pc = code[pc + 1]
+            elif op == FOR_NEXT:
+                loop = stack[-1]  # [i, iterador, último valor, passo]
+                v = next(loop[1], None)
+                if v is None:
+                    if loop[2] is not None:
+                        loop[0].value = loop[2] + loop[3]
+                    stack.pop()
+                    pc = code[pc + 1]
+                else:
+                    loop[0].value = loop[2] = v
+                    pc += 2
+            elif op == FOR_PREP:
+                stop = stack.pop().value + code[pc + 1]
+                iv = stack.pop()
+                step = f.co.extras[code[pc + 2]]
+                stack.append([iv, iter(range(iv.value, stop, step)), None, step])
+                pc += 3
+            elif op == CALL_BEGIN:
+                fname = names[code[pc + 1]]
+                argc = code[pc + 2]
+                fvar = f.st.get(fname)
+                if not getattr(fvar, "is_function", False):
+                    raise Exception(f"[Semantic] '{fname}' não é uma função")
+                callee: CodeObject = fvar.value
+                if len(callee.params) != argc:
+                    raise Exception(f"[Semantic] Chamada de '{fname}' com {argc} argumentos; esperado {len(callee.params)}")
+                st = f.st
+                prepared.append(PreparedCall(callee, SymbolTable(parent=st) if callee.table else st, st,
+                                             len(callee.slot_names)))
+                pc += 3
+            elif op == ARG_DECL:
+                p = prepared[-1]
+                i = code[pc + 1]
+                if p.co.param_slots[i] < 0:
+                    pname, ptype = p.co.params[i]
+                    p.call_st.create_variable(pname, ptype)
+                pc += 2
+            elif op == ARG:
+                p = prepared[-1]
+                i = code[pc + 1]
+                pname, ptype = p.co.params[i]
+                aval = stack.pop()
+                if aval.type != ptype:
+                    raise Exception(f"[Semantic] Tipo inválido no argumento '{pname}' de '{p.co.public}': esperado {ptype}, recebeu {aval.type}")
+                s = p.co.param_slots[i]
+                if s >= 0:
+                    p.slots[s] = Variable(ptype, aval.value, False, 4 * (s + 1))
+                else:
+                    p.call_st.set(pname, aval)
+                if p.co.memo:
+                    p.key.append(aval.value)
+                pc += 2
+            elif op == CALL:
+                p = prepared.pop()
+                memo = self.memo_of(p.co)
+                key = tuple(p.key)
+                if memo is not None:
+                    r = memo.get(key)
+                    if r is not None:
+                        stack.append(r)
+                        pc += 1
+                        continue
+                if len(frames) >= max_depth:
+                    raise RecursionError("maximum recursion depth exceeded")
+                f.pc = pc + 1
+                frames.append(f)
+                f = Frame(p.co, self.values[id(p.co)], p.call_st, p.outer, p.slots)
+                f.memo, f.key = memo, key
+                code, values, names, stack, slots = f.co.code, f.values, f.co.names, f.stack, f.slots
+                pc = 0
+            elif op == TAIL_CALL:
+                # troca o frame corrente pela chamada, como o laço de PendingCall.run
+                p = prepared.pop()
+                if code[pc + 1]:
+                    p.outer = f.outer
+                    if p.co.table:
+                        p.call_st.parent = f.outer
+                    else:
+                        p.call_st = f.outer
+                check = (p.co.public, p.co.rtype)
+                if f.checks[-1] != check:
+                    f.checks.append(check)
+                f.co, f.values, f.st, f.outer, f.slots = p.co, self.values[id(p.co)], p.call_st, p.outer, p.slots
+                stack.clear()
+                code, values, names, slots = f.co.code, f.values, f.co.names, f.slots
+                pc = 0
+            elif op == RETURN or op == STMT_CALL or op == RETURN_NONE:
+                r = None if op == RETURN_NONE else stack.pop()
+                if r is None and op != RETURN_NONE:
+                    pc += 1  # resultado de função void não encerra o bloco (Block só para em Variable)
+                    continue
+                if not frames:
+                    return  # return no nível de topo encerra o programa
+                for fname, rtype in reversed(f.checks):
+                    r = FuncCall.check_return(fname, rtype, r)
+                if f.memo is not None:
+                    f.memo.put(f.key, r)
+                f = frames.pop()
+                code, values, names, stack, slots = f.co.code, f.values, f.co.names, f.stack, f.slots
+                stack.append(r)
+                pc = f.pc
+            elif op == POP:
+                stack.pop()
+                pc += 1
+            elif op == DECLARE_FAST:
+                s, vtype = code[pc + 1], TYPES[code[pc + 2]]
+                slots[s] = Variable(vtype, _DEFAULTS[vtype], False, 4 * (s + 1))
+                pc += 3
+            elif op == INIT_FAST:
+                s, vtype = code[pc + 1], TYPES[code[pc + 2]]
+                v = stack.pop()
+                if v.type != vtype:
+                    raise Exception(f"[Semantic] Tipos incompatíveis em inicialização de '{f.co.slot_names[s]}': esperado {vtype}, recebeu {v.type}")
+                slots[s].value = v.value
+                pc += 3
+            elif op == DECLARE:
+                f.st.create_variable(names[code[pc + 1]], TYPES[code[pc + 2]])
+                pc += 3
+            elif op == INIT:
+                name, vtype = names[code[pc + 1]], TYPES[code[pc + 2]]
+                v = stack.pop()
+                if v.type != vtype:
+                    raise Exception(f"[Semantic] Tipos incompatíveis em inicialização de '{name}': esperado {vtype}, recebeu {v.type}")
+                f.st.set(name, v)
+                pc += 3
+            elif op == ENTER:
+                f.st = SymbolTable(parent=f.st)
+                pc += 1
+            elif op == LEAVE:
+                f.st = f.st.parent
+                pc += 1
+            elif op == PRINT:
+                print(str_value_of(stack.pop()))
+                pc += 1
+            elif op == READ:
+                stack.append(_READ.evaluate(f.st))
+                pc += 1
+            elif op == TEMP:
+                f.st.set_temp(names[code[pc + 1]], stack.pop())
+                pc += 2
+            elif op == UNARY:
+                stack[-1] = unary_op(UNOPS[code[pc + 1]], stack[-1])
+                pc += 2
+            elif op == SHIFT:
+                stack[-1] = shift_op(BINOPS[code[pc + 1]], code[pc + 2], stack[-1])
+                pc += 3
+            elif op == FUNC:
+                fco = codes[code[pc + 1]]
+                f.st.create_function(fco.name, fco.rtype, fco)
+                pc += 2
+            elif op == VOID_DECL:
+                raise Exception(f"[Semantic] Variável '{names[code[pc + 1]]}' não pode ter tipo void")
+            elif op == OUTPUT:
+                sys.stdout.write(values[code[pc + 1]].value)
+                pc += 2
+            elif op == FAIL:
+                raise Exception(values[code[pc + 1]].value)
+            else:
+                raise Exception(f"[VM] Opcode inválido: {op}")
+
+
+# ------- operações (mesma semântica e mensagens de nodes.py) -------
+_READ = Read()
+
+def _add(a: Variable, b: Variable) -> Variable:
+    if a.type == 'string' or b.type == 'string':
+        return V_str(str_value_of(a) + str_value_of(b))
+    if a.type != 'number' or b.type != 'number':
+        raise Exception(f"[Semantic] Operação aritmética requer 'number', recebeu {a.type} + {b.type}")
+    return Variable("number", a.value + b.value)
+
+def _arith(op: str, fn: Callable[[int, int], int]):
+    def run(a: Variable, b: Variable) -> Variable:
+        if a.type != 'number' or b.type != 'number':
+            raise Exception(f"[Semantic] Operação aritmética requer 'number', recebeu {a.type} {op} {b.type}")
+        return V_num(fn(a.value, b.value))
+    return run
+
+def _relational(op: str, fn: Callable[[Any, Any], bool]):
+    def run(a: Variable, b: Variable) -> Variable:
+        if a.type != b.type or a.type not in ('number', 'string'):
+            raise Exception(f"[Semantic] Operador relacional '{op}' requer tipos iguais number/number ou string/string; recebeu {a.type} e {b.type}")
+        return V_bool(fn(a.value, b.value))
+    return run
+
+def _equality(op: str):
+    strict, same = op in ('===', '!=='), op in ('==', '===')
+    def run(a: Variable, b: Variable) -> Variable:
+        if a.type != b.type:
+            if strict:
+                raise Exception(f"[Semantic] Tipos incompatíveis em comparação estrita: {a.type} {op} {b.type}")
+            return V_bool(not same)
+        return V_bool((a.value == b.value) == same)
+    return run
+
+def _logical(op: str):
+    def run(a: Variable, b: Variable) -> Variable:
+        if a.type != 'boolean' or b.type != 'boolean':
+            raise Exception(f"[Semantic] Operadores lógicos requerem boolean: recebeu {a.type} {op} {b.type}")
+        return V_bool(a.value and b.value if op == '&&' else a.value or b.value)
+    return run
+
+# na ordem de bytecode.BINOPS
+BINARY_HANDLERS: List[Callable[[Variable, Variable], Variable]] = [
+    _add,
+    _arith('-', lambda a, b: a - b),
+    _arith('*', lambda a, b: a * b),
+    _arith('/', int_div),
+    _arith('%', int_mod),
+    _equality('=='), _equality('!='), _equality('==='), _equality('!=='),
+    _relational('<', lambda a, b: a < b), _relational('>', lambda a, b: a > b),
+    _relational('<=', lambda a, b: a <= b), _relational('>=', lambda a, b: a >= b),
+    _logical('&&'), _logical('||'),
+]
+
+# UncheckedOp: operandos já provados number e divisor != 0 (ranges.py)
+UNCHECKED_HANDLERS: List[Callable[[int, int], int]] = [
+    lambda a, b: a + b, lambda a, b: a - b, lambda a, b: a * b, lambda a, b: int(a / b), lambda a, b: a % b,
+]
+
+def unary_op(op: str, v: Variable) -> Variable:
+    if op == '+':
+        ensure_type(v, "number", "unário +"); return V_num(+v.value)
+    if op == '-':
+        ensure_type(v, "number", "unário -"); return V_num(-v.value)
+    ensure_type(v, "boolean", "unário !"); return V_bool(not v.value)
+
+def shift_op(op: str, k: int, a: Variable) -> Variable:
+    if a.type != 'number':
+        raise Exception(f"[Semantic] Operação aritmética requer 'number', recebeu {a.type} {op} number")
+    v = a.value
+    if op == '*': return V_num(v << k)
+    if op == '%': return V_num(v & ((1 << k) - 1))
+    return V_num(shift_right(v, k))